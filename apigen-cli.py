@@ -12,12 +12,12 @@ Usage:
 import sys
 import os
 import argparse
-import json
-import yaml
 import requests
 from pathlib import Path
 from typing import Optional
 
+from apigen_cli.transport import upload
+
 # ANSI color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -52,35 +52,14 @@ def print_warning(message: str):
     """Print warning message"""
     print(f"{Colors.YELLOW}⚠ {message}{Colors.ENDC}")
 
-def load_spec(spec_file: str) -> dict:
-    """Load OpenAPI specification from file"""
-    try:
-        with open(spec_file, 'r', encoding='utf-8') as f:
-            if spec_file.endswith('.json'):
-                return json.load(f)
-            else:
-                return yaml.safe_load(f)
-    except FileNotFoundError:
-        print_error(f"File not found: {spec_file}")
-        sys.exit(1)
-    except Exception as e:
-        print_error(f"Failed to load spec: {str(e)}")
-        sys.exit(1)
-
 def validate_spec(spec_file: str, api_url: str = "http://localhost:8000") -> bool:
     """Validate OpenAPI specification"""
     print_info(f"Validating OpenAPI specification: {spec_file}")
     
-    spec = load_spec(spec_file)
-    
     try:
-        response = requests.post(
-            f"{api_url}/api/validate-json",
-            json=spec,
-            timeout=30
-        )
+        response = upload(f"{api_url}/api/validate", spec_file, timeout=30)
         
-        if response.status_code == 200:
+        if response.status_code in (200, 400) and 'valid' in response.json():
             result = response.json()
             if result.get('valid'):
                 print_success("OpenAPI specification is valid!")
@@ -100,6 +79,9 @@ def validate_spec(spec_file: str, api_url: str = "http://localhost:8000") -> boo
             print_error(f"Validation failed: {response.text}")
             return False
             
+    except FileNotFoundError:
+        print_error(f"File not found: {spec_file}")
+        sys.exit(1)
     except requests.exceptions.ConnectionError:
         print_error("Cannot connect to API server. Make sure it's running on http://localhost:8000")
         print_info("Start the server with: cd backend && python main.py")
@@ -126,8 +108,6 @@ def generate_client(
         print_error("Generation aborted due to validation errors")
         sys.exit(1)
     
-    spec = load_spec(spec_file)
-    
     # Prepare request
     data = {
         'language': language.lower(),
@@ -143,11 +123,8 @@ def generate_client(
     print(f"  Docs: {'Yes' if include_docs else 'No'}")
     
     try:
-        response = requests.post(
-            f"{api_url}/api/generate",
-            json={**data, 'spec': spec},
-            timeout=60
-        )
+        form = {key: str(value).lower() if isinstance(value, bool) else value for key, value in data.items()}
+        response = upload(f"{api_url}/api/generate", spec_file, form)
         
         if response.status_code == 200:
             # Save the ZIP file
@@ -0,0 +1,187 @@
+"""
+Access to the generator backend modules from the CLI
+
+In a source checkout the backend lives next to this package; its directory
+can also be given with the APIGEN_BACKEND_DIR environment variable. With the
+backend available the CLI generates clients in-process (the local engine);
+without it, it talks to a generator server and falls back to plain PyYAML for
+loading specs.
+"""
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def find_backend_dir() -> Optional[Path]:
+    """Locate the backend directory, if available"""
+    candidates = []
+    if os.environ.get('APIGEN_BACKEND_DIR'):
+        candidates.append(Path(os.environ['APIGEN_BACKEND_DIR']))
+    candidates.append(Path(__file__).resolve().parent.parent / 'backend')
+
+    for candidate in candidates:
+        if (candidate / 'parsers' / '__init__.py').exists():
+            return candidate
+    return None
+
+
+def ensure_backend_path() -> bool:
+    """Make the backend modules importable. Returns False if the backend is missing"""
+    backend_dir = find_backend_dir()
+    if backend_dir is None:
+        return False
+    if str(backend_dir) not in sys.path:
+        sys.path.insert(0, str(backend_dir))
+    return True
+
+
+def has_backend() -> bool:
+    """Whether the in-process engine can be used"""
+    return find_backend_dir() is not None
+
+
+# Sources whose changes a running daemon must not miss (see ``daemon``)
+BACKEND_SOURCES = ('generators', 'parsers', 'templates', 'engine')
+
+
+def source_stamp(*directories: Path) -> str:
+    """Hash of the names, sizes and mtimes of the files under directories
+    
+    Only stats files, so it is cheap enough to check on every invocation.
+    """
+    digest = hashlib.sha256()
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def backend_fingerprint() -> Optional[str]:
+    """Stamp of the CLI and backend sources; None without the backend"""
+    backend_dir = find_backend_dir()
+    if backend_dir is None:
+        return None
+    return source_stamp(Path(__file__).resolve().parent, *(backend_dir / source for source in BACKEND_SOURCES))
+
+
+def load_parsed_spec(spec_file: str, cache_settings: Optional[Dict[str, Any]] = None):
+    """Load, validate and parse a spec through the on-disk parse cache.
+    
+    Returns a ``parsers.parse_cache.ParsedSpec``. Requires the backend.
+    """
+    if not ensure_backend_path():
+        raise ImportError("The generator backend is not available")
+    from parsers.parse_cache import ParseCache, parse_content
+    
+    cache = ParseCache.from_settings(cache_settings)
+    if cache is None:
+        with open(spec_file, 'rb') as f:
+            return parse_content(f.read())
+    return cache.load(spec_file)
+
+
+def parse_spec_content(content: bytes, cache_settings: Optional[Dict[str, Any]] = None):
+    """Validate and parse spec bytes through the on-disk parse cache (see ``load_parsed_spec``)"""
+    if not ensure_backend_path():
+        raise ImportError("The generator backend is not available")
+    from parsers.parse_cache import ParseCache, parse_content
+    
+    cache = ParseCache.from_settings(cache_settings)
+    return parse_content(content) if cache is None else cache.load_content(content)
+
+
+def validation_result(entry) -> Dict[str, Any]:
+    """A ``ParsedSpec`` as a validation result (the shape of /api/validate-json)"""
+    if entry.errors:
+        return {'valid': False, 'errors': entry.errors}
+    return {
+        'valid': True,
+        'info': entry.parsed['info'],
+        'endpoints_count': len(entry.parsed['paths'])
+    }
+
+
+def load_spec_file(spec_file: str, cache_settings: Optional[Dict[str, Any]] = None) -> Any:
+    """Load a JSON or YAML spec with the backend's fast loader and parse cache"""
+    if ensure_backend_path():
+        if not (cache_settings or {}).get('enabled', True):
+            from parsers.spec_loader import load_spec_file as backend_load_spec_file
+            return backend_load_spec_file(spec_file)
+        return load_parsed_spec(spec_file, cache_settings).spec
+
+    # JSON is a subset of YAML, so one loader handles both formats
+    import yaml
+    
+    with open(spec_file, 'rb') as f:
+        return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+def generator_class(language: str):
+    """The backend generator class for a language"""
+    if not ensure_backend_path():
+        raise ImportError("The generator backend is not available")
+    import generators
+    
+    generator_classes = {
+        'python': generators.PythonGenerator,
+        'javascript': generators.JavaScriptGenerator,
+        'go': generators.GoGenerator,
+        'rust': generators.RustGenerator,
+        'csharp': generators.CSharpGenerator,
+        'java': generators.JavaGenerator,
+        'php': generators.PHPGenerator,
+    }
+    if language not in generator_classes:
+        raise ValueError(f"Language '{language}' is not supported by the local engine")
+    return generator_classes[language]
+
+
+def make_generator(parsed_data: Dict[str, Any], language: str, package_name: str = 'api_client',
+                   include_tests: bool = False, include_docs: bool = True,
+                   template_dir: Optional[str] = None, fragments: Optional[Dict[Any, str]] = None):
+    """A backend generator for parsed data
+    
+    Templates in ``template_dir`` override the built-in ones of the same name.
+    ``fragments`` are the rendered operations and models of an earlier run to reuse.
+    """
+    return generator_class(language)(
+        parsed_data=parsed_data,
+        package_name=package_name,
+        include_tests=include_tests,
+        include_docs=include_docs,
+        template_dir=template_dir,
+        fragments=fragments
+    )
+
+
+def render_client(parsed_data: Dict[str, Any], language: str, **options: Any) -> Dict[str, str]:
+    """Run a backend generator in-process. Returns {filepath: content}"""
+    return make_generator(parsed_data, language, **options).generate()
+
+
+def stream_client(parsed_data: Dict[str, Any], language: str, **options: Any) -> Iterator[Tuple[str, str]]:
+    """Run a backend generator in-process, yielding (filepath, chunk) pairs as they are rendered"""
+    return make_generator(parsed_data, language, **options).stream()
+
+
+def profile_client(content: bytes, filename: str, language: str, **options: Any) -> Dict[str, Any]:
+    """Generate a client in-process under the sampling profiler.
+
+    Returns the archive, the profile summary, the collapsed stacks and the
+    phase timings (see ``engine.tasks.profile_archive``).
+    """
+    if not ensure_backend_path():
+        raise ImportError("The generator backend is not available")
+    from engine.tasks import profile_archive
+    
+    generator_class(language)
+    return profile_archive(content, filename, language, **options)
@@ -8,40 +8,60 @@ Usage:
     apigen languages
     apigen validate <spec-file>
     apigen watch <spec-file> -l <language> [options]
+    apigen profile <spec-file> -l <language> [options]
+    apigen daemon [--background | --status | --stop]
     apigen init
 """
 
 import sys
 import os
+import time
 import argparse
-import json
-import yaml
-import requests
+import itertools
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Optional
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Tuple
 
-console = Console()
+from .config import load_config
 
-# Try to import optional dependencies
-try:
-    from .config import load_config, Config
-    HAS_CONFIG = True
-except ImportError:
-    HAS_CONFIG = False
+if TYPE_CHECKING:
+    import requests
 
-try:
-    from .watch import watch_spec
-    HAS_WATCH = True
-except ImportError:
-    HAS_WATCH = False
+# Heavy dependencies (rich, requests, yaml, watchdog, the backend) are imported
+# by the commands that use them, so `apigen languages` and `--help` start fast.
+# Optional ones are only looked up here.
+HAS_CONFIG = find_spec('yaml') is not None
+HAS_WATCH = find_spec('watchdog') is not None
+
+class LazyConsole:
+    """The rich console, created (and rich imported) on first use"""
+    
+    _console = None
+    
+    def __getattr__(self, name: str) -> Any:
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return getattr(self._console, name)
+    
+    # Progress and Live enter the console; special methods bypass __getattr__
+    def __enter__(self):
+        return self.__getattr__('__enter__')()
+    
+    def __exit__(self, *exc_info: Any):
+        return self.__getattr__('__exit__')(*exc_info)
+
+console = LazyConsole()
+
+def _connection_errors() -> Tuple[type, ...]:
+    """requests' connection error, once a command has imported requests"""
+    requests = sys.modules.get('requests')
+    return (requests.exceptions.ConnectionError,) if requests is not None else ()
 
 def print_header():
     """Print CLI header with rich formatting"""
+    from rich.panel import Panel
+    
     console.print(Panel.fit(
         "[bold cyan]Universal API Client Generator[/bold cyan]\n"
         "[dim]CLI Tool v1.0[/dim]",
@@ -49,26 +69,109 @@ def print_header():
         padding=(1, 2)
     ))
 
-def load_spec(spec_file: str) -> dict:
-    """Load OpenAPI specification from file"""
+DEFAULT_API_URL = "http://localhost:8000"
+
+# Interval between polls of a server-side generation job, doubling up to the maximum
+JOB_POLL_MIN_SECONDS = 0.25
+JOB_POLL_MAX_SECONDS = 2.0
+
+# Distinguishes the temporary archives of concurrent writes (see ``write_zip``)
+_temp_counter = itertools.count()
+
+def use_local_engine(api_url: Optional[str]) -> bool:
+    """Generate in-process unless a server URL was given or the backend is missing"""
+    from .backend import has_backend
+    return api_url is None and has_backend()
+
+def print_validation_result(result: Dict[str, Any]) -> bool:
+    """Print a validation result (as returned by /api/validate-json)"""
+    if result.get('valid'):
+        from rich import box
+        from rich.table import Table
+        
+        console.print("\n[green]✓[/green] OpenAPI specification is valid!\n")
+        
+        # Create info table
+        table = Table(show_header=False, box=box.ROUNDED, border_style="green")
+        table.add_column("Property", style="cyan")
+        table.add_column("Value", style="white")
+        
+        info = result.get('info', {})
+        table.add_row("Title", info.get('title', 'N/A'))
+        table.add_row("Version", info.get('version', 'N/A'))
+        table.add_row("Endpoints", str(result.get('endpoints_count', 0)))
+        
+        console.print(table)
+        return True
+    else:
+        console.print("\n[red]✗[/red] OpenAPI specification is invalid!\n")
+        errors = result.get('errors', [])
+        for error in errors:
+            console.print(f"  [red]•[/red] {error}")
+        return False
+
+def daemon_enabled() -> bool:
+    """Whether commands try a daemon: not with APIGEN_NO_DAEMON, nor off POSIX (no Unix sockets)"""
+    return os.name == 'posix' and not os.environ.get('APIGEN_NO_DAEMON')
+
+def daemon_request(op: str, **fields: Any) -> Optional[Dict[str, Any]]:
+    """Send a request to a running daemon. None if no daemon answers or it is disabled"""
+    if not daemon_enabled():
+        return None
+    from .daemon import connect
+    
+    client = connect()
+    return client.request(op, **fields) if client is not None else None
+
+def validate_daemon(spec_file: str, cache: Optional[Dict[str, Any]] = None) -> Optional[bool]:
+    """Validate on a running daemon. Returns None if no daemon answers"""
+    if not daemon_enabled():
+        return None
+    from .daemon import DaemonError
+    
     try:
-        with open(spec_file, 'r', encoding='utf-8') as f:
-            if spec_file.endswith('.json'):
-                return json.load(f)
-            else:
-                return yaml.safe_load(f)
+        result = daemon_request('validate', spec_file=os.path.abspath(spec_file), cache=cache)
+    except DaemonError as e:
+        console.print(f"\n[red]✗[/red] Failed to load spec: {str(e)}")
+        sys.exit(1)
+    if result is None:
+        return None
+    console.print(f"\n[blue]ℹ[/blue] Validating: [cyan]{spec_file}[/cyan] [dim](daemon)[/dim]")
+    return print_validation_result(result)
+
+def validate_local(spec_file: str, cache: Optional[Dict[str, Any]] = None):
+    """Validate and parse in-process. Returns the parsed spec, or None if it is invalid"""
+    from .backend import load_parsed_spec, validation_result
+    
+    console.print(f"\n[blue]ℹ[/blue] Validating: [cyan]{spec_file}[/cyan]")
+    try:
+        entry = load_parsed_spec(spec_file, cache)
     except FileNotFoundError:
         console.print(f"[red]✗[/red] File not found: {spec_file}")
         sys.exit(1)
     except Exception as e:
         console.print(f"[red]✗[/red] Failed to load spec: {str(e)}")
         sys.exit(1)
+    
+    if not print_validation_result(validation_result(entry)):
+        return None
+    return entry
 
-def validate_spec(spec_file: str, api_url: str = "http://localhost:8000") -> bool:
-    """Validate OpenAPI specification"""
-    console.print(f"\n[blue]ℹ[/blue] Validating: [cyan]{spec_file}[/cyan]")
+def validate_spec(spec_file: str, api_url: Optional[str] = None,
+                  cache: Optional[Dict[str, Any]] = None) -> bool:
+    """Validate OpenAPI specification (on the daemon, in-process, or on the server at api_url)"""
+    if use_local_engine(api_url):
+        valid = validate_daemon(spec_file, cache)
+        if valid is None:
+            valid = validate_local(spec_file, cache) is not None
+        return valid
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    
+    from .transport import upload
     
-    spec = load_spec(spec_file)
+    api_url = api_url or DEFAULT_API_URL
+    
+    console.print(f"\n[blue]ℹ[/blue] Validating: [cyan]{spec_file}[/cyan]")
     
     try:
         with Progress(
@@ -78,42 +181,21 @@ def validate_spec(spec_file: str, api_url: str = "http://localhost:8000") -> boo
         ) as progress:
             task = progress.add_task("Validating specification...", total=None)
             
-            response = requests.post(
-                f"{api_url}/api/validate-json",
-                json=spec,
-                timeout=30
-            )
+            response = upload(f"{api_url}/api/validate", spec_file, timeout=30)
             
             progress.update(task, completed=True)
         
-        if response.status_code == 200:
-            result = response.json()
-            if result.get('valid'):
-                console.print("\n[green]✓[/green] OpenAPI specification is valid!\n")
-                
-                # Create info table
-                table = Table(show_header=False, box=box.ROUNDED, border_style="green")
-                table.add_column("Property", style="cyan")
-                table.add_column("Value", style="white")
-                
-                info = result.get('info', {})
-                table.add_row("Title", info.get('title', 'N/A'))
-                table.add_row("Version", info.get('version', 'N/A'))
-                table.add_row("Endpoints", str(result.get('endpoints_count', 0)))
-                
-                console.print(table)
-                return True
-            else:
-                console.print("\n[red]✗[/red] OpenAPI specification is invalid!\n")
-                errors = result.get('errors', [])
-                for error in errors:
-                    console.print(f"  [red]•[/red] {error}")
-                return False
+        # Specs that fail to decode come back as a 400 with the same shape
+        if response.status_code in (200, 400) and 'valid' in response.json():
+            return print_validation_result(response.json())
         else:
             console.print(f"[red]✗[/red] Validation failed: {response.text}")
             return False
             
-    except requests.exceptions.ConnectionError:
+    except FileNotFoundError:
+        console.print(f"[red]✗[/red] File not found: {spec_file}")
+        sys.exit(1)
+    except _connection_errors():
         console.print("\n[red]✗[/red] Cannot connect to API server")
         console.print("[yellow]ℹ[/yellow] Make sure the server is running:")
         console.print("  [dim]cd backend && python main.py[/dim]\n")
@@ -122,6 +204,93 @@ def validate_spec(spec_file: str, api_url: str = "http://localhost:8000") -> boo
         console.print(f"[red]✗[/red] Validation error: {str(e)}")
         return False
 
+def write_zip(pieces: Iterable[Tuple[str, str]], output_path: str) -> Tuple[int, int]:
+    """Write generated (filepath, chunk) pieces to a ZIP archive
+    
+    Consecutive pieces with the same path form one file, so only one chunk is
+    held at a time. A ``{filepath: content}`` dict's items work as pieces too.
+    The archive is written to a temporary file beside output_path and renamed
+    over it once complete, so a failed generation leaves any previous archive
+    in place and no partial one. Returns the number of files and of
+    uncompressed bytes written.
+    """
+    import zipfile
+    
+    target = Path(output_path)
+    temp_path = target.parent / f".{target.name}.{os.getpid()}.{next(_temp_counter)}.tmp"
+    date_time = time.localtime()[:6]
+    files = 0
+    size = 0
+    try:
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            member = None
+            current = None
+            try:
+                for file_path, chunk in pieces:
+                    if file_path != current:
+                        if member is not None:
+                            member.close()
+                        info = zipfile.ZipInfo(file_path, date_time)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        # As ZipFile.writestr() does for a name
+                        info.external_attr = 0o600 << 16
+                        member = zip_file.open(info, 'w')
+                        current = file_path
+                        files += 1
+                    data = chunk.encode('utf-8')
+                    member.write(data)
+                    size += len(data)
+            finally:
+                if member is not None:
+                    member.close()
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return files, size
+
+def _raise_for_error(response: 'requests.Response') -> 'requests.Response':
+    """Raise with the server's error detail unless the response succeeded"""
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get('detail', response.text)
+        except ValueError:
+            detail = response.text
+        raise RuntimeError(detail)
+    return response
+
+def generate_remote(spec_file: str, data: Dict[str, Any], api_url: str,
+                    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> bytes:
+    """Generate on the server at api_url and return the ZIP
+    
+    The spec is submitted as a job whose status is polled until it is done, so
+    large specs are not bound by a request timeout. ``on_progress`` receives
+    each status. Servers without the job API generate within one request.
+    All requests share one keep-alive session (see ``transport``).
+    """
+    from .transport import session, upload
+    
+    form = {key: str(value).lower() if isinstance(value, bool) else value for key, value in data.items()}
+    try:
+        response = upload(f"{api_url}/api/jobs", spec_file, form)
+    except FileNotFoundError:
+        console.print(f"[red]✗[/red] File not found: {spec_file}")
+        sys.exit(1)
+    if response.status_code == 404:
+        response = upload(f"{api_url}/api/generate", spec_file, form)
+        return _raise_for_error(response).content
+    
+    job = _raise_for_error(response).json()
+    delay = JOB_POLL_MIN_SECONDS
+    while job['status'] not in ('done', 'failed'):
+        time.sleep(delay)
+        delay = min(delay * 2, JOB_POLL_MAX_SECONDS)
+        job = _raise_for_error(session().get(f"{api_url}{job['status_url']}", timeout=30)).json()
+        if on_progress:
+            on_progress(job)
+    if job['status'] == 'failed':
+        raise RuntimeError(job['error'])
+    return _raise_for_error(session().get(f"{api_url}{job['download_url']}", timeout=60)).content
+
 def generate_client(
     spec_file: str,
     language: str,
@@ -129,18 +298,35 @@ def generate_client(
     package_name: Optional[str] = None,
     include_tests: bool = False,
     include_docs: bool = True,
-    api_url: str = "http://localhost:8000"
+    api_url: Optional[str] = None,
+    cache: Optional[Dict[str, Any]] = None,
+    template_dir: Optional[str] = None
 ):
-    """Generate API client"""
+    """Generate API client (on the daemon, in-process, or on the server at api_url)
+    
+    template_dir overrides built-in templates; it applies to the local engine only.
+    """
+    from rich import box
+    from rich.panel import Panel
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    
     print_header()
     console.print(f"\n[blue]ℹ[/blue] Generating [cyan]{language.upper()}[/cyan] client from: [cyan]{spec_file}[/cyan]\n")
     
-    # Validate first
-    if not validate_spec(spec_file, api_url):
-        console.print("\n[red]✗[/red] Generation aborted due to validation errors\n")
-        sys.exit(1)
-    
-    spec = load_spec(spec_file)
+    local = use_local_engine(api_url)
+    daemon = False
+    if local:
+        # A running daemon keeps the parse in memory for the generate request
+        valid = validate_daemon(spec_file, cache)
+        daemon = valid is not None
+        if not daemon:
+            # One load and parse serves both validation and generation
+            entry = validate_local(spec_file, cache)
+            valid = entry is not None
+        if not valid:
+            console.print("\n[red]✗[/red] Generation aborted due to validation errors\n")
+            sys.exit(1)
     
     # Prepare request
     data = {
@@ -159,10 +345,13 @@ def generate_client(
     table.add_row("Package", data['package_name'])
     table.add_row("Tests", "Yes" if include_tests else "No")
     table.add_row("Docs", "Yes" if include_docs else "No")
+    table.add_row("Engine", "daemon" if daemon else "local" if local else api_url or DEFAULT_API_URL)
     
     console.print(table)
     console.print()
     
+    output_path = output_dir or f"./{data['package_name']}_{language}.zip"
+    
     try:
         with Progress(
             SpinnerColumn(),
@@ -171,78 +360,247 @@ def generate_client(
         ) as progress:
             task = progress.add_task("Generating client...", total=None)
             
-            response = requests.post(
-                f"{api_url}/api/generate",
-                json={**data, 'spec': spec},
-                timeout=60
-            )
+            throughput = None
+            if daemon:
+                result = daemon_request(
+                    'generate',
+                    spec_file=os.path.abspath(spec_file),
+                    output=os.path.abspath(output_path),
+                    template_dir=os.path.abspath(os.path.expanduser(template_dir)) if template_dir else None,
+                    cache=cache,
+                    **data
+                )
+                if result is None:
+                    # The daemon stopped since validating
+                    from .backend import load_parsed_spec
+                    daemon = False
+                    entry = load_parsed_spec(spec_file, cache)
+                elif not result['valid']:
+                    raise RuntimeError("The specification became invalid since validating")
+                else:
+                    files, size, seconds = result['files'], result['bytes'], max(result['seconds'], 1e-9)
+            if local and not daemon:
+                from .backend import stream_client
+                started = time.perf_counter()
+                files, size = write_zip(stream_client(entry.parsed, template_dir=template_dir, **data), output_path)
+                seconds = max(time.perf_counter() - started, 1e-9)
+            if local:
+                throughput = f"{files} files in {seconds:.2f}s ({files / seconds:.0f} files/s, {size / seconds / 1e6:.1f} MB/s)"
+            else:
+                def show_progress(job: Dict[str, Any]):
+                    if job['phase']:
+                        progress.update(task, description=f"Generating client ({job['phase']}, {job['percent']}%)...")
+                
+                content = generate_remote(spec_file, data, api_url or DEFAULT_API_URL, show_progress)
+                with open(output_path, 'wb') as f:
+                    f.write(content)
             
             progress.update(task, completed=True)
         
-        if response.status_code == 200:
-            # Save the ZIP file
-            output_path = output_dir or f"./{data['package_name']}_{language}.zip"
-            
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-            
-            console.print(f"\n[green]✓[/green] Client generated successfully!\n")
-            console.print(f"[cyan]Output:[/cyan] {output_path}\n")
-            
-            # Next steps panel
-            console.print(Panel(
-                "[bold]Next Steps:[/bold]\n\n"
-                "1. Extract the ZIP file\n"
-                "2. Follow the README.md for installation\n"
-                "3. Start using your API client!",
-                border_style="green",
-                title="[bold green]Success[/bold green]"
-            ))
-            console.print()
-            
-        else:
-            console.print(f"\n[red]✗[/red] Generation failed: {response.text}\n")
-            sys.exit(1)
+        console.print(f"\n[green]✓[/green] Client generated successfully!\n")
+        console.print(f"[cyan]Output:[/cyan] {output_path}")
+        if throughput:
+            console.print(f"[dim]{throughput}[/dim]")
+        console.print()
+        
+        # Next steps panel
+        console.print(Panel(
+            "[bold]Next Steps:[/bold]\n\n"
+            "1. Extract the ZIP file\n"
+            "2. Follow the README.md for installation\n"
+            "3. Start using your API client!",
+            border_style="green",
+            title="[bold green]Success[/bold green]"
+        ))
+        console.print()
             
-    except requests.exceptions.ConnectionError:
+    except _connection_errors():
         console.print("\n[red]✗[/red] Cannot connect to API server")
         console.print("[yellow]ℹ[/yellow] Make sure the server is running:")
         console.print("  [dim]cd backend && python main.py[/dim]\n")
         sys.exit(1)
     except Exception as e:
-        console.print(f"\n[red]✗[/red] Generation error: {str(e)}\n")
+        console.print(f"\n[red]✗[/red] Generation failed: {str(e)}\n")
         sys.exit(1)
 
-def list_languages():
-    """List all supported languages"""
+def incremental_regenerate(spec_file: str, language: str, output: str, **options):
+    """Build a watch callback that regenerates output (a directory or, with archive=True, a ZIP) incrementally"""
+    from .incremental import IncrementalBuild
+    
+    build = IncrementalBuild(spec_file, language, output, **options)
+    
+    def regenerate():
+        result = build.run()
+        if result.errors:
+            for error in result.errors:
+                console.print(f"  [red]•[/red] {error}")
+            raise RuntimeError("Invalid OpenAPI specification")
+        if not result.rendered:
+            console.print(f"[dim]Output unaffected ({result.seconds * 1000:.0f} ms)[/dim]")
+            return
+        for relative_path in result.written:
+            console.print(f"  [green]✎[/green] {relative_path}")
+        for relative_path in result.removed:
+            console.print(f"  [red]✗[/red] {relative_path}")
+        console.print(
+            f"[cyan]Output:[/cyan] {output} — {len(result.written)} written, "
+            f"{len(result.removed)} removed, {result.unchanged} unchanged "
+            f"({result.seconds * 1000:.0f} ms)"
+        )
+    
+    return regenerate
+
+def profile_spec(
+    spec_file: str,
+    language: str,
+    stacks_path: Optional[str] = None,
+    archive_path: Optional[str] = None,
+    interval_ms: float = 1.0,
+    top: int = 15,
+    **options: Any
+):
+    """Generate a client locally under the sampling profiler and report where the time goes"""
+    from rich import box
+    from rich.table import Table
+    
+    from .backend import has_backend, profile_client
+    
     print_header()
+    if not has_backend():
+        console.print("[red]✗[/red] Profiling requires the generator backend (set APIGEN_BACKEND_DIR)\n")
+        sys.exit(1)
+    try:
+        with open(spec_file, 'rb') as f:
+            content = f.read()
+    except FileNotFoundError:
+        console.print(f"[red]✗[/red] File not found: {spec_file}")
+        sys.exit(1)
     
-    table = Table(title="\nSupported Languages", box=box.ROUNDED, border_style="cyan")
-    table.add_column("Language", style="cyan bold", width=20)
-    table.add_column("ID", style="dim", width=12)
-    table.add_column("Features", style="white", width=40)
-    table.add_column("Status", justify="center", width=10)
-    
-    languages = [
-        ("Python", "python", "Type hints, async/await, dataclasses", "✓ Active", "green"),
-        ("JavaScript/TS", "javascript", "Promises, TypeScript definitions", "✓ Active", "green"),
-        ("Go", "go", "Context support, idiomatic Go", "✓ Active", "green"),
-        ("Rust", "rust", "Strong typing, async with Tokio", "✓ Active", "green"),
-        ("C#", "csharp", ".NET 8.0, async patterns", "⭐ New", "yellow"),
-        ("Java", "java", "Maven, OkHttp, builder pattern", "⭐ New", "yellow"),
-        ("PHP", "php", "PHP 8+, Composer, Guzzle", "⭐ New", "yellow"),
-        ("Ruby", "ruby", "Gems, Faraday, RSpec", "⏳ Soon", "blue"),
-        ("Swift", "swift", "SwiftPM, Alamofire, Codable", "⏳ Soon", "blue"),
-        ("Kotlin", "kotlin", "Coroutines, Ktor, Gradle", "⏳ Soon", "blue"),
-    ]
-    
-    for name, lang_id, features, status, color in languages:
-        table.add_row(name, lang_id, features, f"[{color}]{status}[/{color}]")
+    console.print(f"\n[blue]ℹ[/blue] Profiling [cyan]{language.upper()}[/cyan] generation of: [cyan]{spec_file}[/cyan]\n")
+    try:
+        with console.status("Generating client under the profiler..."):
+            result = profile_client(content, os.path.basename(spec_file), language.lower(),
+                                    interval=interval_ms / 1000, **options)
+    except Exception as e:
+        console.print(f"[red]✗[/red] Generation failed: {str(e)}\n")
+        sys.exit(1)
+    summary = result['summary']
     
-    console.print(table)
+    phases = Table(title="Phases", box=box.ROUNDED, border_style="blue")
+    phases.add_column("Phase", style="cyan")
+    phases.add_column("Seconds", justify="right")
+    phases.add_column("Share", justify="right")
+    for phase in summary['phases']:
+        phases.add_row(phase['phase'], f"{phase['seconds']:.3f}", f"{phase['percent']:.1f}%")
+    console.print(phases)
     
-    console.print("\n[bold]Usage:[/bold]")
-    console.print("  [dim]apigen generate spec.yaml -l python[/dim]\n")
+    functions = Table(title=f"Hottest Functions ({summary['samples']} samples)", box=box.ROUNDED, border_style="blue")
+    functions.add_column("Function", style="white")
+    functions.add_column("Self", justify="right")
+    functions.add_column("Total", justify="right")
+    for function in summary['functions'][:top]:
+        functions.add_row(function['function'], f"{function['self_percent']:.1f}%", f"{function['total_percent']:.1f}%")
+    console.print(functions)
+    
+    stacks_path = stacks_path or f"./{Path(spec_file).stem}_{language}.folded"
+    with open(stacks_path, 'w', encoding='utf-8') as f:
+        f.write(result['stacks'])
+    console.print(f"\n[cyan]Stacks:[/cyan] {stacks_path} [dim](flamegraph.pl, speedscope or inferno)[/dim]")
+    if archive_path:
+        with open(archive_path, 'wb') as f:
+            f.write(result['archive'])
+        console.print(f"[cyan]Output:[/cyan] {archive_path}")
+    console.print()
+
+def run_daemon(
+    socket_path: Optional[str] = None,
+    idle_timeout: Optional[float] = None,
+    background: bool = False,
+    status: bool = False,
+    stop: bool = False
+):
+    """Start, query or stop the warm generation daemon"""
+    from . import daemon
+    
+    if not daemon.SUPPORTED:
+        console.print("[red]✗[/red] The daemon needs Unix domain sockets, which this platform lacks; "
+                      "commands run in-process")
+        sys.exit(1)
+    path = Path(socket_path) if socket_path else daemon.socket_path()
+    if status or stop:
+        client = daemon.connect(path)
+        if client is None:
+            console.print(f"[yellow]ℹ[/yellow] No daemon is answering on {path}")
+            sys.exit(1)
+        result = client.request('stop' if stop else 'status')
+        if stop:
+            console.print(f"[green]✓[/green] Daemon on {path} stopped")
+            return
+        idle = f"{result['idle_timeout']:.0f}s" if result['idle_timeout'] else "none"
+        console.print(f"[green]✓[/green] Daemon {result['pid']} (v{result['version']}) on {result['socket']}")
+        console.print(f"  Uptime: {result['uptime']:.0f}s, {result['requests']} requests, "
+                      f"{result['specs']} specs in memory, idle timeout: {idle}")
+        return
+    
+    idle_timeout = daemon.DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    try:
+        if background:
+            with console.status("Starting the daemon..."):
+                pid = daemon.spawn(path, idle_timeout)
+            console.print(f"[green]✓[/green] Daemon {pid} listening on {path}")
+            return
+        
+        def log(message: str):
+            console.print(f"[dim]{time.strftime('%H:%M:%S')}[/dim] {message}")
+        
+        log("Warming up...")
+        server = daemon.DaemonServer(path, idle_timeout, log)
+    except daemon.DaemonError as e:
+        console.print(f"[red]✗[/red] {str(e)}")
+        sys.exit(1)
+    
+    log(f"Listening on {path} (Ctrl+C to stop)")
+    import signal
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    log("Stopped")
+
+# (name, id, features, status) of each language
+LANGUAGES = [
+    ("Python", "python", "Type hints, async/await, dataclasses", "✓ Active"),
+    ("JavaScript/TS", "javascript", "Promises, TypeScript definitions", "✓ Active"),
+    ("Go", "go", "Context support, idiomatic Go", "✓ Active"),
+    ("Rust", "rust", "Strong typing, async with Tokio", "✓ Active"),
+    ("C#", "csharp", ".NET 8.0, async patterns", "⭐ New"),
+    ("Java", "java", "Maven, OkHttp, builder pattern", "⭐ New"),
+    ("PHP", "php", "PHP 8+, Composer, Guzzle", "⭐ New"),
+    ("Ruby", "ruby", "Gems, Faraday, RSpec", "⏳ Soon"),
+    ("Swift", "swift", "SwiftPM, Alamofire, Codable", "⏳ Soon"),
+    ("Kotlin", "kotlin", "Coroutines, Ktor, Gradle", "⏳ Soon"),
+]
+
+def list_languages():
+    """List all supported languages
+    
+    Printed as plain text: importing rich would cost more than the command.
+    """
+    columns = ("Language", "ID", "Features", "Status")
+    widths = [max(len(row[i]) for row in LANGUAGES + [columns]) for i in range(len(columns))]
+    
+    def line(row: Tuple[str, ...]) -> str:
+        return "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+    
+    print("Universal API Client Generator - CLI Tool v1.0")
+    print("\nSupported Languages\n")
+    print(line(columns))
+    print(line(tuple("-" * width for width in widths)))
+    for row in LANGUAGES:
+        print(line(row))
+    print("\nUsage:")
+    print("  apigen generate spec.yaml -l python\n")
 
 def main():
     # Load configuration if available
@@ -267,6 +625,9 @@ Examples:
   # Watch mode - auto-regenerate on changes
   apigen watch openapi.yaml -l python
   
+  # Watch into a directory, rewriting only changed files
+  apigen watch openapi.yaml -l go --output-dir ./client
+  
   # Create example config file
   apigen init
   
@@ -275,6 +636,12 @@ Examples:
   
   # Validate OpenAPI spec
   apigen validate openapi.yaml
+  
+  # Profile a slow generation (writes a flamegraph-compatible stacks file)
+  apigen profile openapi.yaml -l java
+  
+  # Keep a warm engine in the background for faster generate/validate runs
+  apigen daemon --background
         """
     )
     
@@ -289,8 +656,9 @@ Examples:
     generate_parser.add_argument('-o', '--output', help='Output file path')
     generate_parser.add_argument('--tests', action='store_true', help='Include test files')
     generate_parser.add_argument('--no-docs', action='store_true', help='Exclude documentation')
-    generate_parser.add_argument('--api-url', help='API server URL')
+    generate_parser.add_argument('--api-url', help='API server URL (default: generate locally)')
     generate_parser.add_argument('-c', '--config', help='Path to config file')
+    generate_parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-spec cache')
     
     # Languages command
     subparsers.add_parser('languages', help='List all supported languages')
@@ -298,7 +666,8 @@ Examples:
     # Validate command
     validate_parser = subparsers.add_parser('validate', help='Validate OpenAPI specification')
     validate_parser.add_argument('spec_file', help='Path to OpenAPI specification file')
-    validate_parser.add_argument('--api-url', help='API server URL')
+    validate_parser.add_argument('--api-url', help='API server URL (default: validate locally)')
+    validate_parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-spec cache')
     
     # Watch command
     if HAS_WATCH:
@@ -306,11 +675,36 @@ Examples:
         watch_parser.add_argument('spec_file', help='Path to OpenAPI specification file')
         watch_parser.add_argument('-l', '--language', help='Target language')
         watch_parser.add_argument('-p', '--package', help='Package name')
-        watch_parser.add_argument('-o', '--output', help='Output file path')
+        watch_parser.add_argument('-o', '--output', help='Output ZIP file path')
+        watch_parser.add_argument('--output-dir',
+                                  help='Write the client into this directory instead of a ZIP, rewriting changed files only')
         watch_parser.add_argument('--tests', action='store_true', help='Include test files')
         watch_parser.add_argument('--no-docs', action='store_true', help='Exclude documentation')
-        watch_parser.add_argument('--api-url', help='API server URL')
+        watch_parser.add_argument('--api-url', help='API server URL (default: generate locally)')
         watch_parser.add_argument('--debounce', type=int, default=1000, help='Debounce time in ms (default: 1000)')
+        watch_parser.add_argument('--no-cache', action='store_true', help='Do not use the parsed-spec cache')
+    
+    # Profile command
+    profile_parser = subparsers.add_parser('profile', help='Profile local generation of a client')
+    profile_parser.add_argument('spec_file', help='Path to OpenAPI specification file')
+    profile_parser.add_argument('-l', '--language', help='Target language')
+    profile_parser.add_argument('-p', '--package', help='Package name')
+    profile_parser.add_argument('-o', '--output', help='Collapsed stacks file (default: <spec>_<language>.folded)')
+    profile_parser.add_argument('--archive', help='Also write the generated client archive to this path')
+    profile_parser.add_argument('--tests', action='store_true', help='Include test files')
+    profile_parser.add_argument('--no-docs', action='store_true', help='Exclude documentation')
+    profile_parser.add_argument('--interval', type=float, default=1.0, help='Milliseconds between samples (default: 1)')
+    profile_parser.add_argument('--top', type=int, default=15, help='Functions to list (default: 15)')
+    
+    # Daemon command
+    daemon_parser = subparsers.add_parser('daemon', help='Keep a warm engine running for local commands')
+    daemon_parser.add_argument('--socket', help='Unix socket path (default: $APIGEN_DAEMON_SOCKET, '
+                               'else in $XDG_RUNTIME_DIR or the temporary directory)')
+    daemon_parser.add_argument('--idle-timeout', type=float,
+                               help='Seconds without requests before exiting, 0 for never (default: 600)')
+    daemon_parser.add_argument('--background', action='store_true', help='Detach once the daemon is ready')
+    daemon_parser.add_argument('--status', action='store_true', help='Show the running daemon')
+    daemon_parser.add_argument('--stop', action='store_true', help='Stop the running daemon')
     
     # Init command
     init_parser = subparsers.add_parser('init', help='Create example configuration file')
@@ -322,6 +716,12 @@ Examples:
         parser.print_help()
         sys.exit(0)
     
+    def cache_settings() -> Dict[str, Any]:
+        settings = config.get_cache_config() if config else {}
+        if getattr(args, 'no_cache', False):
+            settings = {**settings, 'enabled': False}
+        return settings
+    
     if args.command == 'generate':
         # Load config if specified
         if hasattr(args, 'config') and args.config and HAS_CONFIG:
@@ -334,7 +734,7 @@ Examples:
             sys.exit(1)
         
         package_name = args.package or (config.get_package_name() if config else None) or 'api_client'
-        api_url = args.api_url or (config.get_api_url() if config else None) or 'http://localhost:8000'
+        api_url = args.api_url or (config.get_api_url() if config else None)
         include_tests = args.tests or (config.get_include_tests() if config else False)
         include_docs = not args.no_docs and (config.get_include_docs() if config else True)
         
@@ -345,14 +745,16 @@ Examples:
             package_name=package_name,
             include_tests=include_tests,
             include_docs=include_docs,
-            api_url=api_url
+            api_url=api_url,
+            cache=cache_settings(),
+            template_dir=config.get_custom_templates() if config else None
         )
     elif args.command == 'languages':
         list_languages()
     elif args.command == 'validate':
-        api_url = args.api_url or (config.get_api_url() if config else None) or 'http://localhost:8000'
+        api_url = args.api_url or (config.get_api_url() if config else None)
         print_header()
-        if validate_spec(args.spec_file, api_url):
+        if validate_spec(args.spec_file, api_url, cache_settings()):
             console.print()
             sys.exit(0)
         else:
@@ -372,23 +774,76 @@ Examples:
             sys.exit(1)
         
         package_name = args.package or (config.get_package_name() if config else None) or 'api_client'
-        api_url = args.api_url or (config.get_api_url() if config else None) or 'http://localhost:8000'
+        api_url = args.api_url or (config.get_api_url() if config else None)
+        
+        local = use_local_engine(api_url)
+        if args.output_dir and not local:
+            console.print("[red]✗[/red] --output-dir requires the local engine (drop --api-url)")
+            sys.exit(1)
         
         # Create callback function
-        def regenerate():
-            generate_client(
+        if local:
+            # Keep the parse and rendered code between saves; write only what changed
+            regenerate = incremental_regenerate(
                 spec_file=args.spec_file,
                 language=language,
-                output_dir=args.output,
+                output=args.output_dir or args.output or f"./{package_name}_{language}.zip",
+                archive=not args.output_dir,
                 package_name=package_name,
                 include_tests=args.tests,
                 include_docs=not args.no_docs,
-                api_url=api_url
+                template_dir=config.get_custom_templates() if config else None
             )
+            try:
+                regenerate()
+            except Exception as e:
+                console.print(f"[red]✗[/red] Initial generation failed: {str(e)}\n")
+        else:
+            def regenerate():
+                generate_client(
+                    spec_file=args.spec_file,
+                    language=language,
+                    output_dir=args.output,
+                    package_name=package_name,
+                    include_tests=args.tests,
+                    include_docs=not args.no_docs,
+                    api_url=api_url,
+                    cache=cache_settings(),
+                    template_dir=config.get_custom_templates() if config else None
+                )
         
         # Start watching
+        from .watch import watch_spec
         watch_spec(args.spec_file, regenerate, args.debounce)
     
+    elif args.command == 'profile':
+        language = args.language or (config.get_default_language() if config else None)
+        if not language:
+            console.print("[red]✗[/red] Language is required. Use -l or set default_language in config.")
+            sys.exit(1)
+        
+        profile_spec(
+            spec_file=args.spec_file,
+            language=language,
+            stacks_path=args.output,
+            archive_path=args.archive,
+            interval_ms=args.interval,
+            top=args.top,
+            package_name=args.package or (config.get_package_name() if config else None) or 'api_client',
+            include_tests=args.tests,
+            include_docs=not args.no_docs,
+            template_dir=config.get_custom_templates() if config else None
+        )
+    
+    elif args.command == 'daemon':
+        run_daemon(
+            socket_path=args.socket,
+            idle_timeout=args.idle_timeout,
+            background=args.background,
+            status=args.status,
+            stop=args.stop
+        )
+    
     elif args.command == 'init':
         if not HAS_CONFIG:
             console.print("[red]✗[/red] Config support requires 'pyyaml' package")
@@ -2,7 +2,6 @@
 Configuration file support for apigen CLI
 """
 import os
-import yaml
 from typing import Optional, Dict, Any
 from pathlib import Path
 
@@ -44,6 +43,8 @@ class Config:
     
     def _load_from_file(self, path: Path):
         """Load configuration from YAML file"""
+        import yaml
+        
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 self.config_data = yaml.safe_load(f) or {}
@@ -76,14 +77,24 @@ class Config:
         """Get whether to include docs by default"""
         return self.get('include_docs', True)
     
-    def get_api_url(self) -> str:
-        """Get API server URL"""
-        return self.get('api_url', 'http://localhost:8000')
+    def get_api_url(self) -> Optional[str]:
+        """Get API server URL (None = generate with the local engine)"""
+        return self.get('api_url')
     
     def get_custom_templates(self) -> Optional[str]:
         """Get custom templates directory"""
         return self.get('custom_templates')
     
+    def get_cache_config(self) -> Dict[str, Any]:
+        """Get parsed-spec cache configuration"""
+        cache = {
+            'enabled': True,
+            'dir': None,  # None = ~/.cache/apigen/specs
+            'max_size_mb': 256
+        }
+        cache.update(self.get('cache') or {})
+        return cache
+    
     def get_retry_config(self) -> Dict[str, Any]:
         """Get retry configuration"""
         return self.get('retry', {
@@ -120,12 +131,18 @@ include_tests: true
 # Include documentation by default
 include_docs: true
 
-# API server URL
-api_url: http://localhost:8000
+# API server URL. Leave unset to generate in-process with the local engine
+# api_url: http://localhost:8000
 
 # Custom templates directory (optional)
 # custom_templates: ./templates
 
+# Parsed-spec cache: unchanged specs are not re-parsed
+cache:
+  enabled: true
+  # dir: ~/.cache/apigen/specs
+  max_size_mb: 256
+
 # Retry configuration
 retry:
   max_attempts: 3
@@ -0,0 +1,392 @@
+"""
+Warm generation daemon for the CLI
+
+Every ``apigen`` invocation pays for starting Python, importing the generator
+backend and loading the templates before it renders anything. ``apigen
+daemon`` pays once: it keeps the backend imported, the templates compiled and
+recently parsed specs in memory, and serves the ``validate`` and local
+``generate`` commands of other invocations over a Unix socket. Invocations
+use a daemon when one answers and work in-process otherwise.
+
+The protocol is one JSON object per line. A connection opens with a hello
+carrying the protocol version, the CLI version and the stamp of the CLI and
+backend sources (``backend.backend_fingerprint``); a daemon that differs in
+any of them refuses and shuts down, so no invocation gets output from stale
+code. One request and its response follow. Requests are served one at a time
+(rendering holds the GIL anyway); an invocation that cannot get an answer to
+its hello within ``CONNECT_TIMEOUT`` works in-process instead of queueing.
+The daemon exits after ``idle_timeout`` seconds without a connection.
+
+The daemon needs Unix domain sockets; where they are missing (Windows),
+``SUPPORTED`` is false and every invocation works in-process.
+"""
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional
+
+from . import __version__
+from .backend import (backend_fingerprint, ensure_backend_path, parse_spec_content, source_stamp,
+                      validation_result)
+
+PROTOCOL_VERSION = 1
+
+SUPPORTED = hasattr(socket, 'AF_UNIX')
+
+# Seconds without a connection before the daemon exits (0: never)
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+# Parsed specs kept in memory; the least recently used is dropped first
+MAX_SPECS = 64
+
+# Seconds an invocation waits for a daemon to answer its hello
+CONNECT_TIMEOUT = 2.0
+
+# Seconds the daemon waits for an invocation to send its hello or request
+REQUEST_TIMEOUT = 10.0
+
+# Seconds `apigen daemon --background` waits for the daemon to warm up
+STARTUP_TIMEOUT = 60.0
+
+
+class DaemonError(Exception):
+    """A request the daemon could not serve"""
+
+
+def socket_path() -> Path:
+    """``$APIGEN_DAEMON_SOCKET``, else ``apigen-daemon.sock`` in ``$XDG_RUNTIME_DIR``
+    or in a private directory under the temporary directory"""
+    if os.environ.get('APIGEN_DAEMON_SOCKET'):
+        return Path(os.environ['APIGEN_DAEMON_SOCKET'])
+    if os.environ.get('XDG_RUNTIME_DIR'):
+        return Path(os.environ['XDG_RUNTIME_DIR']) / 'apigen-daemon.sock'
+    return private_directory() / 'daemon.sock'
+
+
+def private_directory() -> Path:
+    """``apigen-<uid>`` in the temporary directory, shared with every other user"""
+    return Path(tempfile.gettempdir()) / f"apigen-{os.getuid()}"
+
+
+def ensure_private(directory: Path):
+    """Create a directory only this user can enter, or check that an existing one is
+
+    Anyone can create ``private_directory()`` first; a daemon binding in a
+    directory another user controls would serve that user's connections.
+    """
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = directory.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise DaemonError(f"{directory} is not a directory private to this user (owner and mode 0700); "
+                          f"remove it or set APIGEN_DAEMON_SOCKET")
+
+
+def hello() -> Dict[str, Any]:
+    """The handshake identifying the code of this invocation"""
+    return {
+        'op': 'hello',
+        'protocol': PROTOCOL_VERSION,
+        'version': __version__,
+        'fingerprint': backend_fingerprint()
+    }
+
+
+def _send(stream: BinaryIO, message: Dict[str, Any]):
+    stream.write(json.dumps(message, default=str).encode('utf-8') + b'\n')
+    stream.flush()
+
+
+def _receive(stream: BinaryIO) -> Dict[str, Any]:
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    return json.loads(line)
+
+
+class DaemonClient:
+    """A connection to a daemon that accepted the handshake; it serves one request"""
+
+    def __init__(self, sock: socket.socket):
+        self._socket = sock
+        self._stream = sock.makefile('rwb')
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Send a request and return the response. Raises DaemonError if it failed"""
+        # Generation takes as long as it takes once the daemon is on it
+        self._socket.settimeout(None)
+        try:
+            _send(self._stream, {'op': op, **fields})
+            response = _receive(self._stream)
+        finally:
+            self.close()
+        if 'error' in response:
+            raise DaemonError(response['error'])
+        return response
+
+    def close(self):
+        self._stream.close()
+        self._socket.close()
+
+
+def connect(path: Optional[Path] = None) -> Optional[DaemonClient]:
+    """A client of the daemon at path, or None if none answers or it runs other code"""
+    if not SUPPORTED:
+        return None
+    path = path or socket_path()
+    try:
+        info = path.lstat()
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        # Not a socket this user's daemon bound; never send it a spec
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+        client = DaemonClient(sock)
+        _send(client._stream, hello())
+        answer = _receive(client._stream)
+    except (OSError, ValueError):
+        # No daemon behind the socket file, or it is busy
+        sock.close()
+        return None
+    if not answer.get('ok'):
+        client.close()
+        return None
+    return client
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    """Handshake, then one request"""
+
+    # A stalled invocation must not hold up the ones queued behind it
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self):
+        server: DaemonServer = self.server
+        try:
+            refusal = server.refusal(_receive(self.rfile))
+            if refusal:
+                _send(self.wfile, {'ok': False, 'error': refusal})
+                # The invocation runs other code than this daemon; it is stale
+                server.log(f"Stopping: {refusal}")
+                server.stop()
+                return
+            _send(self.wfile, {'ok': True, 'pid': os.getpid()})
+            request = _receive(self.rfile)
+            started = time.perf_counter()
+            try:
+                response = server.dispatch(request)
+            except FileNotFoundError as e:
+                response = {'error': f"File not found: {e.filename}"}
+            except Exception as e:
+                response = {'error': str(e) or type(e).__name__}
+            server.log(f"{request.get('op')} {request.get('spec_file', '')} "
+                       f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+            _send(self.wfile, response)
+        except (OSError, ValueError):
+            # The invocation went away or sent garbage; nothing to answer
+            pass
+
+
+class DaemonServer(socketserver.UnixStreamServer if SUPPORTED else socketserver.BaseServer):
+    """Serves invocations from warm state until stopped or idle
+
+    Fails with DaemonError if another daemon answers on path; a socket file
+    left by a daemon that died is replaced. With ``warm`` the backend is
+    imported and the built-in templates compiled before the socket is bound,
+    so no invocation waits on the warm-up.
+    """
+
+    def __init__(self, path: Optional[Path] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 log: Optional[Callable[[str], None]] = None, warm: bool = True):
+        if not SUPPORTED:
+            raise DaemonError("The daemon needs Unix domain sockets, which this platform lacks")
+        self.path = path or socket_path()
+        self.log = log or (lambda message: None)
+        self.timeout = idle_timeout or None
+        self.fingerprint = backend_fingerprint()
+        if self.fingerprint is None:
+            raise DaemonError("The daemon requires the generator backend (set APIGEN_BACKEND_DIR)")
+        self.started = time.time()
+        self.requests = 0
+        self.specs: 'OrderedDict[str, Any]' = OrderedDict()
+        self._template_stamps: Dict[str, str] = {}
+        self._stopping = False
+
+        if self.path.parent == private_directory():
+            ensure_private(self.path.parent)
+        else:
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.path.exists():
+            client = connect(self.path)
+            if client is not None:
+                client.close()
+                raise DaemonError(f"A daemon is already running on {self.path}")
+            self.path.unlink()
+        if warm:
+            self.log(f"Compiled {self.warm_up()} templates")
+        super().__init__(str(self.path), DaemonHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        # Only this user may connect, whatever the directory and umask
+        os.chmod(self.path, 0o600)
+
+    def warm_up(self) -> int:
+        """Import the backend and compile the built-in templates. Returns the template count"""
+        ensure_backend_path()
+        import generators  # noqa: F401
+        from templates import preload
+        return len(preload())
+
+    def serve(self):
+        """Handle connections until stopped or idle for ``timeout`` seconds"""
+        try:
+            while not self._stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def handle_timeout(self):
+        self.log(f"Idle for {self.timeout:.0f}s, stopping")
+        self.stop()
+
+    def stop(self):
+        self._stopping = True
+
+    def refusal(self, greeting: Dict[str, Any]) -> Optional[str]:
+        """Why a handshake is refused, or None to accept it"""
+        if greeting.get('op') != 'hello':
+            return "Expected a hello"
+        if greeting.get('protocol') != PROTOCOL_VERSION:
+            return f"Protocol {greeting.get('protocol')} differs from the daemon's ({PROTOCOL_VERSION})"
+        if greeting.get('version') != __version__:
+            return f"Version {greeting.get('version')} differs from the daemon's ({__version__})"
+        if greeting.get('fingerprint') != self.fingerprint:
+            return "The CLI or backend sources changed since the daemon started"
+        return None
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests += 1
+        op = request.get('op')
+        if op == 'validate':
+            return validation_result(self.parse(request['spec_file'], request.get('cache')))
+        if op == 'generate':
+            return self.generate(request)
+        if op == 'status':
+            return {
+                'pid': os.getpid(),
+                'version': __version__,
+                'socket': str(self.path),
+                'uptime': round(time.time() - self.started, 1),
+                'requests': self.requests,
+                'specs': len(self.specs),
+                'idle_timeout': self.timeout or 0
+            }
+        if op == 'stop':
+            self.stop()
+            return {'stopped': True}
+        raise DaemonError(f"Unknown request: {op}")
+
+    def parse(self, spec_file: str, cache: Optional[Dict[str, Any]] = None):
+        """The parsed spec of a file, from memory when its contents were seen before
+
+        A disabled parse cache bypasses the in-memory one too.
+        """
+        content = Path(spec_file).read_bytes()
+        if not (cache or {}).get('enabled', True):
+            return parse_spec_content(content, cache)
+        key = hashlib.sha256(content).hexdigest()
+        entry = self.specs.pop(key, None)
+        if entry is None:
+            entry = parse_spec_content(content, cache)
+        self.specs[key] = entry
+        while len(self.specs) > MAX_SPECS:
+            self.specs.popitem(last=False)
+        return entry
+
+    def generate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a client archive to ``output``; paths are absolute"""
+        from .backend import stream_client
+        from .cli import write_zip
+
+        entry = self.parse(request['spec_file'], request.get('cache'))
+        result = validation_result(entry)
+        if not result['valid']:
+            return result
+        template_dir = request.get('template_dir')
+        self.refresh_templates(template_dir)
+        started = time.perf_counter()
+        files, size = write_zip(stream_client(
+            entry.parsed,
+            request['language'],
+            package_name=request.get('package_name', 'api_client'),
+            include_tests=request.get('include_tests', False),
+            include_docs=request.get('include_docs', True),
+            template_dir=template_dir
+        ), request['output'])
+        return {**result, 'files': files, 'bytes': size, 'seconds': time.perf_counter() - started}
+
+    def refresh_templates(self, template_dir: Optional[str]):
+        """Drop compiled templates when a custom template directory changed
+
+        Template environments never reload sources, which suits one-shot
+        invocations; the daemon checks custom directories itself. Built-in
+        templates are covered by the handshake fingerprint.
+        """
+        if not template_dir:
+            return
+        stamp = source_stamp(Path(template_dir))
+        if self._template_stamps.get(template_dir, stamp) != stamp:
+            from templates import get_environment
+            get_environment.cache_clear()
+            self.log(f"Templates in {template_dir} changed, reloading")
+        self._template_stamps[template_dir] = stamp
+
+
+def spawn(path: Optional[Path] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> int:
+    """Start a daemon in a detached process. Returns its pid once it answers"""
+    if not SUPPORTED or not hasattr(os, 'fork'):
+        raise DaemonError("A background daemon needs Unix domain sockets and fork, which this platform lacks")
+    path = path or socket_path()
+    pid = os.fork()
+    if pid == 0:
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        # `kill` stops it like the idle timeout does, removing the socket file
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        status = 1
+        try:
+            DaemonServer(path, idle_timeout).serve()
+            status = 0
+        finally:
+            os._exit(status)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if os.waitpid(pid, os.WNOHANG)[0]:
+            raise DaemonError("The daemon exited during startup (is one already running?)")
+        client = connect(path)
+        if client is not None:
+            client.close()
+            return pid
+        time.sleep(0.05)
+    raise DaemonError(f"The daemon did not answer within {STARTUP_TIMEOUT:.0f}s")
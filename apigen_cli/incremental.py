@@ -0,0 +1,182 @@
+"""
+Incremental regeneration for watch mode
+
+An IncrementalBuild keeps the previous spec, parse result and generated files
+in memory. On each save it diffs the new spec against the previous one,
+re-parses only the changed operations, skips rendering when the edit does not
+touch a section the generator reads, and rewrites only the output files whose
+content hash changed (through the backend's ``OutputWriter``, which also keeps
+the on-disk manifest). Built into a ZIP archive instead (``archive=True``), it
+rewrites the archive when any file's content changed. When it does render, the client model of unchanged
+operations and models is kept, and so are their rendered fragments: an edit
+to one operation re-renders that operation plus the files assembling the
+fragments, not every operation of the spec. Requires the generator backend.
+"""
+import hashlib
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .backend import generator_class, make_generator
+
+
+class BuildResult(NamedTuple):
+    """Outcome of one incremental build"""
+    errors: List[str]
+    rendered: bool
+    written: List[str]
+    removed: List[str]
+    unchanged: int
+    seconds: float
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class ArchiveWriter:
+    """Bring a ZIP archive up to date with a generated client
+
+    Has the interface of the backend's ``OutputWriter``. The archive is
+    rewritten as a whole, and only when the content of a file changed since
+    the last write (or the archive is missing).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        # Content hash of each file in the archive, by path
+        self.hashes: Dict[str, str] = {}
+
+    def write(self, files: Iterable[Tuple[str, str]]):
+        from engine.output import OutputReport
+        from .cli import write_zip
+
+        files = list(files)
+        hashes = {file_path: content_hash(content.encode('utf-8')) for file_path, content in files}
+        added = [file_path for file_path in hashes if file_path not in self.hashes]
+        changed = [file_path for file_path, digest in hashes.items()
+                   if file_path in self.hashes and self.hashes[file_path] != digest]
+        removed = [file_path for file_path in self.hashes if file_path not in hashes]
+        size = 0
+        if added or changed or removed or not self.path.exists():
+            _, size = write_zip(files, str(self.path))
+        self.hashes = hashes
+        return OutputReport(added, changed, removed, len(hashes) - len(added) - len(changed), size)
+
+
+class IncrementalBuild:
+    """Regenerate one client into a directory or ZIP archive, reusing the previous build"""
+
+    def __init__(
+        self,
+        spec_file: str,
+        language: str,
+        output: str,
+        package_name: str = 'api_client',
+        include_tests: bool = False,
+        include_docs: bool = True,
+        template_dir: Optional[str] = None,
+        archive: bool = False
+    ):
+        # Also puts the backend on sys.path
+        sections = generator_class(language).sections
+        from engine.output import OutputWriter
+        from parsers.incremental import IncrementalParser
+
+        self.spec_file = Path(spec_file)
+        self.language = language
+        self.output = Path(output)
+        self.package_name = package_name
+        self.include_tests = include_tests
+        self.include_docs = include_docs
+        self.template_dir = template_dir
+        self.sections = frozenset(sections)
+        self.parser = IncrementalParser()
+        self.spec_hash: Optional[str] = None
+        self.writer = ArchiveWriter(self.output) if archive else OutputWriter(self.output)
+        # Files of the last build, or None before the first one
+        self.files: Optional[int] = None
+        # Rendered operations and models of the last build (see BaseGenerator.render_specs)
+        self.fragments: Dict[Any, str] = {}
+        # Client model of the last build: the schema analysis and models of its
+        # components, and the spec of each parsed operation by identity
+        self.components: Optional[Dict[str, Any]] = None
+        self.schema_types = None
+        self.models: tuple = ()
+        self.operation_specs: Dict[int, tuple] = {}
+
+    def run(self) -> BuildResult:
+        """Bring the output up to date with the spec file"""
+        from parsers.spec_loader import gc_paused
+
+        # Collections would rescan the previous build's objects; let them
+        # happen after the output is written instead
+        with gc_paused():
+            return self._run()
+
+    def _run(self) -> BuildResult:
+        from parsers.spec_loader import load_spec
+
+        start = time.perf_counter()
+        content = self.spec_file.read_bytes()
+        spec_hash = content_hash(content)
+        if spec_hash == self.spec_hash and self.files is not None:
+            return BuildResult([], False, [], [], self.files, time.perf_counter() - start)
+
+        try:
+            spec = load_spec(content)
+        except Exception as e:
+            return BuildResult([f"Failed to load spec: {str(e)}"], False, [], [], 0, time.perf_counter() - start)
+        errors, parsed, delta = self.parser.update(spec)
+        if errors:
+            self.spec_hash = None
+            return BuildResult(errors, False, [], [], 0, time.perf_counter() - start)
+        self.spec_hash = spec_hash
+
+        if self.files is not None and not (delta.sections & self.sections):
+            return BuildResult([], False, [], [], self.files, time.perf_counter() - start)
+
+        generator = make_generator(
+            self.client_model(parsed),
+            language=self.language,
+            package_name=self.package_name,
+            include_tests=self.include_tests,
+            include_docs=self.include_docs,
+            template_dir=self.template_dir,
+            fragments=self.fragments
+        )
+        files = generator.generate()
+        self.fragments = generator.fragments
+        report = self.writer.write(files.items())
+        self.files = report.files
+        return BuildResult([], True, report.written, report.removed, report.unchanged,
+                           time.perf_counter() - start)
+
+    def client_model(self, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """The parse result with its client model, reusing that of unchanged parts
+
+        The incremental parser hands back the previous operation objects for
+        unchanged operations and the previous components unless they changed.
+        """
+        from generators.client_model import ClientModel, model_spec, operation_spec
+        from generators.types import SchemaTypes
+
+        components = parsed.get("components") or {}
+        if components is not self.components:
+            self.components = components
+            self.schema_types = SchemaTypes(components)
+            self.models = tuple(model_spec(name, schema, self.schema_types)
+                                for name, schema in (components.get("schemas") or {}).items())
+            self.operation_specs = {}
+
+        previous = self.operation_specs
+        self.operation_specs = {}
+        operations = []
+        for operation in parsed.get("paths") or ():
+            # The operation is kept alongside so its id cannot be reused
+            cached = previous.get(id(operation))
+            if cached is None or cached[0] is not operation:
+                cached = (operation, operation_spec(operation, self.schema_types))
+            self.operation_specs[id(operation)] = cached
+            operations.append(cached[1])
+        return {**parsed, "client_model": ClientModel(tuple(operations), self.models)}
@@ -0,0 +1,73 @@
+"""
+HTTP transport of the remote engine
+
+All requests of a process go through one ``requests.Session``, so the
+connection to the server is reused by the submit, poll and download requests
+of a command, and by every regeneration in watch mode or a batch script.
+Specs are uploaded as multipart/form-data streamed from the file in chunks
+and gzip-compressed on the way (``Content-Encoding: gzip``); the server
+inflates them as they arrive (``engine.compression``). Neither the spec nor
+the request body is ever held in memory whole.
+"""
+import os
+import uuid
+import zlib
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional
+
+import requests
+
+# Bytes read from the spec file at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# zlib level of uploads; specs are repetitive text, and level 9 saves only a few percent more
+COMPRESSION_LEVEL = 6
+
+
+@lru_cache(maxsize=None)
+def session() -> requests.Session:
+    """The session shared by all requests of this process (pooled keep-alive connections)"""
+    return requests.Session()
+
+
+def multipart_chunks(spec: BinaryIO, filename: str, fields: Dict[str, Any], boundary: str) -> Iterator[bytes]:
+    """A multipart/form-data body with the form fields and the spec as ``file``"""
+    for name, value in fields.items():
+        yield (f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+               f'{value}\r\n').encode('utf-8')
+    filename = filename.replace('"', '%22').replace('\r', '').replace('\n', '')
+    yield (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+           f'Content-Type: application/octet-stream\r\n\r\n').encode('utf-8')
+    while True:
+        chunk = spec.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+    yield f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = COMPRESSION_LEVEL) -> Iterator[bytes]:
+    """Compress a stream of chunks into one gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def upload(url: str, spec_file: str, fields: Optional[Dict[str, Any]] = None,
+           compress: bool = True, timeout: float = 60) -> requests.Response:
+    """POST a spec file with form fields as a streamed, compressed multipart upload
+
+    Raises FileNotFoundError before sending anything if the spec is missing.
+    """
+    boundary = uuid.uuid4().hex
+    headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+    with open(spec_file, 'rb') as spec:
+        body = multipart_chunks(spec, os.path.basename(spec_file), fields or {}, boundary)
+        if compress:
+            body = gzip_chunks(body)
+            headers['Content-Encoding'] = 'gzip'
+        # A generator body is sent with chunked transfer encoding as it is produced
+        return session().post(url, data=body, headers=headers, timeout=timeout)
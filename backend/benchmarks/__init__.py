@@ -0,0 +1,4 @@
+"""Benchmarks for the generator backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.engine_load``.
+"""
@@ -0,0 +1,90 @@
+"""
+Start-up-to-output time of the command-line client per engine mode.
+
+Runs ``apigen generate`` as a fresh process, the way a user or a CI job would,
+and times it until the ZIP is on disk: once with the in-process local engine
+and once against a running API server (``--api-url``). The server is started
+and warmed up beforehand so only the client's round trip is measured. The
+parsed-spec cache and the daemon are disabled so every local run parses the
+spec.
+
+Usage (from the backend directory):
+    python -m benchmarks.cli_modes --operations 50,2000 --repeat 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+from .engine_load import wait_for_server
+from .synthetic import make_spec, dump_spec
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = BACKEND_DIR.parent
+
+
+def run_cli(spec_path: Path, output_path: Path, language: str, api_url: str = None) -> float:
+    """Run one ``apigen generate`` process; returns wall-clock seconds"""
+    command = [sys.executable, "-m", "apigen_cli.cli", "generate", str(spec_path),
+               "-l", language, "-o", str(output_path), "--no-cache"]
+    if api_url:
+        command += ["--api-url", api_url]
+    # A running `apigen daemon` would serve the local runs warm
+    env = dict(os.environ, PYTHONPATH=str(REPO_DIR), APIGEN_NO_DAEMON="1")
+
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=str(output_path.parent), env=env, capture_output=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0 or not output_path.exists():
+        raise RuntimeError(f"apigen generate failed:\n{result.stdout.decode()}{result.stderr.decode()}")
+    output_path.unlink()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare local and remote CLI generation time")
+    parser.add_argument("--operations", default="50,2000",
+                        help="Comma-separated operation counts (default: 50,2000)")
+    parser.add_argument("--language", default="python", help="Target language (default: python)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is kept (default: 3)")
+    parser.add_argument("--port", type=int, default=8766, help="Port for the benchmark server")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=str(BACKEND_DIR)
+    )
+    try:
+        wait_for_server(base_url)
+        # Warm the worker pool so process start-up is not counted
+        requests.post(
+            f"{base_url}/api/generate",
+            files={"file": ("spec.yaml", b"openapi: 3.0.0\ninfo: {title: t}\npaths: {/a: {get: {}}}")},
+            data={"language": args.language}
+        )
+
+        print(f"{'operations':>10} {'local s':>8} {'remote s':>9}")
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            for operations in (int(n) for n in args.operations.split(",")):
+                spec_path = workdir / f"spec_{operations}.yaml"
+                spec_path.write_bytes(dump_spec(make_spec(operations=operations), "yaml"))
+                output_path = workdir / "client.zip"
+
+                local = min(run_cli(spec_path, output_path, args.language) for _ in range(args.repeat))
+                remote = min(run_cli(spec_path, output_path, args.language, base_url)
+                             for _ in range(args.repeat))
+                print(f"{operations:>10} {local:>8.3f} {remote:>9.3f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Load benchmark for the generation engine.
+
+Starts the API server, fires concurrent /api/generate uploads and probes
+/health while they run, then reports /health latency percentiles. With
+generation running on the event loop /health stalls for the duration of every
+job; with the engine it should stay in the low milliseconds.
+
+Usage (from the backend directory):
+    python -m benchmarks.engine_load --jobs 32 --operations 2000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import requests
+
+from .synthetic import make_spec, dump_spec
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.exceptions.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /health latency under generation load")
+    parser.add_argument("--jobs", type=int, default=32, help="Concurrent generations (default: 32)")
+    parser.add_argument("--operations", type=int, default=2000, help="Operations per spec (default: 2000)")
+    parser.add_argument("--language", default="python", help="Target language (default: python)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the benchmark server")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between /health probes")
+    args = parser.parse_args()
+
+    spec_bytes = dump_spec(make_spec(operations=args.operations), "yaml")
+    base_url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, GENERATION_QUEUE_DEPTH=str(max(args.jobs, 32)))
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=str(BACKEND_DIR),
+        env=env
+    )
+    try:
+        wait_for_server(base_url)
+        # Warm the worker pool so process start-up is not counted
+        requests.post(
+            f"{base_url}/api/generate",
+            files={"file": ("spec.yaml", b"openapi: 3.0.0\ninfo: {title: t}\npaths: {/a: {get: {}}}")},
+            data={"language": args.language}
+        )
+
+        latencies: List[float] = []
+        statuses: List[int] = []
+        done = threading.Event()
+
+        def probe():
+            session = requests.Session()
+            while not done.is_set():
+                start = time.perf_counter()
+                session.get(f"{base_url}/health")
+                latencies.append((time.perf_counter() - start) * 1000)
+                time.sleep(args.interval)
+
+        def generate(_):
+            response = requests.post(
+                f"{base_url}/api/generate",
+                files={"file": ("spec.yaml", spec_bytes)},
+                data={"language": args.language},
+                timeout=600
+            )
+            statuses.append(response.status_code)
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            list(pool.map(generate, range(args.jobs)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        prober.join()
+
+        print(f"spec size:        {len(spec_bytes) / 1024 / 1024:.2f} MB ({args.operations} operations)")
+        print(f"generations:      {args.jobs} in {elapsed:.2f}s ({statuses.count(200)} ok)")
+        print(f"/health probes:   {len(latencies)}")
+        for pct in (50, 90, 99):
+            print(f"/health p{pct}:      {percentile(latencies, pct):.1f} ms")
+        print(f"/health max:      {max(latencies) if latencies else 0:.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
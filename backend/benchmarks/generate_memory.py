@@ -0,0 +1,87 @@
+"""
+Peak memory of generating and archiving a client.
+
+Parses a synthetic spec, then archives the generated client two ways: from
+``generate()``, which holds every file of the package at once, and from
+``stream()``, which hands over ``(path, chunk)`` pieces as they are rendered.
+Only allocations made after parsing are counted (tracemalloc), so the figure
+is the generation overhead on top of the parsed spec. Each mode runs in a
+fresh interpreter.
+
+Usage (from the backend directory):
+    python -m benchmarks.generate_memory --operations 20000 --language python
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from engine.tasks import GENERATOR_CLASSES
+from engine.zipstream import iter_zip
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+
+def run_mode(mode: str, operations: int, language: str) -> dict:
+    parsed = OpenAPIParser(make_spec(operations=operations)).parse(compact=True)
+    generator = GENERATOR_CLASSES[language](parsed, "bench_client")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    sizes = {}
+    archive_bytes = 0
+    if mode == "dict":
+        files = generator.generate()
+        sizes = {path: len(content) for path, content in files.items()}
+        pieces = files.items()
+    else:
+        def pieces_with_sizes():
+            for path, chunk in generator.stream():
+                sizes[path] = sizes.get(path, 0) + len(chunk)
+                yield path, chunk
+        pieces = pieces_with_sizes()
+    for chunk in iter_zip(pieces):
+        archive_bytes += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 3),
+        "files": len(sizes),
+        "package_mb": round(sum(sizes.values()) / 1024 / 1024, 2),
+        "largest_file_mb": round(max(sizes.values()) / 1024 / 1024, 2),
+        "archive_mb": round(archive_bytes / 1024 / 1024, 2),
+        "peak_mb": round(peak / 1024 / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare generation memory use")
+    parser.add_argument("--operations", type=int, default=20000, help="Operations in the spec (default: 20000)")
+    parser.add_argument("--language", default="python", choices=sorted(GENERATOR_CLASSES),
+                        help="Target language (default: python)")
+    parser.add_argument("--mode", choices=["dict", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.operations, args.language)))
+        return
+
+    for mode in ("dict", "stream"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.generate_memory", "--mode", mode,
+             "--operations", str(args.operations), "--language", args.language],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        print(f"{mode:6} peak +{result['peak_mb']:>7} MB  total {result['seconds']:>6}s  "
+              f"{result['files']} files, {result['package_mb']} MB "
+              f"(largest {result['largest_file_mb']} MB), archive {result['archive_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Memory footprint of the parsed-spec IR.
+
+Parses a synthetic spec into the dict IR and into the compact slotted IR
+(``parse(compact=True)``) and reports, via tracemalloc, how much memory each
+result retains once the parser is gone, next to the size of the source
+document itself. Pickled size (what batch workers receive) is reported too.
+
+Usage (from the backend directory):
+    python -m benchmarks.ir_memory --operations 12000
+"""
+import argparse
+import gc
+import pickle
+import time
+import tracemalloc
+
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+
+def retained(build) -> tuple:
+    """Build an object under tracemalloc and return it with its retained and peak bytes"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dict and compact IR memory use")
+    parser.add_argument("--operations", type=int, default=12000, help="Operations in the spec (default: 12000)")
+    parser.add_argument("--schemas", type=int, default=500, help="Component schemas (default: 500)")
+    args = parser.parse_args()
+
+    spec, spec_bytes, _, _ = retained(lambda: make_spec(operations=args.operations, schemas=args.schemas))
+    print(f"{args.operations} operations, {args.schemas} schemas; source document {spec_bytes / 1024 / 1024:.1f} MB")
+    print(f"{'IR':8} {'retained MB':>12} {'peak MB':>8} {'parse s':>8} {'pickle MB':>10} {'vs source':>10}")
+
+    for label, compact in (("dict", False), ("compact", True)):
+        parsed, current, peak, seconds = retained(lambda: OpenAPIParser(spec).parse(compact=compact))
+        pickled = len(pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"{label:8} {current / 1024 / 1024:>12.1f} {peak / 1024 / 1024:>8.1f} {seconds:>8.2f} "
+              f"{pickled / 1024 / 1024:>10.1f} {current / spec_bytes:>9.2f}x")
+        del parsed
+
+
+if __name__ == "__main__":
+    main()
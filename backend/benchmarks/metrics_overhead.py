@@ -0,0 +1,84 @@
+"""
+Overhead of request metrics.
+
+Times what ``/api/generate`` adds per request: the ``timed`` wrappers around
+rendering and zipping in the worker, and recording the phase timings in the
+histogram on the server. The wrappers are measured by generating the same
+archive with and without them; recording by observing every phase of a
+request many times. Also times rendering ``/metrics`` with one series per
+phase, language and spec-size bucket.
+
+Usage (from the backend directory):
+    python -m benchmarks.metrics_overhead --operations 1000
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+from engine import tasks
+from engine.metrics import SPEC_SIZE_BUCKETS, SPEC_SIZE_LARGEST, MetricsRegistry
+from engine.zipstream import iter_zip
+
+from .synthetic import make_spec
+
+LANGUAGES = ("python", "javascript", "go", "rust", "csharp", "java", "php")
+PHASES = ("upload", "decode", "validate", "parse", "resolve", "generate", "zip", "response")
+
+
+def best_of(runs: int, fn) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of request metrics")
+    parser.add_argument("--operations", type=int, default=1000, help="Operations in the spec (default: 1000)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement, best is kept (default: 5)")
+    args = parser.parse_args()
+
+    content = json.dumps(make_spec(operations=args.operations)).encode("utf-8")
+    parsed = tasks.parse_spec(tasks.decode_spec(content, "spec.json"))
+
+    def plain():
+        for _ in iter_zip(tasks.stream_files(parsed, "python", "bench")):
+            pass
+
+    def instrumented():
+        timings: Dict[str, Any] = {}
+        files = tasks.stream_files(parsed, "python", "bench")
+        for _ in tasks.timed(iter_zip(tasks.timed(files, timings, "generate_seconds")), timings, "zip_seconds"):
+            pass
+
+    plain_seconds = best_of(args.runs, plain)
+    instrumented_seconds = best_of(args.runs, instrumented)
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_phase_seconds", "Bench", ("phase", "language", "spec_size"))
+    sizes = [label for _, label in SPEC_SIZE_BUCKETS] + [SPEC_SIZE_LARGEST]
+    requests = 10000
+    start = time.perf_counter()
+    for i in range(requests):
+        language = LANGUAGES[i % len(LANGUAGES)]
+        size = sizes[i % len(sizes)]
+        for phase in PHASES:
+            histogram.observe(0.01, phase, language, size)
+    record_seconds = (time.perf_counter() - start) / requests
+    render_seconds = best_of(args.runs, registry.render)
+
+    print(f"spec: {args.operations} operations, python client")
+    print(f"{'generate + zip':>24} {plain_seconds * 1000:>10.2f} ms")
+    print(f"{'with timed wrappers':>24} {instrumented_seconds * 1000:>10.2f} ms "
+          f"({(instrumented_seconds / plain_seconds - 1) * 100:+.1f}%)")
+    print(f"{'record 8 phases':>24} {record_seconds * 1e6:>10.2f} us per request "
+          f"({record_seconds / plain_seconds * 100:.4f}% of generation)")
+    print(f"{'render /metrics':>24} {render_seconds * 1000:>10.2f} ms "
+          f"({len(PHASES) * len(LANGUAGES) * len(sizes)} series)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Time to generate a client in every language from one parse result.
+
+Streams all seven clients twice: once from the bare parse result, where each
+generator analyzes the spec itself, and once after ``with_client_model`` has
+built the language-neutral client model that every generator then emits from.
+
+Usage (from the backend directory):
+    python -m benchmarks.multi_target --operations 10000
+"""
+import argparse
+import time
+
+from engine.tasks import GENERATOR_CLASSES
+from generators import with_client_model
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+
+def emit_all(parsed_data) -> float:
+    start = time.perf_counter()
+    for generator_class in GENERATOR_CLASSES.values():
+        for _ in generator_class(parsed_data, "bench_client").stream():
+            pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare all-language generation with and without a shared client model")
+    parser.add_argument("--operations", type=int, default=10000, help="Operations in the spec (default: 10000)")
+    args = parser.parse_args()
+
+    parsed = OpenAPIParser(make_spec(operations=args.operations)).parse(compact=True)
+    separate = emit_all(parsed)
+
+    start = time.perf_counter()
+    shared_parsed = with_client_model(parsed)
+    analysis = time.perf_counter() - start
+    emission = emit_all(shared_parsed)
+
+    print(f"{args.operations} operations, {len(GENERATOR_CLASSES)} languages")
+    print(f"{'mode':>10} {'analysis':>9} {'emission':>9} {'total':>8}")
+    print(f"{'separate':>10} {'-':>9} {'-':>9} {separate:>8.3f}")
+    print(f"{'shared':>10} {analysis:>9.3f} {emission:>9.3f} {analysis + emission:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
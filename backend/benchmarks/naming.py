@@ -0,0 +1,81 @@
+"""
+Throughput of identifier conversion.
+
+Collects every operationId, parameter name and property name of a synthetic
+spec and converts each to snake, camel and pascal case once per language, the
+way seven generators do. Compares the previous per-call ``re.sub``
+implementation with ``generators.naming`` on a cold and on a warm cache.
+
+Usage (from the backend directory):
+    python -m benchmarks.naming --operations 10000
+"""
+import argparse
+import re
+import time
+from typing import List
+
+from generators import naming
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+LANGUAGES = 7
+STYLES = ("snake", "camel", "pascal")
+
+
+def reference_identifier(name: str, case: str) -> str:
+    """The conversion before the naming service, uncompiled and unmemoized"""
+    sanitized = re.sub(r'^[0-9]+', '', re.sub(r'[^a-zA-Z0-9_]', '_', name))
+    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', sanitized)
+    snake = re.sub(r'_+', '_', re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()).strip('_')
+    if case == "snake":
+        return snake
+    if case == "camel":
+        components = snake.split('_')
+        return components[0] + ''.join(x.title() for x in components[1:])
+    return ''.join(x.title() for x in snake.split('_'))
+
+
+def collect_names(operations: int) -> List[str]:
+    parsed = OpenAPIParser(make_spec(operations=operations)).parse()
+    names = []
+    for operation in parsed["paths"]:
+        names.append(operation["operation_id"])
+        names.extend(param["name"] for param in operation["parameters"])
+    for schema in parsed["components"]["schemas"].values():
+        names.extend(schema.get("properties") or {})
+    return names
+
+
+def run(convert, names: List[str]) -> float:
+    start = time.perf_counter()
+    for _ in range(LANGUAGES):
+        for style in STYLES:
+            for name in names:
+                convert(name, style)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare identifier conversion throughput")
+    parser.add_argument("--operations", type=int, default=10000, help="Operations in the spec (default: 10000)")
+    args = parser.parse_args()
+
+    names = collect_names(args.operations)
+    for style in STYLES:
+        assert all(naming.identifier(style, name) == reference_identifier(name, style) for name in names)
+    conversions = len(names) * LANGUAGES * len(STYLES)
+
+    reference = run(reference_identifier, names)
+    naming.clear_caches()
+    cold = run(lambda name, style: naming.identifier(style, name), names)
+    warm = run(lambda name, style: naming.identifier(style, name), names)
+
+    print(f"{len(names)} names ({len(set(names))} distinct), {conversions} conversions")
+    print(f"{'path':>10} {'seconds':>8} {'conv/s':>12}")
+    for label, seconds in (("re.sub", reference), ("cold", cold), ("warm", warm)):
+        print(f"{label:>10} {seconds:>8.3f} {conversions / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Throughput of writing a generated package with many files.
+
+Renders a Java client of a synthetic spec with one model file per component
+schema and writes it with ``OutputWriter``: serially, and with a pool of
+writer threads. Each mode writes into an empty directory, then runs again over
+its own output, where every file is unchanged and nothing is written.
+
+Usage (from the backend directory):
+    python -m benchmarks.output_write --files 1000 10000 50000
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from engine.output import DEFAULT_WORKERS, OutputWriter
+from generators import JavaGenerator, with_client_model
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+
+def run(parsed, output_dir: Path, workers: int):
+    start = time.perf_counter()
+    report = OutputWriter(output_dir).write(JavaGenerator(parsed, "bench_client").stream(), workers=workers)
+    return report, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure output writing throughput")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Approximate files per package (default: 1000 10000 50000)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Writer threads of the parallel mode (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    print(f"{'files':>7} {'mode':>10} {'run':>9} {'seconds':>8} {'files/s':>9} {'MB/s':>7} {'written':>8}")
+    for files in args.files:
+        parsed = with_client_model(OpenAPIParser(make_spec(operations=100, schemas=files)).parse(compact=True))
+        for label, workers in (("serial", 1), (f"{args.workers} threads", args.workers)):
+            output_dir = Path(tempfile.mkdtemp(prefix="apigen-bench-"))
+            try:
+                for run_label in ("fresh", "unchanged"):
+                    report, seconds = run(parsed, output_dir, workers)
+                    print(f"{report.files:>7} {label:>10} {run_label:>9} {seconds:>8.2f} "
+                          f"{report.files / seconds:>9.0f} {report.bytes / 1e6 / seconds:>7.1f} "
+                          f"{len(report.written):>8}")
+            finally:
+                shutil.rmtree(output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Scaling of ``$ref`` resolution with document size.
+
+Builds synthetic specs with a growing number of references, then times the
+JSON-pointer index and the full resolution separately. Linear resolution
+shows up as a flat time per reference (and per indexed node) across sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.ref_resolution --sizes 1000,5000,20000,50000
+"""
+import argparse
+import gc
+import time
+
+from parsers import OpenAPIParser, RefResolver
+
+from .synthetic import make_spec
+
+
+def count_refs(node) -> int:
+    stack, refs = [node], 0
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            refs += "$ref" in node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return refs
+
+
+def measure(operations: int, schemas: int) -> dict:
+    spec = make_spec(operations=operations, schemas=schemas)
+    refs = count_refs(spec)
+
+    gc.collect()
+    start = time.perf_counter()
+    resolver = RefResolver(spec)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resolver.resolve(spec)
+    resolve_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = OpenAPIParser(spec).parse()
+    parse_seconds = time.perf_counter() - start
+
+    # Every reference to a schema must land on the one shared object
+    shared = {
+        id(content["schema"])
+        for op in parsed["paths"]
+        for response in op["responses"]
+        for content in response["content"].values()
+    }
+
+    return {
+        "operations": operations,
+        "refs": refs,
+        "nodes": resolver.indexed_nodes,
+        "index_seconds": index_seconds,
+        "resolve_seconds": resolve_seconds,
+        "parse_seconds": parse_seconds,
+        "shared_objects": len(shared),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure $ref resolution scaling")
+    parser.add_argument("--sizes", default="1000,5000,20000,50000",
+                        help="Comma-separated operation counts (default: 1000,5000,20000,50000)")
+    parser.add_argument("--schemas", type=int, default=500, help="Component schemas (default: 500)")
+    args = parser.parse_args()
+
+    results = [measure(int(size), args.schemas) for size in args.sizes.split(",")]
+
+    print(f"{'operations':>10} {'refs':>7} {'nodes':>8} {'index ms':>9} {'resolve ms':>10} "
+          f"{'parse ms':>9} {'us/ref':>7} {'us/node':>8} {'shared':>7}")
+    for r in results:
+        total = r["index_seconds"] + r["resolve_seconds"]
+        print(f"{r['operations']:>10} {r['refs']:>7} {r['nodes']:>8} {r['index_seconds'] * 1000:>9.1f} "
+              f"{r['resolve_seconds'] * 1000:>10.1f} {r['parse_seconds'] * 1000:>9.1f} "
+              f"{total / r['refs'] * 1e6:>7.2f} {total / r['nodes'] * 1e6:>8.2f} {r['shared_objects']:>7}")
+
+    first, last = results[0], results[-1]
+    growth = last["nodes"] / first["nodes"]
+    cost = (last["index_seconds"] + last["resolve_seconds"]) / (first["index_seconds"] + first["resolve_seconds"])
+    print(f"\nDocument grew {growth:.1f}x, index + resolve time grew {cost:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
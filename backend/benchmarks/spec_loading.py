@@ -0,0 +1,67 @@
+"""
+Spec loading throughput per parser backend.
+
+Serializes synthetic specs as JSON and YAML and times each available parser
+on them: stdlib json, orjson, pure-Python PyYAML and libyaml's CSafeLoader,
+plus ``load_spec`` (the shared loader, which sniffs the format and picks the
+fastest available backend). Results are reported in seconds per MB.
+
+Usage (from the backend directory):
+    python -m benchmarks.spec_loading --operations 500,5000
+"""
+import argparse
+import json
+import time
+
+import yaml
+
+from parsers import spec_loader
+
+from .synthetic import make_spec, dump_spec
+
+
+def backends():
+    """(name, format, loader) triples for every parser installed here"""
+    found = [
+        ("json", "json", json.loads),
+        ("pyyaml", "yaml", lambda content: yaml.load(content, Loader=yaml.SafeLoader)),
+    ]
+    if spec_loader.HAS_ORJSON:
+        found.append(("orjson", "json", spec_loader.orjson.loads))
+    if spec_loader.HAS_LIBYAML:
+        found.append(("libyaml", "yaml", lambda content: yaml.load(content, Loader=yaml.CSafeLoader)))
+    found.append(("load_spec", "json", spec_loader.load_spec))
+    found.append(("load_spec", "yaml", spec_loader.load_spec))
+    return found
+
+
+def best_of(fn, content: bytes, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure spec loading time per MB")
+    parser.add_argument("--operations", default="500,5000",
+                        help="Comma-separated operation counts (default: 500,5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"Active loaders: {spec_loader.loader_backends()}")
+    print(f"{'operations':>10} {'format':>6} {'MB':>6} {'backend':>10} {'seconds':>8} {'s/MB':>7}")
+    for operations in (int(n) for n in args.operations.split(",")):
+        spec = make_spec(operations=operations)
+        documents = {fmt: dump_spec(spec, fmt) for fmt in ("json", "yaml")}
+        for name, fmt, loader in backends():
+            content = documents[fmt]
+            megabytes = len(content) / 1024 / 1024
+            seconds = best_of(loader, content, args.repeat)
+            print(f"{operations:>10} {fmt:>6} {megabytes:>6.2f} {name:>10} {seconds:>8.3f} {seconds / megabytes:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark suite for the parser and every generator at scale.
+
+For each size, builds a deterministic synthetic spec (``synthetic.make_spec``)
+and measures the stages of generation: ``load`` (decoding the serialized
+spec), ``parse`` (``OpenAPIParser.parse``) and one stage per language
+(consuming ``stream()`` of its generator over the parse result). Each stage is
+timed (best of ``--repeat`` runs), then run once more under tracemalloc for
+its peak allocation, so tracing never slows the timed runs.
+
+Results are written as JSON with the commit, interpreter and parameters, so
+runs can be diffed between commits; ``--compare`` prints the ratios against
+an earlier result file and exits with status 1 if a stage regressed by more
+than ``--threshold``.
+
+Usage (from the backend directory):
+    python -m benchmarks.suite --sizes 100 1000 10000 50000 --output bench.json
+    python -m benchmarks.suite --sizes 10000 --stages parse python go --compare bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engine.tasks import GENERATOR_CLASSES
+from parsers import OpenAPIParser
+from parsers.spec_loader import load_spec
+
+from .synthetic import dump_spec, make_spec
+
+STAGES = ("load", "parse") + tuple(GENERATOR_CLASSES)
+DEFAULT_SIZES = (100, 1000, 10000, 50000)
+
+MB = 1024 * 1024
+
+
+def measure(fn: Callable[[], Any], repeat: int, memory: bool) -> Tuple[float, Optional[int], Any]:
+    """Best time of ``repeat`` runs of ``fn``, its peak allocation and its result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        result = None
+        gc.collect()
+        tracemalloc.start()
+        try:
+            result = fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak, result
+
+
+def consume(generator) -> Tuple[int, int]:
+    """Files and characters a generator streams"""
+    files = 0
+    size = 0
+    current = None
+    for path, chunk in generator.stream():
+        if path != current:
+            files += 1
+            current = path
+        size += len(chunk)
+    return files, size
+
+
+def run_size(operations: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    spec = make_spec(
+        operations=operations,
+        tags=args.tags,
+        schemas=args.schemas or max(10, operations // 10),
+        seed=args.seed,
+        depth=args.depth,
+        ref_density=args.ref_density
+    )
+    content = dump_spec(spec, args.format)
+    del spec
+    memory = not args.no_memory
+    rows = []
+
+    def record(stage: str, seconds: float, peak: Optional[int], **extra: Any):
+        row = {"stage": stage, "operations": operations, "seconds": round(seconds, 4),
+               "peak_mb": round(peak / MB, 2) if peak is not None else None, **extra}
+        rows.append(row)
+        peak_text = f"{row['peak_mb']:>9.1f}" if peak is not None else f"{'-':>9}"
+        print(f"{operations:>8} {stage:>10} {seconds:>9.3f} {peak_text}"
+              f"{'  ' + str(extra) if extra else ''}", file=sys.stderr)
+
+    seconds, peak, spec = measure(lambda: load_spec(content), args.repeat, memory)
+    if "load" in args.stages:
+        record("load", seconds, peak, spec_mb=round(len(content) / MB, 2))
+
+    seconds, peak, parsed = measure(lambda: OpenAPIParser(spec).parse(compact=True), args.repeat,
+                                    memory and "parse" in args.stages)
+    if "parse" in args.stages:
+        record("parse", seconds, peak)
+    del spec
+
+    for language, generator_class in GENERATOR_CLASSES.items():
+        if language not in args.stages:
+            continue
+        seconds, peak, (files, size) = measure(
+            lambda: consume(generator_class(parsed, "bench_client")), args.repeat, memory
+        )
+        record(language, seconds, peak, files=files, output_mb=round(size / MB, 2))
+    return rows
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            check=True, cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline_path: str, threshold: float) -> bool:
+    """Print ratios against a baseline file; True if any stage regressed"""
+    previous = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    baseline = {(row["stage"], row["operations"]): row for row in previous["results"]}
+    changed = [key for key, value in report["parameters"].items()
+               if key != "repeat" and previous["parameters"].get(key) != value]
+    if changed:
+        print(f"warning: {baseline_path} used different {', '.join(changed)}; ratios compare different specs")
+    regressed = False
+    print(f"\n{'ops':>8} {'stage':>10} {'time':>8} {'memory':>8}  vs {baseline_path}")
+    for row in report["results"]:
+        before = baseline.get((row["stage"], row["operations"]))
+        if before is None:
+            continue
+        ratios = []
+        for key in ("seconds", "peak_mb"):
+            if row.get(key) and before.get(key):
+                ratios.append(row[key] / before[key])
+            else:
+                ratios.append(None)
+        worse = [ratio for ratio in ratios if ratio is not None and ratio > 1 + threshold]
+        regressed = regressed or bool(worse)
+        cells = [f"{ratio:>7.2f}x" if ratio is not None else f"{'-':>8}" for ratio in ratios]
+        print(f"{row['operations']:>8} {row['stage']:>10} {cells[0]} {cells[1]}{'  REGRESSION' if worse else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and memory-profile parsing and generation at scale")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Operation counts (default: 100 1000 10000 50000)")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES,
+                        help="Stages to measure (default: all)")
+    parser.add_argument("--tags", type=int, default=10, help="Tags in the spec (default: 10)")
+    parser.add_argument("--schemas", type=int, default=0,
+                        help="Component schemas (default: a tenth of the operations, at least 10)")
+    parser.add_argument("--depth", type=int, default=2, help="Nesting of inline objects in schemas (default: 2)")
+    parser.add_argument("--ref-density", type=float, default=0.3,
+                        help="Fraction of schemas referencing another schema (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic spec (default: 0)")
+    parser.add_argument("--format", choices=["json", "yaml"], default="json",
+                        help="Serialization of the spec for the load stage (default: json)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage, best is kept (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--output", "-o", help="Write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", help="Earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown or growth counted as a regression (default: 0.25)")
+    args = parser.parse_args()
+
+    print(f"{'ops':>8} {'stage':>10} {'seconds':>9} {'peak MB':>9}", file=sys.stderr)
+    results: List[Dict[str, Any]] = []
+    for operations in args.sizes:
+        results.extend(run_size(operations, args))
+
+    report = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parameters": {
+            "tags": args.tags, "schemas": args.schemas, "depth": args.depth,
+            "ref_density": args.ref_density, "seed": args.seed, "format": args.format,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    elif args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Deterministic synthetic OpenAPI specifications for benchmarks
+
+Besides the number of operations, tags and component schemas, ``depth`` nests
+an inline ``details`` object that many levels deep in every schema, and
+``ref_density`` is the fraction of schemas with a ``related`` property that
+``$ref``s another schema (an array of such references in odd-numbered
+schemas). Both default to 0, which keeps the output of earlier versions byte
+for byte.
+"""
+import json
+import random
+from typing import Dict, Any
+
+import yaml
+
+METHODS = ["get", "post", "put", "patch", "delete"]
+
+
+def nested_object(depth: int) -> Dict[str, Any]:
+    """An inline object schema with ``depth`` levels of nested objects"""
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {"value": {"type": "string"}, "count": {"type": "integer"}}
+    }
+    if depth > 1:
+        schema["properties"]["child"] = nested_object(depth - 1)
+    return schema
+
+
+def make_spec(operations: int = 1000, tags: int = 10, schemas: int = 100, seed: int = 0,
+              depth: int = 0, ref_density: float = 0.0) -> Dict[str, Any]:
+    """Build an OpenAPI 3.0 document with the given number of operations"""
+    rng = random.Random(seed)
+    # Separate stream, so references between schemas leave operations unchanged
+    ref_rng = random.Random(seed + 1)
+    schemas = max(schemas, 1)
+
+    components = {}
+    for i in range(schemas):
+        properties: Dict[str, Any] = {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string", "description": f"Name of model {i}"},
+            "created_at": {"type": "string", "format": "date-time"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        }
+        if depth > 0:
+            properties["details"] = nested_object(depth)
+        if ref_density > 0 and ref_rng.random() < ref_density:
+            ref = {"$ref": f"#/components/schemas/Model{ref_rng.randrange(schemas)}"}
+            properties["related"] = {"type": "array", "items": ref} if i % 2 else ref
+        components[f"Model{i}"] = {
+            "type": "object",
+            "required": ["id"],
+            "properties": properties
+        }
+
+    paths: Dict[str, Any] = {}
+    for i in range(operations):
+        resource = f"/resource{i // len(METHODS)}"
+        method = METHODS[i % len(METHODS)]
+        path = resource if method in ("get", "post") else f"{resource}/{{id}}"
+        model = f"#/components/schemas/Model{rng.randrange(schemas)}"
+
+        operation: Dict[str, Any] = {
+            "operationId": f"{method}Resource{i}",
+            "summary": f"Operation {i}",
+            "description": f"Synthetic operation {i} on {resource}",
+            "tags": [f"tag{i % max(tags, 1)}"],
+            "parameters": [
+                {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+            ],
+            "responses": {
+                "200": {
+                    "description": "OK",
+                    "content": {"application/json": {"schema": {"$ref": model}}}
+                },
+                "404": {"description": "Not found"}
+            }
+        }
+        if "{id}" in path:
+            operation["parameters"].append(
+                {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}
+            )
+        if method in ("post", "put", "patch"):
+            operation["requestBody"] = {
+                "required": True,
+                "content": {"application/json": {"schema": {"$ref": model}}}
+            }
+        paths.setdefault(path, {})[method] = operation
+
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Synthetic API", "version": "1.0.0", "description": "Benchmark spec"},
+        "servers": [{"url": "https://api.example.com/v1"}],
+        "paths": paths,
+        "components": {"schemas": components},
+    }
+
+
+def dump_spec(spec: Dict[str, Any], fmt: str = "yaml") -> bytes:
+    """Serialize a spec as YAML or JSON bytes"""
+    if fmt == "json":
+        return json.dumps(spec).encode("utf-8")
+    return yaml.safe_dump(spec, sort_keys=False).encode("utf-8")
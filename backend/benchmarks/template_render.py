@@ -0,0 +1,106 @@
+"""
+Template rendering throughput and cold-start cost.
+
+Renders the Python client's operation methods for a synthetic spec twice:
+through the compiled Jinja2 template (``python/operation.j2``) and through an
+equivalent hand-written f-string, and reports operations per second for
+each. The two must produce identical text. It also times compiling every
+template in a fresh process with an empty bytecode cache and then again with
+the cache populated.
+
+Usage (from the backend directory):
+    python -m benchmarks.template_render --operations 5000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from generators import PythonGenerator
+from generators.views import OperationView
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PRELOAD = "import time; start = time.perf_counter(); import templates; templates.preload(); " \
+          "print(time.perf_counter() - start)"
+
+
+def fstring_operation(operation: OperationView) -> str:
+    """The output of python/operation.j2, built with f-strings"""
+    signature = "".join(f", {param.var}: {param.type}"
+                        for param in operation.path_params + operation.required_options)
+    if operation.body_required:
+        signature += ", body: Dict[str, Any]"
+    signature += "".join(f", {param.var}: Optional[{param.type}] = None" for param in operation.optional_options)
+    if operation.has_body and not operation.body_required:
+        signature += ", body: Optional[Dict[str, Any]] = None"
+
+    lines = [f"    def {operation.name}(self{signature}) -> requests.Response:\n"]
+    if operation.summary:
+        lines.append(f'        """{operation.summary}"""\n')
+    if operation.query_params:
+        items = ", ".join(f'"{param.name}": {param.var}' for param in operation.query_params)
+        lines.append(f"        params = {{{items}}}\n")
+    if operation.header_params:
+        items = ", ".join(f'"{param.name}": {param.var}' for param in operation.header_params)
+        lines.append(f"        headers = {{{items}}}\n")
+    lines.append(f'        return self._request(\n            "{operation.method}",\n'
+                 f'            f"{operation.url}"')
+    if operation.query_params:
+        lines.append(",\n            params={k: v for k, v in params.items() if v is not None}")
+    if operation.header_params:
+        lines.append(",\n            headers={k: str(v) for k, v in headers.items() if v is not None}")
+    if operation.has_body:
+        lines.append(",\n            json=body")
+    lines.append("\n        )\n")
+    return "".join(lines)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def preload_seconds(cache_home: str) -> float:
+    env = dict(os.environ, XDG_CACHE_HOME=cache_home)
+    output = subprocess.run([sys.executable, "-c", PRELOAD], cwd=str(BACKEND_DIR), env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare template and f-string render throughput")
+    parser.add_argument("--operations", type=int, default=5000, help="Operations in the spec (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is kept (default: 3)")
+    args = parser.parse_args()
+
+    parsed = OpenAPIParser(make_spec(operations=args.operations)).parse()
+    generator = PythonGenerator(parsed, "bench_client")
+    views = generator.operation_views()
+
+    rendered = generator.render_each("operation.j2", "operation", views)
+    assert rendered == [fstring_operation(view) for view in views], "template and f-string output differ"
+
+    template_seconds = best_of(lambda: generator.render_each("operation.j2", "operation", views), args.repeat)
+    fstring_seconds = best_of(lambda: [fstring_operation(view) for view in views], args.repeat)
+    print(f"{'path':>10} {'seconds':>8} {'ops/s':>10}")
+    print(f"{'jinja2':>10} {template_seconds:>8.3f} {len(views) / template_seconds:>10.0f}")
+    print(f"{'f-string':>10} {fstring_seconds:>8.3f} {len(views) / fstring_seconds:>10.0f}")
+
+    with tempfile.TemporaryDirectory() as cache_home:
+        cold = preload_seconds(cache_home)
+        warm = preload_seconds(cache_home)
+    print(f"\nCompile all templates: {cold * 1000:.1f} ms cold, {warm * 1000:.1f} ms from the bytecode cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Throughput of schema-to-type resolution.
+
+Resolves the type of every parameter and model property of a synthetic spec
+once per language, the way seven generators do. Compares the previous
+implementation, which rebuilt a nested dict of type tables on every call, with
+``generators.types``: language-neutral analysis repeated by each language, and
+done once and shared, with each distinct type spelled once per language.
+
+Usage (from the backend directory):
+    python -m benchmarks.type_resolution --operations 10000
+"""
+import argparse
+import time
+from typing import Any, Dict, List, Tuple
+
+from generators.types import RULES, SchemaTypes, TypeResolver
+from parsers import OpenAPIParser
+
+from .synthetic import make_spec
+
+
+def reference_type(schema: Dict[str, Any], language: str) -> str:
+    """The resolution before the type tables were flattened: primitives only"""
+    defaults = {
+        "python": "Any", "javascript": "any", "go": "interface{}", "rust": "serde_json::Value",
+        "csharp": "object", "java": "Object", "php": "mixed"
+    }
+    if not schema:
+        return defaults.get(language, "any")
+    type_mappings = {
+        "python": {"string": "str", "integer": "int", "number": "float", "boolean": "bool",
+                   "array": "List", "object": "Dict[str, Any]"},
+        "javascript": {"string": "string", "integer": "number", "number": "number",
+                       "boolean": "boolean", "array": "Array", "object": "object"},
+        "go": {"string": "string", "integer": "int", "number": "float64", "boolean": "bool",
+               "array": "[]interface{}", "object": "map[string]interface{}"},
+        "rust": {"string": "String", "integer": "i64", "number": "f64", "boolean": "bool",
+                 "array": "Vec<serde_json::Value>", "object": "serde_json::Value"},
+        "csharp": {"string": "string", "integer": "int", "number": "double", "boolean": "bool",
+                   "array": "List<object>", "object": "Dictionary<string, object>"},
+        "java": {"string": "String", "integer": "Integer", "number": "Double", "boolean": "Boolean",
+                 "array": "List<Object>", "object": "Map<String, Object>"},
+        "php": {"string": "string", "integer": "int", "number": "float", "boolean": "bool",
+                "array": "array", "object": "array"},
+    }
+    return type_mappings.get(language, {}).get(schema.get("type", "object"), defaults.get(language, "any"))
+
+
+def collect_schemas(operations: int) -> Tuple[Dict[str, Any], List[Tuple[Any, bool]]]:
+    parsed = OpenAPIParser(make_spec(operations=operations)).parse()
+    schemas = [(param["schema"], False) for operation in parsed["paths"] for param in operation["parameters"]]
+    for schema in parsed["components"]["schemas"].values():
+        schemas.extend((prop, True) for prop in (schema.get("properties") or {}).values())
+    return parsed["components"], schemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare type resolution throughput")
+    parser.add_argument("--operations", type=int, default=10000, help="Operations in the spec (default: 10000)")
+    args = parser.parse_args()
+
+    components, schemas = collect_schemas(args.operations)
+    resolutions = len(schemas) * len(RULES)
+
+    start = time.perf_counter()
+    for language in RULES:
+        for schema, _ in schemas:
+            reference_type(schema, language)
+    reference = time.perf_counter() - start
+
+    # Analysis once per parse result, then spelling per language, as generators share it
+    start = time.perf_counter()
+    schema_types = SchemaTypes(components)
+    refs = [schema_types.ref(schema, models) for schema, models in schemas]
+    analysis = time.perf_counter() - start
+    for language in RULES:
+        resolver = TypeResolver(language)
+        for ref in refs:
+            resolver.spell(ref)
+    shared = time.perf_counter() - start
+
+    # Analysis repeated by every language
+    start = time.perf_counter()
+    for language in RULES:
+        resolver = TypeResolver(language, components)
+        for schema, models in schemas:
+            resolver.resolve(schema, models)
+    separate = time.perf_counter() - start
+
+    print(f"{len(schemas)} schemas ({len({id(schema) for schema, _ in schemas})} distinct), "
+          f"{resolutions} resolutions")
+    print(f"analysis {analysis:.3f}s, {len(set(refs))} distinct types")
+    print(f"{'path':>10} {'seconds':>8} {'types/s':>12}")
+    for label, seconds in (("dicts", reference), ("separate", separate), ("shared", shared)):
+        print(f"{label:>10} {seconds:>8.3f} {resolutions / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Save-to-written latency of watch mode.
+
+Writes a synthetic spec, builds a client from it once, then applies a series
+of edits and times how long each takes to reach the output directory: with a
+fresh build per save (what watch mode used to do) and with the incremental
+build that keeps the previous parse, rendered operations and models, and
+files in memory. Operation and info edits should take a small fraction of a
+fresh build; component edits re-parse the whole spec and take about as long.
+
+Usage (from the backend directory):
+    python -m benchmarks.watch_incremental --operations 5000
+"""
+import argparse
+import copy
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .synthetic import make_spec
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.append(str(REPO_DIR))
+
+from apigen_cli.incremental import IncrementalBuild  # noqa: E402
+
+
+def edit_description(spec):
+    operation = next(iter(next(iter(spec["paths"].values())).values()))
+    operation["description"] += " (edited)"
+
+
+def add_operation(spec):
+    spec["paths"]["/added"] = {"get": {"operationId": "added", "responses": {"200": {"description": "OK"}}}}
+
+
+def change_schema(spec):
+    spec["components"]["schemas"]["Model0"]["properties"]["extra"] = {"type": "string"}
+
+
+def change_title(spec):
+    spec["info"]["title"] += " v2"
+
+
+EDITS = [
+    ("operation description", edit_description),
+    ("new operation", add_operation),
+    ("component schema", change_schema),
+    ("info.title", change_title),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure watch-mode regeneration latency")
+    parser.add_argument("--operations", type=int, default=5000, help="Operations in the spec (default: 5000)")
+    parser.add_argument("--language", default="python", help="Target language (default: python)")
+    args = parser.parse_args()
+
+    spec = make_spec(operations=args.operations)
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = Path(tmp) / "spec.json"
+        spec_path.write_text(json.dumps(spec))
+        incremental = IncrementalBuild(str(spec_path), args.language, str(Path(tmp) / "incremental"))
+        incremental.run()
+
+        print(f"{'edit':>22} {'full ms':>8} {'incr ms':>8} {'written':>8}")
+        for name, edit in EDITS:
+            spec = copy.deepcopy(spec)
+            edit(spec)
+            spec_path.write_text(json.dumps(spec))
+
+            start = time.perf_counter()
+            IncrementalBuild(str(spec_path), args.language, str(Path(tmp) / "full")).run()
+            full = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = incremental.run()
+            incr = time.perf_counter() - start
+            print(f"{name:>22} {full * 1000:>8.1f} {incr * 1000:>8.1f} {len(result.written):>8}")
+
+
+if __name__ == "__main__":
+    main()
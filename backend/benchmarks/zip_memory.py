@@ -0,0 +1,106 @@
+"""
+Peak memory of building a generated-client archive.
+
+Compares the previous path (every file in a dict, archived into a BytesIO via
+zipfile) with the streaming writer fed by a generator of ``(path, content)``
+pairs. Each mode runs in a fresh interpreter so peak RSS is not shared.
+
+Usage (from the backend directory):
+    python -m benchmarks.zip_memory --files 2000 --file-kb 64
+"""
+import argparse
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import zipfile
+from typing import Iterator, Tuple
+
+from engine.zipstream import iter_zip
+
+WORDS = ["client", "request", "response", "model", "schema", "path", "query", "header",
+         "string", "integer", "return", "self", "async", "await", "import", "def"]
+
+
+def make_file(index: int, size: int) -> str:
+    """Deterministic source-like text of roughly ``size`` bytes"""
+    rng = random.Random(index)
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choice(WORDS) for _ in range(8)) + f"  # {index}-{total}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)
+
+
+def iter_files(count: int, size: int) -> Iterator[Tuple[str, str]]:
+    for i in range(count):
+        yield f"pkg/module_{i}.py", make_file(i, size)
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_mode(mode: str, count: int, size: int) -> dict:
+    baseline = peak_rss_kb()
+    start = time.perf_counter()
+    first_byte = None
+    archive_bytes = 0
+
+    if mode == "bytesio":
+        files = dict(iter_files(count, size))
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for path, content in files.items():
+                zip_file.writestr(path, content)
+        first_byte = time.perf_counter() - start
+        archive_bytes = len(buffer.getvalue())
+    else:
+        for chunk in iter_zip(iter_files(count, size)):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            archive_bytes += len(chunk)
+
+    return {
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 3),
+        "time_to_first_byte": round(first_byte, 4),
+        "archive_mb": round(archive_bytes / 1024 / 1024, 2),
+        "peak_rss_delta_mb": round((peak_rss_kb() - baseline) / 1024, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare archive memory use")
+    parser.add_argument("--files", type=int, default=2000, help="Number of files (default: 2000)")
+    parser.add_argument("--file-kb", type=int, default=64, help="Size of each file in KB (default: 64)")
+    parser.add_argument("--mode", choices=["bytesio", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    size = args.file_kb * 1024
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.files, size)))
+        return
+
+    print(f"{args.files} files x {args.file_kb} KB = {args.files * args.file_kb / 1024:.0f} MB uncompressed")
+    for mode in ("bytesio", "stream"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.zip_memory", "--mode", mode,
+             "--files", str(args.files), "--file-kb", str(args.file_kb)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        print(f"{mode:8} peak RSS +{result['peak_rss_delta_mb']:>7} MB  "
+              f"first byte {result['time_to_first_byte']:>7}s  total {result['seconds']:>6}s  "
+              f"archive {result['archive_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
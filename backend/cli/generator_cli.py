@@ -5,20 +5,20 @@ Enables CI/CD integration and batch processing
 """
 
 import click
-import yaml
 import json
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
-    from parsers.openapi_parser import OpenAPIParser
+    from parsers.parse_cache import ParseCache, ParsedSpec, parse_content
     from generators.python_generator import PythonGenerator
     from generators.javascript_generator import JavaScriptGenerator
     from generators.go_generator import GoGenerator
@@ -26,10 +26,21 @@ try:
     from generators.csharp_generator import CSharpGenerator
     from generators.java_generator import JavaGenerator
     from generators.php_generator import PHPGenerator
+    from generators.client_model import with_client_model
+    from engine.output import DEFAULT_WORKERS
+    from engine.tasks import freeze_parsed, init_worker, write_chunks, write_language
 except ImportError as e:
     print(f"Error importing generators: {e}")
     sys.exit(1)
 
+# .apigenrc.yaml support is shared with the apigen CLI at the repository root
+sys.path.append(str(Path(__file__).parent.parent.parent))
+try:
+    from apigen_cli.config import load_config
+    HAS_CONFIG = True
+except ImportError:
+    HAS_CONFIG = False
+
 console = Console()
 
 GENERATORS = {
@@ -42,6 +53,27 @@ GENERATORS = {
     "php": PHPGenerator,
 }
 
+def load_parsed(spec_file: str, use_cache: bool = True) -> ParsedSpec:
+    """Load and parse a spec, reusing the on-disk parse cache for unchanged files"""
+    settings = load_config().get_cache_config() if HAS_CONFIG else {}
+    if not use_cache:
+        settings = {**settings, 'enabled': False}
+    
+    cache = ParseCache.from_settings(settings)
+    if cache is None:
+        return parse_content(Path(spec_file).read_bytes())
+    return cache.load(spec_file)
+
+def custom_templates():
+    """Template override directory from .apigenrc.yaml, if any"""
+    return load_config().get_custom_templates() if HAS_CONFIG else None
+
+def require_parsed(entry: ParsedSpec) -> dict:
+    """Return the parse result, or raise with the reasons it is missing"""
+    if entry.parsed is None:
+        raise ValueError('; '.join(entry.errors))
+    return entry.parsed
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -55,22 +87,17 @@ def cli():
 @click.option('--package-name', '-p', default='api_client', help='Package name')
 @click.option('--include-tests/--no-tests', default=False, help='Include test files')
 @click.option('--include-docs/--no-docs', default=True, help='Include documentation')
-def generate(spec_file, language, output, package_name, include_tests, include_docs):
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed specs from the on-disk cache')
+@click.option('--write-workers', '-j', type=int, default=DEFAULT_WORKERS, show_default=True,
+              help='Threads writing changed files')
+def generate(spec_file, language, output, package_name, include_tests, include_docs, cache, write_workers):
     """Generate API client from OpenAPI specification"""
     
     console.print(f"[bold blue]🚀 Generating {language} client...[/bold blue]")
     
     try:
-        # Load spec
-        with open(spec_file, 'r') as f:
-            if spec_file.endswith(('.yaml', '.yml')):
-                spec = yaml.safe_load(f)
-            else:
-                spec = json.load(f)
-        
-        # Parse
-        parser = OpenAPIParser(spec)
-        parsed_data = parser.parse()
+        # Load and parse (skipped for unchanged specs)
+        parsed_data = require_parsed(load_parsed(spec_file, cache))
         
         # Generate
         generator_class = GENERATORS[language]
@@ -78,25 +105,23 @@ def generate(spec_file, language, output, package_name, include_tests, include_d
             parsed_data=parsed_data,
             package_name=package_name,
             include_tests=include_tests,
-            include_docs=include_docs
+            include_docs=include_docs,
+            template_dir=custom_templates()
         )
         
-        generated_files = generator.generate()
-        
-        # Write files
+        # Write files as they are generated, skipping those that did not change
         output_path = Path(output) / package_name
         output_path.mkdir(parents=True, exist_ok=True)
         
-        with Progress() as progress:
-            task = progress.add_task("[green]Writing files...", total=len(generated_files))
-            
-            for file_path, content in generated_files.items():
-                full_path = output_path / file_path
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                full_path.write_text(content)
-                progress.update(task, advance=1)
+        with console.status("[green]Writing files..."):
+            started = time.perf_counter()
+            report = write_chunks(generator.stream(), output_path, write_workers)
+            rate = report.throughput(time.perf_counter() - started)
         
-        console.print(f"[bold green]✅ Generated {len(generated_files)} files in {output_path}[/bold green]")
+        console.print(f"[bold green]✅ Generated {report.files} files in {output_path}[/bold green] "
+                      f"[dim]({len(report.added)} added, {len(report.changed)} changed, "
+                      f"{len(report.removed)} removed, {report.unchanged} unchanged; "
+                      f"{rate['files_per_second']:.0f} files/s, {rate['mb_per_second']:.1f} MB/s)[/dim]")
         
     except Exception as e:
         console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
@@ -107,50 +132,77 @@ def generate(spec_file, language, output, package_name, include_tests, include_d
 @click.option('--languages', '-l', required=True, help='Comma-separated list of languages')
 @click.option('--output', '-o', default='./output', help='Output directory')
 @click.option('--package-name', '-p', default='api_client', help='Package name')
-def batch(spec_file, languages, output, package_name):
+@click.option('--workers', '-w', type=int, default=0, help='Worker processes (default: one per language, up to CPU count)')
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed specs from the on-disk cache')
+@click.option('--write-workers', '-j', type=int, default=1, show_default=True,
+              help='Threads writing changed files, per worker process')
+def batch(spec_file, languages, output, package_name, workers, cache, write_workers):
     """Generate clients for multiple languages at once"""
     
-    lang_list = [l.strip() for l in languages.split(',')]
-    
-    console.print(f"[bold blue]🚀 Batch generating for {len(lang_list)} languages...[/bold blue]")
-    
-    for lang in lang_list:
+    lang_list = []
+    for lang in dict.fromkeys(l.strip() for l in languages.split(',') if l.strip()):
         if lang not in GENERATORS:
             console.print(f"[yellow]⚠️  Skipping unsupported language: {lang}[/yellow]")
             continue
-        
-        console.print(f"[cyan]Generating {lang}...[/cyan]")
-        
-        try:
-            # Load spec
-            with open(spec_file, 'r') as f:
-                if spec_file.endswith(('.yaml', '.yml')):
-                    spec = yaml.safe_load(f)
-                else:
-                    spec = json.load(f)
-            
-            parser = OpenAPIParser(spec)
-            parsed_data = parser.parse()
-            
-            generator_class = GENERATORS[lang]
-            generator = generator_class(parsed_data=parsed_data, package_name=package_name)
-            
-            generated_files = generator.generate()
-            
-            output_path = Path(output) / lang / package_name
-            output_path.mkdir(parents=True, exist_ok=True)
-            
-            for file_path, content in generated_files.items():
-                full_path = output_path / file_path
-                full_path.parent.mkdir(parents=True, exist_ok=True)
-                full_path.write_text(content)
-            
-            console.print(f"[green]✅ {lang} completed ({len(generated_files)} files)[/green]")
-            
-        except Exception as e:
-            console.print(f"[red]❌ {lang} failed: {str(e)}[/red]")
+        lang_list.append(lang)
     
-    console.print(f"[bold green]🎉 Batch generation complete![/bold green]")
+    if not lang_list:
+        console.print("[bold red]❌ No supported languages selected[/bold red]")
+        sys.exit(1)
+    
+    console.print(f"[bold blue]🚀 Batch generating for {len(lang_list)} languages...[/bold blue]")
+    started = time.perf_counter()
+    
+    # Load, parse and analyze once, then share the frozen result with every worker
+    try:
+        entry = load_parsed(spec_file, cache)
+        parsed_data = with_client_model(require_parsed(entry))
+        frozen = freeze_parsed(parsed_data, entry.spec)
+    except Exception as e:
+        console.print(f"[bold red]❌ Error: {str(e)}[/bold red]")
+        sys.exit(1)
+    parse_seconds = time.perf_counter() - started
+    
+    manifest = {
+        "package_name": package_name,
+        "endpoints": len(parsed_data['paths']),
+        "parse_seconds": round(parse_seconds, 4),
+        "languages": {}
+    }
+    max_workers = workers or min(len(lang_list), os.cpu_count() or 1)
+    template_dir = custom_templates()
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(template_dir,)) as pool:
+        futures = {
+            pool.submit(
+                write_language,
+                frozen,
+                lang,
+                package_name,
+                str(Path(output) / lang / package_name),
+                template_dir=template_dir,
+                write_workers=write_workers
+            ): lang
+            for lang in lang_list
+        }
+        for future in as_completed(futures):
+            lang = futures[future]
+            try:
+                timings = future.result()["timings"]
+                manifest["languages"][lang] = {"status": "ok", **timings}
+                console.print(f"[green]✅ {lang} completed ({timings['files']} files, "
+                              f"{timings['added'] + timings['changed']} written, {timings['generate_seconds']:.2f}s, "
+                              f"{timings['files_per_second']:.0f} files/s, {timings['mb_per_second']:.1f} MB/s)[/green]")
+            except Exception as e:
+                manifest["languages"][lang] = {"status": "failed", "error": str(e)}
+                console.print(f"[red]❌ {lang} failed: {str(e)}[/red]")
+    
+    manifest["total_seconds"] = round(time.perf_counter() - started, 4)
+    output_path = Path(output)
+    output_path.mkdir(parents=True, exist_ok=True)
+    (output_path / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    
+    console.print(f"[bold green]🎉 Batch generation complete in {manifest['total_seconds']:.2f}s![/bold green]")
 
 @cli.command()
 def languages():
@@ -168,20 +220,15 @@ def languages():
 
 @cli.command()
 @click.argument('spec_file', type=click.Path(exists=True))
-def validate(spec_file):
+@click.option('--cache/--no-cache', default=True, help='Reuse parsed specs from the on-disk cache')
+def validate(spec_file, cache):
     """Validate an OpenAPI specification"""
     
     console.print("[bold blue]🔍 Validating OpenAPI specification...[/bold blue]")
     
     try:
-        with open(spec_file, 'r') as f:
-            if spec_file.endswith(('.yaml', '.yml')):
-                spec = yaml.safe_load(f)
-            else:
-                spec = json.load(f)
-        
-        parser = OpenAPIParser(spec)
-        errors = parser.validate()
+        entry = load_parsed(spec_file, cache)
+        errors = entry.errors
         
         if errors:
             console.print("[bold red]❌ Validation failed:[/bold red]")
@@ -189,7 +236,7 @@ def validate(spec_file):
                 console.print(f"  • {error}")
             sys.exit(1)
         else:
-            parsed_data = parser.parse()
+            parsed_data = entry.parsed
             info = parsed_data['info']
             
             console.print("[bold green]✅ Valid OpenAPI specification![/bold green]")
@@ -0,0 +1,20 @@
+"""Generation engine: off-loop job execution for the API server."""
+
+from .executor import GenerationEngine, JobStream, EngineBusyError, EngineTimeoutError
+from .cache import CacheHit, ResultCache, content_digest
+from .tasks import GenerationError, GENERATOR_CLASSES
+from .jobs import Job, JobQueue
+
+__all__ = [
+    'GenerationEngine',
+    'JobStream',
+    'EngineBusyError',
+    'EngineTimeoutError',
+    'CacheHit',
+    'ResultCache',
+    'content_digest',
+    'GenerationError',
+    'GENERATOR_CLASSES',
+    'Job',
+    'JobQueue',
+]
@@ -0,0 +1,310 @@
+"""
+Content-addressed cache of generated client archives.
+
+Entries are keyed by a canonical hash of the decoded spec, the generator
+options and a fingerprint of the generator sources, so a repeat request with
+the same inputs returns the stored ZIP without parsing or generating again.
+Raw upload digests are aliased to the canonical spec hash, which lets repeat
+uploads of identical bytes skip decoding as well. An upload whose digest is
+new is looked up by its canonical hash as soon as the generation job has
+decoded it (``spec_hash_check``), so a reformatted or reordered spec still
+hits without being decoded twice on a miss. Keys begin with the spec hash;
+the aliases of a spec go when the last of its archives is evicted from disk.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Sources whose changes invalidate every cached archive
+FINGERPRINT_SOURCES = ["generators", "parsers", "templates", "engine/tasks.py"]
+
+# Upper bound on remembered upload-digest aliases
+MAX_ALIASES = 10000
+
+
+def generator_fingerprint() -> str:
+    """Hash the generator, parser and template sources"""
+    digest = hashlib.sha256()
+    for source in FINGERPRINT_SOURCES:
+        path = BACKEND_DIR / source
+        files = [path] if path.is_file() else sorted(
+            p for p in path.rglob("*") if p.is_file() and "__pycache__" not in p.parts
+        )
+        for file_path in files:
+            digest.update(str(file_path.relative_to(BACKEND_DIR)).encode("utf-8"))
+            digest.update(file_path.read_bytes())
+    return digest.hexdigest()
+
+
+def content_digest(content: bytes) -> str:
+    """Hash raw upload bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _stringify_keys(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _stringify_keys(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_stringify_keys(v) for v in value]
+    return value
+
+
+def spec_digest(spec: Any) -> str:
+    """Canonical hash of a decoded spec, independent of key order and formatting"""
+    try:
+        canonical = json.dumps(spec, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    except TypeError:
+        # YAML allows non-string keys (e.g. bare 200 response codes), which
+        # cannot be sorted together with string keys
+        canonical = json.dumps(
+            _stringify_keys(spec), sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheHit(Exception):
+    """Raised from a job's metadata callback once its spec turns out to be cached"""
+
+    def __init__(self, spec_hash: str, data: bytes):
+        super().__init__(spec_hash)
+        self.spec_hash = spec_hash
+        self.data = data
+
+
+class ResultCache:
+    """In-memory LRU of archives with a byte budget and an optional disk tier"""
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+        fingerprint: Optional[str] = None
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.fingerprint = fingerprint or generator_fingerprint()
+
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        # Upload digests with an alias file, by spec hash
+        self._disk_aliases: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._disk_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_evictions = 0
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*/*.zip"))
+            for alias_path in (self.disk_dir / "aliases").glob("*"):
+                try:
+                    if alias_path.suffix != ".tmp":
+                        self._disk_aliases.setdefault(alias_path.read_text(), set()).add(alias_path.name)
+                except OSError:
+                    continue
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Create a cache configured from RESULT_CACHE_* environment variables"""
+        return cls(
+            max_bytes=int(float(os.environ.get("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024),
+            disk_dir=os.environ.get("RESULT_CACHE_DIR") or None,
+            disk_max_bytes=int(float(os.environ.get("RESULT_CACHE_DISK_MAX_MB", "1024")) * 1024 * 1024)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether archives are kept anywhere"""
+        return self.max_bytes > 0 or self.disk_dir is not None
+
+    @property
+    def max_entry_bytes(self) -> int:
+        """Size of the largest archive some tier keeps"""
+        return max(self.max_bytes, self.disk_max_bytes if self.disk_dir else 0)
+
+    def key(self, spec_hash: str, **options: Any) -> str:
+        """Build the cache key for a spec hash and generator options: ``<spec hash>.<options hash>``"""
+        material = json.dumps({"options": options, "generator": self.fingerprint}, sort_keys=True)
+        return f"{spec_hash}.{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def lookup(self, upload_digest: str, **options: Any) -> Optional[bytes]:
+        """Return the archive for an upload and options if it was generated before
+
+        Only uploads seen before are looked up (and counted); for a new
+        upload digest callers decode the spec and call ``lookup_spec``.
+        """
+        spec_hash = self.spec_hash_for(upload_digest)
+        if spec_hash is None:
+            return None
+        return self.get(self.key(spec_hash, **options))
+
+    def lookup_spec(self, upload_digest: str, spec_hash: str, **options: Any) -> Optional[bytes]:
+        """Return the archive for a canonical spec hash, aliasing the upload digest to it on a hit"""
+        data = self.get(self.key(spec_hash, **options))
+        if data is not None:
+            self.add_alias(upload_digest, spec_hash)
+        return data
+
+    def spec_hash_check(self, upload_digest: str, **options: Any) -> Optional[Callable[[Dict[str, Any]], None]]:
+        """An ``on_meta`` callback for the job generating a new upload
+
+        Once the job reports the canonical hash of the spec it decoded, the
+        callback looks the archive up by it and raises ``CacheHit`` if it is
+        cached, which stops the job. None when the upload needs no check: the
+        cache is off, or the upload was seen before and ``lookup`` answered.
+        """
+        if not self.enabled or self.spec_hash_for(upload_digest) is not None:
+            return None
+
+        def check(meta: Dict[str, Any]):
+            spec_hash = meta.get("spec_hash")
+            if spec_hash is not None:
+                data = self.lookup_spec(upload_digest, spec_hash, **options)
+                if data is not None:
+                    raise CacheHit(spec_hash, data)
+
+        return check
+
+    def store(self, upload_digest: str, spec_hash: str, data: bytes, **options: Any):
+        """Remember an upload's spec hash and cache the archive generated from it"""
+        self.add_alias(upload_digest, spec_hash)
+        self.put(self.key(spec_hash, **options), data)
+
+    def spec_hash_for(self, upload_digest: str) -> Optional[str]:
+        """Return the canonical spec hash previously seen for an upload digest"""
+        spec_hash = self._aliases.get(upload_digest)
+        if spec_hash is not None:
+            self._aliases.move_to_end(upload_digest)
+            return spec_hash
+        if self.disk_dir:
+            alias_path = self.disk_dir / "aliases" / upload_digest
+            if alias_path.exists():
+                spec_hash = alias_path.read_text()
+                self._remember_alias(upload_digest, spec_hash)
+                return spec_hash
+        return None
+
+    def add_alias(self, upload_digest: str, spec_hash: str):
+        """Record the canonical spec hash of an upload digest"""
+        self._remember_alias(upload_digest, spec_hash)
+        if self.disk_dir:
+            self._write_atomic(self.disk_dir / "aliases" / upload_digest, spec_hash.encode("utf-8"))
+            self._disk_aliases.setdefault(spec_hash, set()).add(upload_digest)
+
+    def _remember_alias(self, upload_digest: str, spec_hash: str):
+        self._aliases[upload_digest] = spec_hash
+        self._aliases.move_to_end(upload_digest)
+        while len(self._aliases) > MAX_ALIASES:
+            self._aliases.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached archive, promoting disk hits into memory"""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                os.utime(path)
+                self.hits += 1
+                self.disk_hits += 1
+                self._store_memory(key, data)
+                return data
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes):
+        """Store an archive in memory and, if configured, on disk"""
+        self._store_memory(key, data)
+        if self.disk_dir and len(data) <= self.disk_max_bytes and not self._disk_path(key).exists():
+            self._write_atomic(self._disk_path(key), data)
+            self._disk_bytes += len(data)
+            self._trim_disk()
+
+    def _store_memory(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.zip"
+
+    def _trim_disk(self):
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        # Least recently used first: hits refresh the mtime
+        files = sorted(self.disk_dir.glob("*/*.zip"), key=lambda p: p.stat().st_mtime)
+        evicted = set()
+        for path in files:
+            if self._disk_bytes <= self.disk_max_bytes:
+                break
+            size = path.stat().st_size
+            path.unlink()
+            self._disk_bytes -= size
+            self.disk_evictions += 1
+            evicted.add(path.name.split(".")[0])
+        self._trim_aliases(evicted)
+
+    def _trim_aliases(self, spec_hashes: Set[str]):
+        """Remove the alias files of spec hashes with no archive left on disk"""
+        for spec_hash in spec_hashes:
+            if any((self.disk_dir / spec_hash[:2]).glob(f"{spec_hash}.*.zip")):
+                continue
+            for upload_digest in self._disk_aliases.pop(spec_hash, ()):
+                (self.disk_dir / "aliases" / upload_digest).unlink(missing_ok=True)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters plus current usage"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_hits": self.disk_hits,
+            "disk_evictions": self.disk_evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self.disk_dir is not None,
+            "disk_bytes": self._disk_bytes,
+            "fingerprint": self.fingerprint[:12]
+        }
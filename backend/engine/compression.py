@@ -0,0 +1,82 @@
+"""
+Compressed request bodies.
+
+Clients may send a body with ``Content-Encoding: gzip`` or ``deflate`` (the
+CLI compresses its spec uploads). ``DecompressionMiddleware`` inflates such a
+body chunk by chunk as it is received, before the multipart or JSON parser
+reads it, so the server never buffers the compressed upload. The inflated
+size is capped, since a few kilobytes of gzip can expand to gigabytes; bodies
+over the cap get a 413, corrupt or truncated ones a 400 and other encodings a
+415.
+"""
+import zlib
+from typing import Any, Awaitable, Callable, Dict
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+
+# zlib window bits of each supported encoding
+ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "x-gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def inflating(receive: Receive, encoding: str, max_bytes: int) -> Receive:
+    """Wrap an ASGI receive callable to inflate the request body"""
+    decompressor = zlib.decompressobj(ENCODINGS[encoding])
+    inflated = 0
+
+    async def receive_inflated() -> Message:
+        nonlocal inflated
+        message = await receive()
+        if message["type"] != "http.request":
+            return message
+        try:
+            # Never inflate past the cap, however well the chunk compresses
+            body = decompressor.decompress(message.get("body", b""), max_bytes - inflated + 1)
+            if not message.get("more_body", False):
+                body += decompressor.flush()
+                if not decompressor.eof:
+                    raise zlib.error("truncated stream")
+        except zlib.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid {encoding} request body: {e}")
+        inflated += len(body)
+        if inflated > max_bytes or decompressor.unconsumed_tail:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request body inflates to more than {max_bytes // (1024 * 1024)} MB"
+            )
+        return {**message, "body": body}
+
+    return receive_inflated
+
+
+class DecompressionMiddleware:
+    """ASGI middleware inflating gzip and deflate request bodies"""
+
+    def __init__(self, app, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Message, receive: Receive, send: Callable[[Message], Awaitable[None]]):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = next((value.decode("latin-1").strip().lower()
+                         for name, value in scope["headers"] if name == b"content-encoding"), "identity")
+        if encoding == "identity":
+            return await self.app(scope, receive, send)
+        if encoding not in ENCODINGS:
+            response = JSONResponse(status_code=415, content={"detail": f"Unsupported Content-Encoding: {encoding}"})
+            return await response(scope, receive, send)
+
+        # Handlers see the inflated body, whose length is not known up front
+        headers = [(name, value) for name, value in scope["headers"]
+                   if name not in (b"content-encoding", b"content-length")]
+        await self.app({**scope, "headers": headers}, inflating(receive, encoding, self.max_bytes), send)
@@ -0,0 +1,331 @@
+"""
+Process-pool execution engine for generation jobs.
+
+Parsing, generation and archiving are CPU bound, so running them inline in an
+``async def`` endpoint blocks the event loop for every other request. The
+engine hands jobs to a bounded ProcessPoolExecutor and awaits the result.
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from .tasks import init_worker
+
+# Items a streaming job may have in flight before the worker blocks
+STREAM_QUEUE_SIZE = 8
+
+# Seconds a worker waits for a reader to take an item before it abandons the job,
+# so a stream nobody reads or closes cannot hold a worker forever
+ABANDONED_STREAM_TIMEOUT = 300.0
+
+
+class EngineBusyError(Exception):
+    """Raised when the engine queue is full"""
+
+
+class EngineTimeoutError(Exception):
+    """Raised when a job exceeds the per-job timeout"""
+
+
+def _put(items, cancelled, item, timeout: float = ABANDONED_STREAM_TIMEOUT) -> bool:
+    """Put an item on a stream queue, giving up once the reader has gone away"""
+    deadline = time.monotonic() + timeout
+    while not cancelled.is_set() and time.monotonic() < deadline:
+        try:
+            items.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _channel(manager) -> Tuple[Any, Any]:
+    """The item queue and cancellation event of a streaming job"""
+    return manager.Queue(STREAM_QUEUE_SIZE), manager.Event()
+
+
+def _pump(items, cancelled, fn: Callable[..., Any], args: tuple):
+    """Worker-side driver of a streaming job.
+
+    ``fn(*args)`` is a generator yielding ``bytes`` chunks or ``dict``
+    metadata; each is forwarded to the reader through the shared queue.
+    """
+    try:
+        for item in fn(*args):
+            kind = "meta" if isinstance(item, dict) else "data"
+            if not _put(items, cancelled, (kind, item)):
+                return
+    except Exception as e:
+        try:
+            _put(items, cancelled, ("error", e))
+        except Exception:
+            # The exception itself could not be pickled
+            _put(items, cancelled, ("error", RuntimeError(str(e))))
+    else:
+        _put(items, cancelled, ("end", None))
+
+
+class JobStream:
+    """Chunks of a streaming job, read from a worker as they are produced
+
+    Whoever takes a stream must ``close()`` it, iterated or not (responses
+    close it in a background task); iterating to the end closes it too.
+    """
+
+    def __init__(self, engine: "GenerationEngine", items, cancelled,
+                 on_meta: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.meta: Dict[str, Any] = {}
+        self._on_meta = on_meta
+        self._engine = engine
+        self._items = items
+        self._cancelled = cancelled
+        self._first: Optional[bytes] = None
+        self._done = False
+
+    async def _next(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                kind, payload = await loop.run_in_executor(
+                    self._engine._get_readers(), self._items.get, True, self._engine.job_timeout
+                )
+            except queue.Empty:
+                self.close()
+                raise EngineTimeoutError(
+                    f"Generation produced no output for {self._engine.job_timeout:g} seconds"
+                )
+            if kind == "meta":
+                self.meta.update(payload)
+                if self._on_meta is not None:
+                    self._on_meta(payload)
+                continue
+            if kind == "error":
+                self.close()
+                raise payload
+            if kind == "end":
+                self.close()
+                return None
+            return payload
+
+    async def _open(self):
+        # Wait for the first chunk so errors raised while parsing or
+        # generating surface before the response has started
+        self._first = await self._next()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            chunk = self._first
+            while chunk is not None:
+                yield chunk
+                chunk = await self._next()
+        finally:
+            self.close()
+
+    def close(self):
+        """Tell the worker to stop if the stream is abandoned"""
+        if not self._done:
+            self._done = True
+            self._cancelled.set()
+
+
+class GenerationEngine:
+    """Bounded process pool shared by all generation endpoints"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        queue_depth: int = 32,
+        job_timeout: Optional[float] = 120.0,
+        start_method: str = "spawn"
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_depth = queue_depth
+        self.job_timeout = job_timeout
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "GenerationEngine":
+        """Create an engine configured from GENERATION_* environment variables"""
+        timeout = float(os.environ.get("GENERATION_TIMEOUT", "120"))
+        return cls(
+            max_workers=int(os.environ.get("GENERATION_WORKERS", "0")) or None,
+            queue_depth=int(os.environ.get("GENERATION_QUEUE_DEPTH", "32")),
+            job_timeout=timeout if timeout > 0 else None,
+            start_method=os.environ.get("GENERATION_START_METHOD", "spawn")
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of running plus queued jobs"""
+        return self.max_workers + self.queue_depth
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs waiting for a worker or holding one, streams included"""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=init_worker
+                )
+            return self._executor
+
+    def _get_manager(self):
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context(self.start_method).Manager()
+            return self._manager
+
+    def _get_readers(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._readers is None:
+                self._readers = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="engine-stream"
+                )
+            return self._readers
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    def _admit(self):
+        """Count a new job, or refuse it when the queue is full"""
+        if self._pending >= self.capacity:
+            raise EngineBusyError(
+                f"Generation queue is full ({self.capacity} jobs), try again later"
+            )
+        self._pending += 1
+
+    def _finish(self, slots: asyncio.Semaphore):
+        """Give back the worker slot of a job and stop counting it"""
+        self._pending -= 1
+        slots.release()
+
+    def _finish_threadsafe(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore):
+        try:
+            loop.call_soon_threadsafe(self._finish, slots)
+        except RuntimeError:
+            # The loop is already closed, nobody is waiting on the slot
+            self._pending -= 1
+
+    def _submit(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore, fn: Callable[..., Any], *args: Any):
+        """Submit a job holding a slot; the slot is given back when the job is done"""
+        executor = None
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args)
+        except BaseException as e:
+            self._finish(slots)
+            if isinstance(e, BrokenProcessPool) and executor is not None:
+                self._discard_broken(executor)
+            raise
+        future.add_done_callback(lambda _: self._finish_threadsafe(loop, slots))
+        return executor, future
+
+    def _discard_broken(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` in a worker process and return its result.
+
+        Jobs wait on the event loop for a free worker, and the timeout only
+        covers execution. A timed-out job keeps its worker slot until the
+        process actually finishes it, so the pool is never oversubscribed.
+        """
+        self._admit()
+        slots = self._get_slots()
+        try:
+            await slots.acquire()
+        except BaseException:
+            self._pending -= 1
+            raise
+        loop = asyncio.get_running_loop()
+        executor, future = self._submit(loop, slots, fn, *args)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise EngineTimeoutError(f"Generation timed out after {self.job_timeout:g} seconds")
+        except BrokenProcessPool:
+            self._discard_broken(executor)
+            raise
+
+    async def stream(self, fn: Callable[..., Any], *args: Any,
+                     on_meta: Optional[Callable[[Dict[str, Any]], None]] = None) -> JobStream:
+        """Start a streaming job and return once its first chunk is available.
+
+        ``fn(*args)`` runs in a worker as a generator of ``bytes`` chunks
+        (and optional ``dict`` metadata, passed to ``on_meta`` as it arrives).
+        Errors raised before the first chunk propagate from this call. The
+        timeout applies to the gap between chunks, so a slow reader never
+        counts against the job.
+        """
+        self._admit()
+        slots = self._get_slots()
+        loop = asyncio.get_running_loop()
+        try:
+            # Starting the manager process and creating its proxies block.
+            # The channel comes first, so a failure or cancellation here never
+            # holds a slot
+            items, cancelled = await loop.run_in_executor(None, lambda: _channel(self._get_manager()))
+            await slots.acquire()
+        except BaseException:
+            self._pending -= 1
+            raise
+        self._submit(loop, slots, _pump, items, cancelled, fn, args)
+
+        stream = JobStream(self, items, cancelled, on_meta)
+        try:
+            await stream._open()
+        except BaseException:
+            stream.close()
+            raise
+        return stream
+
+    async def track(self, fn: Callable[..., Any], *args: Any,
+                    on_progress: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Run a job that reports progress and return its merged updates.
+
+        ``fn(*args)`` runs in a worker as a generator of ``dict`` updates,
+        each passed to ``on_progress`` as it arrives. As for ``stream``, the
+        timeout applies to the gap between updates rather than the whole job.
+        """
+        stream = await self.stream(fn, *args, on_meta=on_progress)
+        async for _ in stream:
+            pass
+        return stream.meta
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+            readers, self._readers = self._readers, None
+        self._slots = None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if readers is not None:
+            readers.shutdown(wait=False)
+        if manager is not None:
+            manager.shutdown()
@@ -0,0 +1,322 @@
+"""
+Queue of generation jobs that clients poll instead of holding a request open.
+
+A submitted job gets an id at once and runs in the background on the shared
+``GenerationEngine``, reporting its phase (parse, resolve, render, archive)
+and percentage as it goes. The status of every job is kept in memory and
+mirrored to ``<id>.json`` in a local store directory, beside the finished
+archive ``<id>.zip``. Without a configured directory each queue uses a
+private temporary one, removed at shutdown.
+
+A configured directory may be shared: finished jobs survive a restart of the
+server, and several server processes (e.g. uvicorn workers) answer for each
+other's jobs by reading their status from the store, which is written at
+each phase change. Each status records the process that runs the job; when a
+queue starts, unfinished jobs whose process is gone from this host are
+marked failed, while those of live processes are left to them.
+
+At most ``max_jobs`` jobs are queued or running at once. Finished jobs and
+their archives are removed ``ttl`` seconds after they finish. Watchers (the
+Server-Sent Events endpoint) wait on ``Job.wait`` for the next update.
+"""
+import asyncio
+import json
+import os
+import shutil
+import socket
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .cache import CacheHit, ResultCache, content_digest
+from .executor import EngineBusyError, GenerationEngine
+from .tasks import GenerationError, archive_job
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED = (DONE, FAILED)
+
+
+class Job:
+    """Status of one generation job"""
+
+    def __init__(self, job_id: str, options: Dict[str, Any], created: Optional[float] = None):
+        self.id = job_id
+        self.options = options
+        self.status = QUEUED
+        self.phase: Optional[str] = None
+        self.percent = 0
+        self.error: Optional[str] = None
+        self.spec_hash: Optional[str] = None
+        self.bytes: Optional[int] = None
+        self.created = created if created is not None else time.time()
+        self.finished: Optional[float] = None
+        # ``<host>:<pid>`` of the server process that last ran or restored the job
+        self.owner: Optional[str] = None
+        # Incremented on every update; watchers wait for it to change
+        self.version = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def filename(self) -> str:
+        return f"{self.options['package_name']}_{self.options['language']}.zip"
+
+    def update(self, **fields: Any):
+        """Change fields of the job and wake its watchers"""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, version: int, timeout: float):
+        """Return once the job changed since ``version``, or after ``timeout`` seconds"""
+        if self.version != version:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "phase": self.phase,
+            "percent": self.percent,
+            "error": self.error,
+            "language": self.options["language"],
+            "package_name": self.options["package_name"],
+            "filename": self.filename,
+            "bytes": self.bytes,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], options: Dict[str, Any]) -> "Job":
+        job = cls(data["id"], options, data["created"])
+        for name in ("status", "phase", "percent", "error", "bytes", "finished"):
+            setattr(job, name, data.get(name))
+        job.spec_hash = data.get("spec_hash")
+        job.owner = data.get("owner")
+        return job
+
+
+def _is_live(owner: Optional[str]) -> bool:
+    """Whether the process that owns a job (``<host>:<pid>``) may still run it"""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname():
+        # A legacy status without an owner, or another host whose processes cannot be checked
+        return bool(host)
+    try:
+        os.kill(int(pid), 0)
+    except PermissionError:
+        # Alive, under another user
+        return True
+    except (ProcessLookupError, ValueError):
+        return False
+    return True
+
+
+class JobQueue:
+    """Background generation jobs backed by a local store directory"""
+
+    def __init__(
+        self,
+        engine: GenerationEngine,
+        store_dir: Optional[str] = None,
+        max_jobs: Optional[int] = None,
+        ttl: float = 3600.0,
+        result_cache: Optional[ResultCache] = None,
+        on_done: Optional[Callable[[Job, Dict[str, Any]], None]] = None
+    ):
+        self.engine = engine
+        # A private store lives as long as the queue
+        self._temporary_store = store_dir is None
+        self.store_dir = Path(store_dir or tempfile.mkdtemp(prefix="apigen-jobs-"))
+        # Recorded with each job, so other processes sharing the store leave it alone
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.max_jobs = max_jobs or engine.capacity
+        self.ttl = ttl
+        self.result_cache = result_cache
+        # Called with each job that finishes and its last update; a job served
+        # from the result cache reports ``cached`` and no timings
+        self.on_done = on_done
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @classmethod
+    def from_env(cls, engine: GenerationEngine, result_cache: Optional[ResultCache] = None,
+                 on_done: Optional[Callable[[Job, Dict[str, Any]], None]] = None) -> "JobQueue":
+        """Create a queue configured from GENERATION_JOB_* environment variables"""
+        return cls(
+            engine,
+            store_dir=os.environ.get("GENERATION_JOB_DIR") or None,
+            max_jobs=int(os.environ.get("GENERATION_JOB_MAX", "0")) or None,
+            ttl=float(os.environ.get("GENERATION_JOB_TTL", "3600")),
+            result_cache=result_cache,
+            on_done=on_done
+        )
+
+    @property
+    def active(self) -> int:
+        """Number of jobs queued or running"""
+        return len(self._tasks)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job of this queue, or the last stored status of one another process runs"""
+        self._expire()
+        job = self._jobs.get(job_id)
+        if job is None and len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id):
+            job = self._read(self.store_dir / f"{job_id}.json")
+        return job
+
+    def artifact(self, job: Job) -> Path:
+        """Path of the archive of a job (present once it is done)"""
+        return self.store_dir / f"{job.id}.zip"
+
+    def submit(self, content: bytes, filename: str, **options: Any) -> Job:
+        """Queue a job generating a client archive; must run on the event loop.
+
+        Options are those of ``tasks.archive_job``: language, package_name,
+        include_tests and include_docs. An archive already in the result
+        cache finishes the job immediately, or as soon as the spec is decoded
+        when only its canonical hash is known to the cache.
+        """
+        self._expire()
+        if self.active >= self.max_jobs:
+            raise EngineBusyError(f"Job queue is full ({self.max_jobs} jobs), try again later")
+
+        job = Job(uuid.uuid4().hex, options)
+        self._jobs[job.id] = job
+        upload_digest = content_digest(content)
+        cached = self.result_cache.lookup(upload_digest, **options) if self.result_cache else None
+        if cached is not None:
+            self.artifact(job).write_bytes(cached)
+            job.update(status=DONE, phase="archive", percent=100, bytes=len(cached), finished=time.time())
+            self._save(job)
+            self._done_cached(job, content)
+            return job
+
+        self._save(job)
+        self._tasks[job.id] = asyncio.get_running_loop().create_task(
+            self._run(job, content, filename, upload_digest)
+        )
+        return job
+
+    async def _run(self, job: Job, content: bytes, filename: str, upload_digest: str):
+        options = job.options
+        cache = self.result_cache
+        # New bytes may still be a known spec, reformatted or reordered
+        check_cache = cache.spec_hash_check(upload_digest, **options) if cache is not None else None
+
+        def on_progress(update: Dict[str, Any]):
+            if check_cache is not None:
+                check_cache(update)
+            phase_changed = update["phase"] != job.phase
+            job.update(
+                status=RUNNING,
+                phase=update["phase"],
+                percent=update["percent"],
+                spec_hash=update.get("spec_hash", job.spec_hash)
+            )
+            if phase_changed:
+                self._save(job)
+
+        try:
+            result = await self.engine.track(
+                archive_job,
+                content,
+                filename,
+                options["language"],
+                options["package_name"],
+                options["include_tests"],
+                options["include_docs"],
+                str(self.artifact(job)),
+                on_progress=on_progress
+            )
+        except CacheHit as hit:
+            self.artifact(job).write_bytes(hit.data)
+            job.update(status=DONE, phase="archive", percent=100, spec_hash=hit.spec_hash,
+                       bytes=len(hit.data), finished=time.time())
+            self._done_cached(job, content)
+        except asyncio.CancelledError:
+            job.update(status=FAILED, error="Cancelled", finished=time.time())
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, GenerationError) else str(e) or type(e).__name__
+            job.update(status=FAILED, error=error, finished=time.time())
+        else:
+            job.update(status=DONE, percent=100, bytes=result["bytes"], finished=time.time())
+            if cache is not None and job.bytes <= cache.max_entry_bytes:
+                cache.store(
+                    upload_digest, job.spec_hash, self.artifact(job).read_bytes(), **options
+                )
+            if self.on_done is not None:
+                self.on_done(job, result)
+        finally:
+            self._tasks.pop(job.id, None)
+            self._save(job)
+
+    def _done_cached(self, job: Job, content: bytes):
+        if self.on_done is not None:
+            self.on_done(job, {"phase": "archive", "percent": 100, "bytes": job.bytes,
+                               "spec_bytes": len(content), "timings": {}, "cached": True})
+
+    def _expire(self):
+        """Forget finished jobs older than the time to live, with their files"""
+        cutoff = time.time() - self.ttl
+        for job in [job for job in self._jobs.values() if job.finished and job.finished < cutoff]:
+            del self._jobs[job.id]
+            self.artifact(job).unlink(missing_ok=True)
+            (self.store_dir / f"{job.id}.json").unlink(missing_ok=True)
+
+    def _save(self, job: Job):
+        data = {**job.to_dict(), "options": job.options, "spec_hash": job.spec_hash, "owner": self.owner}
+        path = self.store_dir / f"{job.id}.json"
+        temp_path = path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Job]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            job = Job.from_dict(data, data["options"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return job
+
+    def _load(self):
+        """Restore the jobs of a previous server run from the store"""
+        for path in self.store_dir.glob("*.json"):
+            job = self._read(path)
+            if job is None:
+                path.unlink(missing_ok=True)
+                continue
+            if job.status not in FINISHED:
+                if _is_live(job.owner):
+                    # Another server process sharing the store runs it
+                    continue
+                job.update(status=FAILED, error="Interrupted by a server restart", finished=time.time())
+                self._save(job)
+            self._jobs[job.id] = job
+        self._expire()
+
+    async def shutdown(self):
+        """Cancel jobs that are still queued or running"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._temporary_store:
+            shutil.rmtree(self.store_dir, ignore_errors=True)
@@ -0,0 +1,305 @@
+"""
+Incremental, atomic writer of generated files.
+
+Rewriting every file on every run touches mtimes and makes ``go build``,
+``cargo`` or ``mvn`` rebuild the whole client. ``OutputWriter`` keeps a
+manifest of the SHA-256 and size of every file it wrote (``.apigen-manifest.json``
+in the output directory) and on the next run:
+
+- leaves files whose content is unchanged untouched;
+- writes new and changed files to a temporary file beside the target and
+  renames it into place, so readers never see a partial file;
+- deletes files of the previous run that are no longer generated (only files
+  listed in the manifest, never files the user added).
+
+Files are consumed as streamed ``(path, chunk)`` pairs. Each file is hashed as
+it arrives and buffered up to ``SPILL_BYTES``; larger files spill to their
+temporary file, so memory stays bounded. Without a manifest (first run, or
+output written by an older version) a file of the same size is compared
+against the disk, so existing identical files are kept as well.
+
+Directories are created once per run. With several workers, the thread that
+renders still hashes and compares each file, so unchanged files cost nothing
+more; writing and renaming changed files happen in a thread pool, overlapping
+with rendering. Files larger than ``SPILL_BYTES`` are written by the rendering
+thread as they stream.
+"""
+import hashlib
+import itertools
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, groupby
+from operator import itemgetter
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+MANIFEST_NAME = ".apigen-manifest.json"
+MANIFEST_VERSION = 1
+
+# Content of one file buffered in memory before it spills to its temporary file
+SPILL_BYTES = 1024 * 1024
+
+# Threads writing files. The work is system calls and hashing, which release the
+# GIL but need a core each: on a single CPU the pool only adds overhead.
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# Files collected but not yet written, per worker, before rendering waits
+QUEUED_FILES_PER_WORKER = 16
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+_temp_counter = itertools.count()
+
+
+class FileEntry(NamedTuple):
+    """Manifest record of a written file"""
+    sha256: str
+    size: int
+
+
+class OutputReport(NamedTuple):
+    """What one run did to the output directory (paths are relative)"""
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: int
+    bytes: int
+
+    @property
+    def files(self) -> int:
+        """Files generated by the run"""
+        return len(self.added) + len(self.changed) + self.unchanged
+
+    @property
+    def written(self) -> List[str]:
+        return self.added + self.changed
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+        }
+
+    def throughput(self, seconds: float) -> Dict[str, float]:
+        """Files and megabytes generated per second over ``seconds``"""
+        seconds = max(seconds, 1e-9)
+        return {
+            "files_per_second": round(self.files / seconds, 1),
+            "mb_per_second": round(self.bytes / seconds / 1e6, 2),
+        }
+
+
+class OutputWriter:
+    """Bring a directory up to date with a generated client.
+
+    The manifest is read on first use and kept in memory, so one writer can
+    serve successive runs (watch mode) without re-reading it.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._manifest: Optional[Dict[str, FileEntry]] = None
+        self._directories: Set[Path] = set()
+
+    @property
+    def manifest(self) -> Dict[str, FileEntry]:
+        """Files of the previous run by relative path"""
+        if self._manifest is None:
+            self._manifest = self._load_manifest()
+        return self._manifest
+
+    def write(self, chunks: Iterable[Tuple[str, str]], workers: int = 1) -> OutputReport:
+        """Write streamed files (consecutive chunks per path) and remove stale ones"""
+        self.manifest  # Loaded before any worker reads it
+        self._directories.clear()
+        results: List[Tuple[str, str, FileEntry]] = []
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="apigen-write") if workers > 1 else None
+        queued: Deque[Future] = deque()
+        try:
+            for file_path, pieces in groupby(chunks, key=itemgetter(0)):
+                path = self.root / file_path
+                self._make_directory(path.parent)
+                file_chunks: List[str] = []
+                size = 0
+                for _, chunk in pieces:
+                    file_chunks.append(chunk)
+                    size += len(chunk)
+                    if size > SPILL_BYTES:
+                        break
+                if size > SPILL_BYTES:
+                    # Too large to hold: write it here as it streams
+                    results.append(self.write_file(file_path, chain(file_chunks, (chunk for _, chunk in pieces))))
+                    continue
+
+                # Hash and compare here, so only actual writes reach the pool
+                content = "".join(file_chunks).encode("utf-8")
+                entry = FileEntry(hashlib.sha256(content).hexdigest(), len(content))
+                status = self._status(file_path, path, entry)
+                results.append((file_path, status, entry))
+                if status == UNCHANGED:
+                    continue
+                if pool is None:
+                    self._replace(path, content)
+                    continue
+                queued.append(pool.submit(self._replace, path, content))
+                if len(queued) >= workers * QUEUED_FILES_PER_WORKER:
+                    queued.popleft().result()
+            for future in queued:
+                future.result()
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+        return self.finish(results)
+
+    def write_file(self, relative_path: str, chunks: Iterable[str]) -> Tuple[str, str, FileEntry]:
+        """Write one streamed file unless its content is unchanged.
+
+        Returns (relative path, ADDED / CHANGED / UNCHANGED, manifest entry).
+        """
+        path = self.root / relative_path
+        hasher = hashlib.sha256()
+        buffer: List[bytes] = []
+        buffered = 0
+        handle = None
+        temp_path = None
+        try:
+            for chunk in chunks:
+                data = chunk.encode("utf-8")
+                hasher.update(data)
+                buffered += len(data)
+                if handle is not None:
+                    handle.write(data)
+                    continue
+                buffer.append(data)
+                if buffered > SPILL_BYTES:
+                    handle, temp_path = self._open_temp(path)
+                    handle.write(b"".join(buffer))
+                    buffer = []
+
+            entry = FileEntry(hasher.hexdigest(), buffered)
+            status = self._status(relative_path, path, entry)
+            if status != UNCHANGED:
+                if handle is None:
+                    handle, temp_path = self._open_temp(path)
+                    handle.write(b"".join(buffer))
+                handle.close()
+                handle = None
+                os.replace(temp_path, path)
+                temp_path = None
+        finally:
+            if handle is not None:
+                handle.close()
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+        return relative_path, status, entry
+
+    def finish(self, results: Iterable[Tuple[str, str, FileEntry]]) -> OutputReport:
+        """Remove files no longer generated, save the manifest and report"""
+        added: List[str] = []
+        changed: List[str] = []
+        unchanged = 0
+        size = 0
+        entries: Dict[str, FileEntry] = {}
+        for relative_path, status, entry in results:
+            entries[relative_path] = entry
+            size += entry.size
+            if status == ADDED:
+                added.append(relative_path)
+            elif status == CHANGED:
+                changed.append(relative_path)
+            else:
+                unchanged += 1
+
+        previous = self.manifest
+        removed = [relative_path for relative_path in previous if relative_path not in entries]
+        for relative_path in removed:
+            path = self.root / relative_path
+            path.unlink(missing_ok=True)
+            self._prune(path.parent)
+
+        if entries != previous:
+            self._save_manifest(entries)
+        self._manifest = entries
+        return OutputReport(added, changed, removed, unchanged, size)
+
+    def _status(self, relative_path: str, path: Path, entry: FileEntry) -> str:
+        """ADDED, CHANGED or UNCHANGED, comparing with the manifest or else the disk"""
+        previous = self.manifest.get(relative_path)
+        try:
+            on_disk = path.stat().st_size
+        except OSError:
+            return ADDED if previous is None else CHANGED
+        if on_disk != entry.size:
+            return CHANGED
+        if previous is not None:
+            return UNCHANGED if previous == entry else CHANGED
+        # Not in the manifest: compare with the file itself
+        hasher = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(SPILL_BYTES), b""):
+                hasher.update(block)
+        return UNCHANGED if hasher.hexdigest() == entry.sha256 else CHANGED
+
+    def _replace(self, path: Path, content: bytes):
+        """Atomically replace ``path`` with ``content``"""
+        handle, temp_path = self._open_temp(path)
+        try:
+            with handle:
+                handle.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def _make_directory(self, directory: Path):
+        if directory not in self._directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._directories.add(directory)
+
+    @staticmethod
+    def _open_temp(path: Path):
+        temp_path = path.parent / f".{path.name}.{os.getpid()}.{next(_temp_counter)}.tmp"
+        # Created like an ordinary file (0666 less the umask), not 0600 like mkstemp
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        try:
+            fd = os.open(temp_path, flags, 0o666)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(temp_path, flags, 0o666)
+        return os.fdopen(fd, "wb"), temp_path
+
+    def _prune(self, directory: Path):
+        """Remove directories emptied by removals, up to the output root"""
+        while directory != self.root and self.root in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+
+    def _load_manifest(self) -> Dict[str, FileEntry]:
+        try:
+            data = json.loads((self.root / MANIFEST_NAME).read_text(encoding="utf-8"))
+            if data.get("version") != MANIFEST_VERSION:
+                return {}
+            return {
+                relative_path: FileEntry(entry["sha256"], entry["size"])
+                for relative_path, entry in data["files"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or unreadable: every file is compared with the disk
+            return {}
+
+    def _save_manifest(self, entries: Dict[str, FileEntry]):
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": {relative_path: entry._asdict() for relative_path, entry in sorted(entries.items())}
+        }
+        self._replace(self.root / MANIFEST_NAME, json.dumps(data, indent=1).encode("utf-8"))
+
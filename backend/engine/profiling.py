@@ -0,0 +1,134 @@
+"""
+Sampling profiler for a single generation.
+
+``StackSampler`` looks at the call stack of the thread running a generation
+from a background thread every ``interval`` seconds (``sys._current_frames``);
+as the sampler waits for the GIL, a busy pipeline is sampled every few
+milliseconds in practice. The profiled code runs unmodified, so unlike
+``cProfile`` the overhead does not grow with the number of calls: it is about
+1% of generation time. Every sample is filed under the phase the pipeline was
+in when it was taken.
+
+Samples are exported in the collapsed-stack format read by ``flamegraph.pl``,
+speedscope and inferno: one ``phase;outer;...;inner count`` line per distinct
+stack.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+# Seconds between samples
+DEFAULT_INTERVAL = 0.001
+
+# Functions listed in a summary, by samples spent in the function itself
+SUMMARY_FUNCTIONS = 20
+
+
+class StackSampler:
+    """Sample the stack of one thread until stopped.
+
+    Only frames below ``root`` (the frame that started the sampler, by
+    default) are kept, so the stacks start at the profiled pipeline rather
+    than at whatever called it.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, root: Optional[FrameType] = None):
+        self.interval = interval
+        self.phase = "start"
+        self.stacks: Counter = Counter()
+        self._thread_id = threading.get_ident()
+        self._root = root if root is not None else sys._getframe(1)
+        self._labels: Dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def start(self) -> "StackSampler":
+        # The sampler needs the GIL to read the other thread's stack; have the
+        # interpreter hand it over at least once per interval
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._sampler = threading.Thread(target=self._run, name="apigen-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        sys.setswitchinterval(self._switch_interval)
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack: List[str] = []
+            while frame is not None and frame is not self._root:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(self.phase)
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # Module directory and file keep labels short but unambiguous
+            path = os.path.normpath(code.co_filename).split(os.sep)
+            label = f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed-stack format, heaviest stacks first"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def functions(self) -> List[Tuple[str, int, int]]:
+        """(function, samples in it, samples in it or its callees), by the former"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            # The first entry is the phase; samples in the root itself have no frames
+            frames = stack[1:]
+            if frames:
+                own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return [(label, samples, total[label]) for label, samples in own.most_common()]
+
+    def summary(self, timings: Dict[str, Any], limit: int = SUMMARY_FUNCTIONS) -> Dict[str, Any]:
+        """Phase timings, samples per phase and the functions most samples were in"""
+        samples = max(self.samples, 1)
+        phase_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            phase_samples[stack[0]] += count
+        seconds = {key[:-len("_seconds")]: value for key, value in timings.items() if key.endswith("_seconds")}
+        elapsed = max(sum(seconds.values()), 1e-9)
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "phases": [
+                {"phase": phase, "seconds": round(value, 4), "percent": round(value / elapsed * 100, 1)}
+                for phase, value in seconds.items()
+            ],
+            "phase_samples": dict(phase_samples.most_common()),
+            "functions": [
+                {
+                    "function": label,
+                    "self_percent": round(own / samples * 100, 1),
+                    "total_percent": round(total / samples * 100, 1),
+                }
+                for label, own, total in self.functions()[:limit]
+            ],
+        }
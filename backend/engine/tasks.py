@@ -0,0 +1,421 @@
+"""
+Generation jobs executed inside engine worker processes.
+
+Everything in this module runs in a ProcessPoolExecutor worker, so each job is a
+module-level function that takes and returns only picklable values.
+"""
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, TypeVar, Union
+
+from generators import (
+    FileChunk,
+    PythonGenerator,
+    JavaScriptGenerator,
+    GoGenerator,
+    RustGenerator,
+    CSharpGenerator,
+    JavaGenerator,
+    PHPGenerator,
+    with_client_model
+)
+from parsers import OpenAPIParser
+from parsers.spec_loader import load_spec
+from templates import preload
+
+from .cache import spec_digest
+from .output import DEFAULT_WORKERS, OutputReport, OutputWriter
+from .profiling import DEFAULT_INTERVAL, StackSampler
+from .zipstream import ZipStreamWriter, compress_members, iter_zip
+
+GENERATOR_CLASSES = {
+    "python": PythonGenerator,
+    "javascript": JavaScriptGenerator,
+    "go": GoGenerator,
+    "rust": RustGenerator,
+    "csharp": CSharpGenerator,
+    "java": JavaGenerator,
+    "php": PHPGenerator,
+}
+
+# Progress of a queued job: the percentage at which each phase starts
+JOB_PHASES = {"parse": 0, "resolve": 10, "render": 25, "archive": 95}
+
+# Folder of a profiled archive holding the profile summary and stacks
+PROFILE_DIR = "apigen-profile"
+
+# Maximum number of characters of each file returned by a preview
+PREVIEW_MAX_CHARS = 4000
+
+
+class GenerationError(Exception):
+    """Error raised by a generation job, carrying the HTTP status to report"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+    def __str__(self) -> str:
+        return self.detail
+
+
+T = TypeVar("T")
+
+
+def timed(items: Iterable[T], timings: Dict[str, Any], key: str) -> Iterator[T]:
+    """Yield from ``items``, adding the time spent producing them to ``timings[key]``.
+
+    Time spent by the consumer between items is not counted, so nested
+    ``timed`` iterators separate interleaved stages (rendering and zipping).
+    """
+    iterator = iter(items)
+    timings.setdefault(key, 0.0)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timings[key] += time.perf_counter() - start
+        yield item
+
+
+def decode_spec(content: bytes, filename: str, timings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Decode an uploaded specification, whatever its extension"""
+    start = time.perf_counter()
+    try:
+        spec = load_spec(content)
+    except Exception as e:
+        raise GenerationError(400, f"Invalid OpenAPI format: {str(e)}")
+    if timings is not None:
+        timings["decode_seconds"] = time.perf_counter() - start
+    return spec
+
+
+def parse_spec(spec: Dict[str, Any], timings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Validate and parse a decoded specification"""
+    timings = {} if timings is None else timings
+    try:
+        start = time.perf_counter()
+        parser = OpenAPIParser(spec)
+        errors = parser.validate()
+        timings["validate_seconds"] = time.perf_counter() - start
+        if errors:
+            raise GenerationError(400, f"Invalid OpenAPI spec: {', '.join(errors)}")
+        start = time.perf_counter()
+        parsed_data = parser.parse(compact=True)
+        timings["parse_seconds"] = time.perf_counter() - start
+        return parsed_data
+    except GenerationError:
+        raise
+    except Exception as e:
+        raise GenerationError(400, f"Failed to parse OpenAPI spec: {str(e)}")
+
+
+def init_worker(template_dir: Optional[str] = None):
+    """Compile every template once when a worker process starts"""
+    preload(template_dir)
+
+
+def _make_generator(parsed_data: Dict[str, Any], language: str, package_name: str,
+                    include_tests: bool, include_docs: bool, template_dir: Optional[str]):
+    generator_class = GENERATOR_CLASSES[language]
+    return generator_class(
+        parsed_data=parsed_data,
+        package_name=package_name,
+        include_tests=include_tests,
+        include_docs=include_docs,
+        template_dir=template_dir
+    )
+
+
+def render_files(parsed_data: Dict[str, Any], language: str, package_name: str,
+                 include_tests: bool = False, include_docs: bool = True,
+                 template_dir: Optional[str] = None) -> Dict[str, str]:
+    """Run the generator for a language over parsed data"""
+    generator = _make_generator(parsed_data, language, package_name, include_tests, include_docs, template_dir)
+    try:
+        return generator.generate()
+    except Exception as e:
+        raise GenerationError(500, f"Failed to generate client: {str(e)}")
+
+
+def stream_files(parsed_data: Dict[str, Any], language: str, package_name: str,
+                 include_tests: bool = False, include_docs: bool = True,
+                 template_dir: Optional[str] = None) -> Iterator[FileChunk]:
+    """Run the generator for a language lazily, yielding (filepath, chunk) pairs"""
+    generator = _make_generator(parsed_data, language, package_name, include_tests, include_docs, template_dir)
+    try:
+        yield from generator.stream()
+    except Exception as e:
+        raise GenerationError(500, f"Failed to generate client: {str(e)}")
+
+
+def stream_archive(content: bytes, filename: str, language: str, package_name: str,
+                   include_tests: bool = False, include_docs: bool = True) -> Iterator[Union[bytes, Dict[str, Any]]]:
+    """Decode, parse and generate a client, streaming the ZIP archive.
+
+    Yields the canonical spec hash (the result cache key) as metadata as
+    soon as the spec is decoded, then the archive in chunks as each file is
+    rendered and compressed, then the ``timings`` of each phase as metadata.
+    """
+    timings: Dict[str, Any] = {}
+    spec = decode_spec(content, filename, timings)
+    yield {"spec_hash": spec_digest(spec)}
+    parsed_data = parse_spec(spec, timings)
+    files = stream_files(parsed_data, language, package_name, include_tests, include_docs)
+    yield from timed(iter_zip(timed(files, timings, "generate_seconds")), timings, "zip_seconds")
+    timings["zip_seconds"] -= timings["generate_seconds"]
+    yield {"timings": timings}
+
+
+def archive_job(content: bytes, filename: str, language: str, package_name: str,
+                include_tests: bool, include_docs: bool, artifact_path: str) -> Iterator[Dict[str, Any]]:
+    """Generate a client into a ZIP file at ``artifact_path``, yielding progress.
+
+    Each update has the current ``phase`` (see ``JOB_PHASES``) and overall
+    ``percent``; the one after decoding also carries the canonical spec hash,
+    the last the archive and spec sizes and the ``timings`` of each phase. Rendering
+    progress counts the operation and model views built. The archive is
+    written beside ``artifact_path`` and renamed into place.
+    """
+    timings: Dict[str, Any] = {}
+    yield {"phase": "parse", "percent": JOB_PHASES["parse"]}
+    spec = decode_spec(content, filename, timings)
+    yield {"phase": "parse", "percent": JOB_PHASES["parse"], "spec_hash": spec_digest(spec)}
+    parsed_data = parse_spec(spec, timings)
+
+    yield {"phase": "resolve", "percent": JOB_PHASES["resolve"]}
+    start = time.perf_counter()
+    parsed_data = with_client_model(parsed_data)
+    timings["resolve_seconds"] = time.perf_counter() - start
+    client_model = parsed_data["client_model"]
+    total = max(1, len(client_model.operations) + len(client_model.models))
+
+    yield {"phase": "render", "percent": JOB_PHASES["render"]}
+    generator = _make_generator(parsed_data, language, package_name, include_tests, include_docs, None)
+    span = JOB_PHASES["archive"] - JOB_PHASES["render"]
+    percent = JOB_PHASES["render"]
+    writer = ZipStreamWriter()
+    current = None
+    timings["zip_seconds"] = 0.0
+    temp_path = f"{artifact_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as archive:
+            try:
+                for file_path, chunk in timed(generator.stream(), timings, "generate_seconds"):
+                    start = time.perf_counter()
+                    if file_path != current:
+                        archive.write(writer.start_file(file_path))
+                        current = file_path
+                    archive.write(writer.write(chunk))
+                    timings["zip_seconds"] += time.perf_counter() - start
+                    rendered = JOB_PHASES["render"] + span * min(generator.views_built, total) // total
+                    if rendered > percent:
+                        percent = rendered
+                        yield {"phase": "render", "percent": percent}
+            except Exception as e:
+                raise GenerationError(500, f"Failed to generate client: {str(e)}")
+
+            yield {"phase": "archive", "percent": JOB_PHASES["archive"]}
+            start = time.perf_counter()
+            archive.write(writer.finish())
+            size = archive.tell()
+        os.replace(temp_path, artifact_path)
+        timings["zip_seconds"] += time.perf_counter() - start
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    yield {"phase": "archive", "percent": 100, "bytes": size, "spec_bytes": len(content), "timings": timings}
+
+
+def profile_archive(content: bytes, filename: str, language: str, package_name: str = "api_client",
+                    include_tests: bool = False, include_docs: bool = True,
+                    template_dir: Optional[str] = None, interval: float = DEFAULT_INTERVAL) -> Dict[str, Any]:
+    """Generate a client archive under the sampling profiler (see ``engine.profiling``).
+
+    Returns the ``archive``, with the profile ``summary`` and collapsed
+    ``stacks`` also added to it under ``PROFILE_DIR/``, and the ``timings``
+    of each phase.
+    """
+    timings: Dict[str, Any] = {}
+    writer = ZipStreamWriter()
+    parts: List[bytes] = []
+    current = None
+    zip_seconds = 0.0
+    with StackSampler(interval) as sampler:
+        sampler.phase = "decode"
+        spec = decode_spec(content, filename, timings)
+        sampler.phase = "parse"
+        parsed_data = parse_spec(spec, timings)
+        sampler.phase = "resolve"
+        start = time.perf_counter()
+        parsed_data = with_client_model(parsed_data)
+        timings["resolve_seconds"] = time.perf_counter() - start
+        sampler.phase = "generate"
+        files = stream_files(parsed_data, language, package_name, include_tests, include_docs, template_dir)
+        for file_path, chunk in timed(files, timings, "generate_seconds"):
+            start = time.perf_counter()
+            if file_path != current:
+                parts.append(writer.start_file(file_path))
+                current = file_path
+            parts.append(writer.write(chunk))
+            zip_seconds += time.perf_counter() - start
+    timings["zip_seconds"] = zip_seconds
+
+    summary = sampler.summary(timings)
+    stacks = sampler.collapsed()
+    parts.append(writer.start_file(f"{PROFILE_DIR}/summary.json"))
+    parts.append(writer.write(json.dumps(summary, indent=2)))
+    parts.append(writer.start_file(f"{PROFILE_DIR}/stacks.folded"))
+    parts.append(writer.write(stacks))
+    parts.append(writer.finish())
+    return {
+        "archive": b"".join(parts),
+        "spec_hash": spec_digest(spec),
+        "summary": summary,
+        "stacks": stacks,
+        "timings": timings
+    }
+
+
+def preview_files(content: bytes, filename: str, language: str, package_name: str) -> Dict[str, Any]:
+    """Generate a client and return its file list with truncated contents"""
+    timings: Dict[str, Any] = {}
+    parsed_data = parse_spec(decode_spec(content, filename, timings), timings)
+
+    # Only the first PREVIEW_MAX_CHARS of each file are kept; the rest of its
+    # chunks are dropped as they are produced
+    preview: Dict[str, str] = {}
+    for file_path, chunk in timed(stream_files(parsed_data, language, package_name), timings, "generate_seconds"):
+        kept = preview.get(file_path, "")
+        if len(kept) < PREVIEW_MAX_CHARS:
+            preview[file_path] = kept + chunk[:PREVIEW_MAX_CHARS - len(kept)]
+
+    files: List[str] = list(preview.keys())
+    return {
+        "language": language,
+        "package_name": package_name,
+        "files": files,
+        "preview": preview,
+        "tags": {tag: len(operations) for tag, operations in parsed_data["index"].by_tag.items()},
+        "timings": timings
+    }
+
+
+def inspect_spec(content: bytes, filename: str) -> Dict[str, Any]:
+    """Decode and validate a specification, returning a short summary"""
+    parsed_data = parse_spec(decode_spec(content, filename))
+    return {
+        "title": parsed_data["info"]["title"],
+        "version": parsed_data["info"]["version"],
+        "endpoints": len(parsed_data["paths"])
+    }
+
+
+def freeze_parsed(parsed_data: Dict[str, Any], spec: Dict[str, Any]) -> bytes:
+    """Serialize parsed data once so it can be shared with several workers
+
+    A resolved graph too deep to pickle (long ``$ref`` chains, or thousands
+    of interlinked schemas) is replaced by the decoded spec, which each
+    worker then parses and analyzes itself.
+    """
+    try:
+        return pickle.dumps(("parsed", parsed_data), protocol=pickle.HIGHEST_PROTOCOL)
+    except (RecursionError, pickle.PicklingError):
+        return pickle.dumps(("spec", spec), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def thaw_parsed(frozen: bytes) -> Dict[str, Any]:
+    """Rebuild parsed data from ``freeze_parsed`` output"""
+    kind, data = pickle.loads(frozen)
+    if kind == "parsed":
+        return data
+    return analyze_spec(parse_spec(data))
+
+
+def analyze_spec(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach the shared client model to parsed data"""
+    try:
+        return with_client_model(parsed_data)
+    except Exception as e:
+        raise GenerationError(500, f"Failed to analyze OpenAPI spec: {str(e)}")
+
+
+def prepare_batch(content: bytes, filename: str) -> Dict[str, Any]:
+    """Decode, parse and analyze a spec once for a multi-language batch"""
+    start = time.perf_counter()
+    timings: Dict[str, Any] = {}
+    spec = decode_spec(content, filename, timings)
+    parsed_data = parse_spec(spec, timings)
+    resolve_started = time.perf_counter()
+    parsed_data = analyze_spec(parsed_data)
+    timings["resolve_seconds"] = time.perf_counter() - resolve_started
+    return {
+        "spec_hash": spec_digest(spec),
+        "parsed": freeze_parsed(parsed_data, spec),
+        "endpoints": len(parsed_data["paths"]),
+        "parse_seconds": round(time.perf_counter() - start, 4),
+        "timings": timings
+    }
+
+
+def _stream_frozen(frozen: bytes, language: str, package_name: str, include_tests: bool,
+                   include_docs: bool, timings: Dict[str, Any],
+                   template_dir: Optional[str] = None) -> Iterator[FileChunk]:
+    start = time.perf_counter()
+    parsed_data = thaw_parsed(frozen)
+    timings["load_seconds"] = round(time.perf_counter() - start, 4)
+    return stream_files(parsed_data, language, package_name, include_tests, include_docs, template_dir)
+
+
+def compress_language(frozen: bytes, language: str, package_name: str,
+                      include_tests: bool = False, include_docs: bool = True) -> Dict[str, Any]:
+    """Generate one language of a batch and deflate its files under ``<language>/``"""
+    timings: Dict[str, Any] = {}
+    chunks = _stream_frozen(frozen, language, package_name, include_tests, include_docs, timings)
+
+    # Rendering and compression are interleaved: generate_seconds covers both,
+    # render_seconds and zip_seconds split it
+    start = time.perf_counter()
+    rendered = timed(((f"{language}/{file_path}", chunk) for file_path, chunk in chunks), timings, "render_seconds")
+    members = list(compress_members(rendered))
+    timings["generate_seconds"] = round(time.perf_counter() - start, 4)
+    timings["zip_seconds"] = round(timings["generate_seconds"] - timings["render_seconds"], 4)
+    timings["render_seconds"] = round(timings["render_seconds"], 4)
+    timings["files"] = len(members)
+    timings["bytes"] = sum(member.size for member in members)
+    return {"language": language, "members": members, "timings": timings}
+
+
+def write_language(frozen: bytes, language: str, package_name: str, output_dir: str,
+                   include_tests: bool = False, include_docs: bool = True,
+                   template_dir: Optional[str] = None, write_workers: int = 1) -> Dict[str, Any]:
+    """Generate one language of a batch and write it to ``output_dir``"""
+    timings: Dict[str, Any] = {}
+    chunks = _stream_frozen(frozen, language, package_name, include_tests, include_docs, timings, template_dir)
+
+    start = time.perf_counter()
+    report = write_chunks(chunks, Path(output_dir), write_workers)
+    seconds = time.perf_counter() - start
+    timings["generate_seconds"] = round(seconds, 4)
+    timings["files"] = report.files
+    timings["bytes"] = report.bytes
+    timings.update(report.counts())
+    timings.update(report.throughput(seconds))
+    return {"language": language, "timings": timings}
+
+
+def write_chunks(chunks: Iterable[FileChunk], output_path: Path, workers: int = 1) -> OutputReport:
+    """Bring ``output_path`` up to date with streamed files (see ``engine.output``).
+
+    Unchanged files are left untouched, others are replaced atomically and
+    files of the previous run that are no longer generated are removed.
+    ``workers`` threads write changed files while later ones render.
+    """
+    return OutputWriter(output_path).write(chunks, workers)
@@ -0,0 +1,283 @@
+"""
+Streaming ZIP archive writer.
+
+``zipfile.ZipFile`` needs a seekable file to patch sizes into local headers,
+so the whole archive ends up in a BytesIO. This writer uses data descriptors
+instead: each member's local header is emitted immediately, the deflated data
+follows as it is produced, and the CRC and sizes are written after the data.
+Only the central directory records are kept until the end. Archives over
+4 GiB or 65535 members get ZIP64 central directory entries and end records;
+a single streamed member must stay under 4 GiB, since its descriptor format
+is fixed by the local header sent before its size is known.
+"""
+import struct
+import time
+import zlib
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+Content = Union[str, bytes]
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+DATA_DESCRIPTOR = struct.Struct("<IIII")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<IQHHIIQQQQ")
+ZIP64_END_LOCATOR = struct.Struct("<IIQI")
+EXTRA_HEADER = struct.Struct("<HH")
+
+LOCAL_HEADER_SIGNATURE = 0x04034b50
+DATA_DESCRIPTOR_SIGNATURE = 0x08074b50
+CENTRAL_HEADER_SIGNATURE = 0x02014b50
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054b50
+ZIP64_END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06064b50
+ZIP64_END_LOCATOR_SIGNATURE = 0x07064b50
+ZIP64_EXTRA_ID = 0x0001
+
+VERSION = 20                      # 2.0: deflate and data descriptors
+ZIP64_VERSION = 45                # 4.5: ZIP64 extensions
+VERSION_MADE_BY = (3 << 8) | ZIP64_VERSION  # Unix, so external attributes carry file modes
+FLAG_DATA_DESCRIPTOR = 0x08
+FLAG_UTF8 = 0x800
+DEFLATED = 8
+FILE_MODE = 0o100644 << 16
+ZIP32_LIMIT = 0xFFFFFFFF
+ZIP32_MEMBER_LIMIT = 0xFFFF
+
+# Output is coalesced into chunks of at least this many bytes
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class CompressedMember(NamedTuple):
+    """A member deflated ahead of time, e.g. in a worker process"""
+    path: str
+    crc: int
+    compressed_size: int
+    size: int
+    data: bytes
+
+
+def compress_member(path: str, content: Content, compresslevel: int = 6) -> CompressedMember:
+    """Deflate one file so it can be added to an archive with ``add_compressed``"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    data = compressor.compress(content) + compressor.flush()
+    return CompressedMember(path, zlib.crc32(content), len(data), len(content), data)
+
+
+def compress_members(pieces: Iterable[Tuple[str, Content]], compresslevel: int = 6) -> Iterator[CompressedMember]:
+    """Deflate streamed ``(path, content)`` pairs, one member per run of equal paths"""
+    path = None
+    compressor = None
+    crc = size = 0
+    data: List[bytes] = []
+    for piece_path, content in pieces:
+        if piece_path != path:
+            if path is not None:
+                data.append(compressor.flush())
+                compressed = b"".join(data)
+                yield CompressedMember(path, crc, len(compressed), size, compressed)
+            path = piece_path
+            compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+            crc = size = 0
+            data = []
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        crc = zlib.crc32(content, crc)
+        size += len(content)
+        data.append(compressor.compress(content))
+    if path is not None:
+        data.append(compressor.flush())
+        compressed = b"".join(data)
+        yield CompressedMember(path, crc, len(compressed), size, compressed)
+
+
+class _Member:
+    __slots__ = ("name", "flags", "crc", "compressed_size", "size", "offset")
+
+    def __init__(self, name: bytes, flags: int, offset: int):
+        self.name = name
+        self.flags = flags
+        self.crc = 0
+        self.compressed_size = 0
+        self.size = 0
+        self.offset = offset
+
+
+class ZipStreamWriter:
+    """Incrementally build a ZIP archive, returning the bytes to emit at each step"""
+
+    def __init__(self, compresslevel: int = 6, timestamp: Optional[float] = None):
+        self.compresslevel = compresslevel
+        self._dos_time, self._dos_date = _dos_datetime(timestamp if timestamp is not None else time.time())
+        self._members: List[_Member] = []
+        self._current: Optional[_Member] = None
+        self._compressor = None
+        self._offset = 0
+        self._finished = False
+
+    @property
+    def bytes_written(self) -> int:
+        """Number of archive bytes produced so far"""
+        return self._offset
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def start_file(self, path: str) -> bytes:
+        """Begin a new member and return its local header"""
+        if self._finished:
+            raise ValueError("Archive is already finished")
+        prefix = self.end_file() if self._current is not None else b""
+
+        name = path.encode("utf-8")
+        member = _Member(name, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, self._offset)
+        self._current = member
+        self._compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+
+        header = LOCAL_HEADER.pack(
+            LOCAL_HEADER_SIGNATURE, VERSION, member.flags, DEFLATED,
+            self._dos_time, self._dos_date, 0, 0, 0, len(name), 0
+        )
+        return prefix + self._emit(header + name)
+
+    def write(self, data: Content) -> bytes:
+        """Compress a piece of the current member, returning any deflated output"""
+        if self._current is None:
+            raise ValueError("No file started")
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        member = self._current
+        member.crc = zlib.crc32(data, member.crc)
+        member.size += len(data)
+        compressed = self._compressor.compress(data)
+        member.compressed_size += len(compressed)
+        return self._emit(compressed)
+
+    def end_file(self) -> bytes:
+        """Flush the current member and return the rest of its data and its descriptor"""
+        member = self._current
+        if member is None:
+            return b""
+        tail = self._compressor.flush()
+        member.compressed_size += len(tail)
+        if member.size > ZIP32_LIMIT or member.compressed_size > ZIP32_LIMIT:
+            raise ValueError(f"{member.name.decode('utf-8')} exceeds the 4 GiB limit of a streamed member")
+        descriptor = DATA_DESCRIPTOR.pack(
+            DATA_DESCRIPTOR_SIGNATURE, member.crc, member.compressed_size, member.size
+        )
+        self._members.append(member)
+        self._current = None
+        self._compressor = None
+        return self._emit(tail + descriptor)
+
+    def add_compressed(self, compressed: CompressedMember) -> bytes:
+        """Add a pre-deflated member, returning its header and data"""
+        if self._finished:
+            raise ValueError("Archive is already finished")
+        prefix = self.end_file() if self._current is not None else b""
+
+        name = compressed.path.encode("utf-8")
+        member = _Member(name, FLAG_UTF8, self._offset)
+        member.crc = compressed.crc
+        member.compressed_size = compressed.compressed_size
+        member.size = compressed.size
+        self._members.append(member)
+
+        # Sizes are known up front, so an oversized member moves them to a ZIP64 extra field
+        extra = b""
+        compressed_size, size = member.compressed_size, member.size
+        if size > ZIP32_LIMIT or compressed_size > ZIP32_LIMIT:
+            extra = EXTRA_HEADER.pack(ZIP64_EXTRA_ID, 16) + struct.pack("<QQ", size, compressed_size)
+            compressed_size = size = ZIP32_LIMIT
+        header = LOCAL_HEADER.pack(
+            LOCAL_HEADER_SIGNATURE, ZIP64_VERSION if extra else VERSION, member.flags, DEFLATED,
+            self._dos_time, self._dos_date, member.crc, compressed_size, size, len(name), len(extra)
+        )
+        return prefix + self._emit(header + name + extra + compressed.data)
+
+    def _central_record(self, member: _Member) -> bytes:
+        # Fields that overflow 32 bits are stored in a ZIP64 extra field, in this order
+        values = []
+        sizes = []
+        for value in (member.size, member.compressed_size, member.offset):
+            if value > ZIP32_LIMIT:
+                values.append(value)
+                sizes.append(ZIP32_LIMIT)
+            else:
+                sizes.append(value)
+        extra = b""
+        if values:
+            extra = EXTRA_HEADER.pack(ZIP64_EXTRA_ID, 8 * len(values)) + struct.pack(f"<{len(values)}Q", *values)
+        size, compressed_size, offset = sizes
+        header = CENTRAL_HEADER.pack(
+            CENTRAL_HEADER_SIGNATURE, VERSION_MADE_BY, ZIP64_VERSION if extra else VERSION, member.flags,
+            DEFLATED, self._dos_time, self._dos_date, member.crc, compressed_size, size,
+            len(member.name), len(extra), 0, 0, 0, FILE_MODE, offset
+        )
+        return header + member.name + extra
+
+    def finish(self) -> bytes:
+        """Close the archive and return the central directory"""
+        tail = self.end_file()
+
+        directory_offset = self._offset
+        directory = b"".join(self._central_record(member) for member in self._members)
+        count = len(self._members)
+        end_records = b""
+        if count > ZIP32_MEMBER_LIMIT or len(directory) > ZIP32_LIMIT or directory_offset > ZIP32_LIMIT:
+            zip64_end_offset = directory_offset + len(directory)
+            end_records = ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                ZIP64_END_OF_CENTRAL_DIRECTORY_SIGNATURE, ZIP64_END_OF_CENTRAL_DIRECTORY.size - 12,
+                VERSION_MADE_BY, ZIP64_VERSION, 0, 0, count, count, len(directory), directory_offset
+            ) + ZIP64_END_LOCATOR.pack(ZIP64_END_LOCATOR_SIGNATURE, 0, zip64_end_offset, 1)
+        end_records += END_OF_CENTRAL_DIRECTORY.pack(
+            END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0, 0, min(count, ZIP32_MEMBER_LIMIT),
+            min(count, ZIP32_MEMBER_LIMIT), min(len(directory), ZIP32_LIMIT),
+            min(directory_offset, ZIP32_LIMIT), 0
+        )
+        self._finished = True
+        return tail + self._emit(directory + end_records)
+
+
+def iter_zip(
+    pieces: Iterable[Tuple[str, Content]],
+    compresslevel: int = 6,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Stream a ZIP archive from ``(path, content)`` pairs.
+
+    Consecutive pairs with the same path are appended to one member, so a
+    producer can hand over a large file in several pieces. Output is coalesced
+    into chunks of roughly ``chunk_size`` bytes; memory use is bounded by the
+    largest single piece rather than the whole archive.
+    """
+    writer = ZipStreamWriter(compresslevel)
+    buffer: List[bytes] = []
+    buffered = 0
+    current = None
+
+    for path, content in pieces:
+        if path != current:
+            out = writer.start_file(path)
+            current = path
+        else:
+            out = b""
+        out += writer.write(content)
+        if out:
+            buffer.append(out)
+            buffered += len(out)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer, buffered = [], 0
+
+    buffer.append(writer.finish())
+    yield b"".join(buffer)
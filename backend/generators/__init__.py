@@ -1,6 +1,7 @@
 """Generator modules for all supported languages."""
 
-from .base_generator import BaseGenerator
+from .base_generator import BaseGenerator, FileChunk, collect_files
+from .client_model import ClientModel, with_client_model
 from .python_generator import PythonGenerator
 from .javascript_generator import JavaScriptGenerator
 from .go_generator import GoGenerator
@@ -11,6 +12,10 @@ from .php_generator import PHPGenerator
 
 __all__ = [
     'BaseGenerator',
+    'FileChunk',
+    'collect_files',
+    'ClientModel',
+    'with_client_model',
     'PythonGenerator',
     'JavaScriptGenerator',
     'GoGenerator',
@@ -1,12 +1,57 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Iterable, Iterator, Optional, Tuple
 from abc import ABC, abstractmethod
 import re
 
+from jinja2 import Template
+
+from parsers.index import SpecIndex
+from templates import get_environment
+from templates.engine import escape_string
+
+from . import naming
+from .client_model import ClientModel, ModelSpec, OperationSpec, ParamSpec, model_spec, operation_spec
+from .types import RULES, SchemaTypes, TypeResolver
+from .views import ModelView, OperationView, ParamView
+
+# A piece of a generated file: (filepath, chunk of its content)
+FileChunk = Tuple[str, str]
+
+# A {parameter} in a path template
+_PATH_PARAMETER = re.compile(r'\{([^}]+)\}')
+
+# Streamed template output is handed over in chunks of about this many characters
+STREAM_CHUNK_CHARS = 64 * 1024
+
+
+def collect_files(chunks: Iterable[FileChunk]) -> Dict[str, str]:
+    """Join streamed chunks into {filepath: content}"""
+    parts: Dict[str, List[str]] = {}
+    for file_path, chunk in chunks:
+        parts.setdefault(file_path, []).append(chunk)
+    return {file_path: "".join(pieces) for file_path, pieces in parts.items()}
+
+
 class BaseGenerator(ABC):
     """Base class for all language-specific generators - 2025 Modern Patterns"""
     
+    # Parsed sections the generated files are rendered from. An edit confined
+    # to other sections leaves the output unchanged (see watch mode).
+    sections = ("info", "servers", "paths", "components", "security")
+    
+    # Template directory and type mapping key of the target language
+    language = ""
+    
+    # Case of operation method names, of parameter and property identifiers,
+    # the placeholder that interpolates a parameter into a URL path, and the
+    # escapes of literal braces in a string with such placeholders
+    method_case = "snake"
+    param_case = "snake"
+    path_placeholder = "{{{}}}"
+    path_brace_escapes = {"{": "{{", "}": "}}"}
+    
     def __init__(self, parsed_data: Dict[str, Any], package_name: str = "api_client",
-                 include_tests: bool = False, include_docs: bool = True):
+                 include_tests: bool = False, include_docs: bool = True,
+                 template_dir: Optional[str] = None, fragments: Optional[Dict[Any, str]] = None):
         self.parsed_data = parsed_data
         self.package_name = package_name
         self.include_tests = include_tests
@@ -16,42 +61,244 @@ class BaseGenerator(ABC):
         self.paths = parsed_data.get("paths", [])
         self.components = parsed_data.get("components", {})
         self.security = parsed_data.get("security", [])
+        self.index = parsed_data.get("index") or SpecIndex(self.paths)
+        self.client_model: Optional[ClientModel] = parsed_data.get("client_model")
+        self.environment = get_environment(template_dir)
+        self._type_resolvers: Dict[str, TypeResolver] = {}
+        self._schema_types: Optional[SchemaTypes] = None
+        self._param_views: Dict[ParamSpec, ParamView] = {}
+        # Operation and model views built so far, a measure of rendering progress
+        self.views_built = 0
+        # Fragments of an earlier run to reuse (see ``render_specs``); given
+        # those, the fragments of this run are collected for the next one
+        self.previous_fragments = fragments
+        self.fragments: Optional[Dict[Any, str]] = {} if fragments is not None else None
     
     @abstractmethod
+    def stream(self) -> Iterator[FileChunk]:
+        """Generate all client files lazily, as (filepath, chunk) pairs.
+        
+        The chunks of a file are consecutive and concatenate to its content,
+        so a consumer only ever holds one chunk rather than the whole package.
+        """
+        pass
+    
     def generate(self) -> Dict[str, str]:
         """Generate all client files. Returns dict of {filepath: content}"""
-        pass
+        return collect_files(self.stream())
     
     @abstractmethod
+    def stream_client(self) -> Iterator[str]:
+        """Generate the main client class in chunks"""
+        pass
+    
     def generate_client(self) -> str:
         """Generate main client class"""
-        pass
+        return "".join(self.stream_client())
     
     @abstractmethod
     def generate_models(self) -> str:
         """Generate data models/types"""
         pass
     
+    def template(self, name: str) -> Template:
+        """A compiled template of this language"""
+        return self.environment.get_template(f"{self.language}/{name}")
+    
+    def render(self, name: str, **context: Any) -> str:
+        """Render a template of this language"""
+        return self.template(name).render(gen=self, **context)
+    
+    def render_each(self, name: str, key: str, items: Iterable[Any]) -> List[str]:
+        """Render a template once per item, passing the item as ``key``"""
+        return list(self.render_lazy(name, key, items))
+    
+    def render_lazy(self, name: str, key: str, items: Iterable[Any]) -> Iterator[str]:
+        """Like ``render_each``, rendering each item only when it is consumed"""
+        template = self.template(name)
+        for item in items:
+            yield template.render({"gen": self, key: item})
+    
+    def render_operations(self, name: str) -> Iterator[str]:
+        """Render a template once per operation, passing its view as ``operation``"""
+        return self.render_specs(name, "operation", self.operation_specs(), self.operation_view)
+    
+    def render_models(self, name: str) -> Iterator[str]:
+        """Render a template once per component schema, passing its view as ``model``"""
+        return self.render_specs(name, "model", self.model_specs(), self.model_view)
+    
+    def render_specs(self, name: str, key: str, specs: Iterable[Any],
+                     view: Callable[[Any], Any]) -> Iterator[str]:
+        """Render a template lazily per operation or model spec, reusing earlier fragments.
+        
+        Operation and model templates render from their item alone, so a
+        fragment is keyed by the template name and the (hashable) spec;
+        watch mode re-renders only the operations and models an edit changed.
+        """
+        template = self.template(name)
+        previous = self.previous_fragments
+        collected = self.fragments
+        for spec in specs:
+            fragment_key = (name, spec)
+            fragment = previous.get(fragment_key) if previous else None
+            if fragment is None:
+                fragment = template.render({"gen": self, key: view(spec)})
+            else:
+                self.views_built += 1
+            if collected is not None:
+                collected[fragment_key] = fragment
+            yield fragment
+    
+    def render_stream(self, name: str, **context: Any) -> Iterator[str]:
+        """Render a template of this language in chunks of about STREAM_CHUNK_CHARS.
+        
+        Iterables in the context (e.g. ``render_lazy`` output) are consumed as
+        the template reaches them, so the whole output never exists at once.
+        """
+        buffer: List[str] = []
+        buffered = 0
+        emitted = False
+        for piece in self.template(name).generate(gen=self, **context):
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= STREAM_CHUNK_CHARS:
+                yield "".join(buffer)
+                buffer, buffered, emitted = [], 0, True
+        if buffer or not emitted:
+            yield "".join(buffer)
+    
+    @staticmethod
+    def file_chunks(file_path: str, chunks: Iterable[str]) -> Iterator[FileChunk]:
+        """Tag each chunk of one file with its path"""
+        for chunk in chunks:
+            yield file_path, chunk
+    
+    def identifier(self, name: str, case: str) -> str:
+        """Code identifier for an API name in snake, camel or pascal case"""
+        return naming.escape(self.language, naming.identifier(case, name))
+    
+    def format_path(self, path: str, case: str) -> str:
+        """URL path with each {parameter} replaced by the language's interpolation
+        
+        The rest of the path is escaped for the string literal it goes into.
+        """
+        pieces = _PATH_PARAMETER.split(path)
+        for index, piece in enumerate(pieces):
+            if index % 2:
+                pieces[index] = self.path_placeholder.format(self.identifier(piece, case))
+            else:
+                piece = escape_string(piece, self.language)
+                pieces[index] = "".join(self.path_brace_escapes.get(char, char) for char in piece)
+        return "".join(pieces)
+    
+    def param_view(self, param: ParamSpec) -> ParamView:
+        """Template context of a parameter or model property.
+        
+        Views are memoized: the same parameter (name, location, type) recurs
+        across many operations.
+        """
+        view = self._param_views.get(param)
+        if view is None:
+            view = self._param_views[param] = self._param_view(param)
+        return view
+    
+    def _param_view(self, param: ParamSpec) -> ParamView:
+        resolver = self.type_resolver(self.language)
+        type_name = resolver.spell(param.type)
+        return ParamView(
+            name=param.name,
+            is_identifier=param.name.isidentifier(),
+            var=self.identifier(param.name, self.param_case),
+            field=self.identifier(param.name, "pascal"),
+            type=type_name,
+            optional_type=resolver.optional(type_name),
+            required=param.required,
+            description=param.description
+        )
+    
+    def operation_specs(self) -> Iterable[OperationSpec]:
+        """Language-neutral operations, from the shared client model if there is one"""
+        if self.client_model is not None:
+            return self.client_model.operations
+        return (operation_spec(operation, self.schema_types) for operation in self.paths)
+    
+    def model_specs(self) -> Iterable[ModelSpec]:
+        """Language-neutral component schemas, from the shared client model if there is one"""
+        if self.client_model is not None:
+            return self.client_model.models
+        return (model_spec(name, schema, self.schema_types)
+                for name, schema in self.components.get("schemas", {}).items())
+    
+    def operation_views(self) -> List[OperationView]:
+        """Template context of every operation, in document order"""
+        return list(self.iter_operation_views())
+    
+    def iter_operation_views(self) -> Iterator[OperationView]:
+        """Like ``operation_views``, building each view when it is consumed"""
+        for operation in self.operation_specs():
+            yield self.operation_view(operation)
+    
+    def operation_view(self, operation: OperationSpec) -> OperationView:
+        """Template context of one operation"""
+        path_params = [self.param_view(param) for param in operation.path_params]
+        query_params = [self.param_view(param) for param in operation.query_params]
+        header_params = [self.param_view(param) for param in operation.header_params]
+        options = query_params + header_params
+        self.views_built += 1
+        return OperationView(
+            name=self.identifier(operation.operation_id, self.method_case),
+            method=operation.method,
+            path=operation.path,
+            url=self.format_path(operation.path, self.param_case),
+            summary=operation.summary,
+            description=operation.description,
+            path_params=path_params,
+            query_params=query_params,
+            header_params=header_params,
+            options=options,
+            required_options=[param for param in options if param.required],
+            optional_options=[param for param in options if not param.required],
+            has_body=operation.has_body,
+            body_required=operation.body_required
+        )
+    
+    def model_views(self) -> List[ModelView]:
+        """Template context of every component schema"""
+        return list(self.iter_model_views())
+    
+    def iter_model_views(self) -> Iterator[ModelView]:
+        """Like ``model_views``, building each view when it is consumed"""
+        for model in self.model_specs():
+            yield self.model_view(model)
+    
+    def model_view(self, model: ModelSpec) -> ModelView:
+        """Template context of one component schema"""
+        properties = [self.param_view(prop) for prop in model.properties]
+        self.views_built += 1
+        return ModelView(
+            name=self.identifier(model.schema_name, "pascal"),
+            schema_name=model.schema_name,
+            description=model.description,
+            properties=properties,
+            required_properties=[prop for prop in properties if prop.required],
+            optional_properties=[prop for prop in properties if not prop.required]
+        )
+    
     def sanitize_name(self, name: str) -> str:
         """Sanitize names for use in code"""
-        sanitized = re.sub(r'[^a-zA-Z0-9_]', '_', name)
-        sanitized = re.sub(r'^[0-9]+', '', sanitized)
-        return sanitized
+        return naming.convert("sanitize", name)
     
     def to_snake_case(self, name: str) -> str:
         """Convert name to snake_case"""
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-        return s2.lower()
+        return naming.convert("snake", name)
     
     def to_camel_case(self, name: str) -> str:
         """Convert name to camelCase"""
-        components = name.split('_')
-        return components[0] + ''.join(x.title() for x in components[1:])
+        return naming.convert("camel", name)
     
     def to_pascal_case(self, name: str) -> str:
         """Convert name to PascalCase"""
-        return ''.join(x.title() for x in name.split('_'))
+        return naming.convert("pascal", name)
     
     def get_base_url(self) -> str:
         """Get the base URL from servers"""
@@ -60,95 +307,28 @@ class BaseGenerator(ABC):
         return ""
     
     def group_paths_by_tag(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Group API paths by their tags"""
-        grouped = {}
-        
-        for path in self.paths:
-            tags = path.get("tags", ["default"])
-            for tag in tags:
-                if tag not in grouped:
-                    grouped[tag] = []
-                grouped[tag].append(path)
-        
-        return grouped
+        """Group API paths by their tags ("default" for untagged operations)"""
+        return {tag: list(operations) for tag, operations in self.index.by_tag.items()}
     
-    def get_type_from_schema(self, schema: Dict[str, Any], language: str) -> str:
-        """Get type string from OpenAPI schema"""
-        if not schema:
-            return self._get_default_type(language)
-        
-        schema_type = schema.get("type", "object")
-        
-        type_mappings = {
-            "python": {
-                "string": "str",
-                "integer": "int",
-                "number": "float",
-                "boolean": "bool",
-                "array": "List",
-                "object": "Dict[str, Any]"
-            },
-            "javascript": {
-                "string": "string",
-                "integer": "number",
-                "number": "number",
-                "boolean": "boolean",
-                "array": "Array",
-                "object": "object"
-            },
-            "go": {
-                "string": "string",
-                "integer": "int",
-                "number": "float64",
-                "boolean": "bool",
-                "array": "[]interface{}",
-                "object": "map[string]interface{}"
-            },
-            "rust": {
-                "string": "String",
-                "integer": "i64",
-                "number": "f64",
-                "boolean": "bool",
-                "array": "Vec<serde_json::Value>",
-                "object": "serde_json::Value"
-            },
-            "csharp": {
-                "string": "string",
-                "integer": "int",
-                "number": "double",
-                "boolean": "bool",
-                "array": "List<object>",
-                "object": "Dictionary<string, object>"
-            },
-            "java": {
-                "string": "String",
-                "integer": "Integer",
-                "number": "Double",
-                "boolean": "Boolean",
-                "array": "List<Object>",
-                "object": "Map<String, Object>"
-            },
-            "php": {
-                "string": "string",
-                "integer": "int",
-                "number": "float",
-                "boolean": "bool",
-                "array": "array",
-                "object": "array"
-            }
-        }
-        
-        return type_mappings.get(language, {}).get(schema_type, self._get_default_type(language))
+    def get_type_from_schema(self, schema: Dict[str, Any], language: Optional[str] = None,
+                             models: bool = True) -> str:
+        """Get type string from OpenAPI schema (see ``generators.types``)"""
+        return self.type_resolver(language or self.language).spell(self.schema_types.ref(schema, models))
+    
+    def type_resolver(self, language: str) -> TypeResolver:
+        """Memoized spelling of types in a language, shared by every call"""
+        resolver = self._type_resolvers.get(language)
+        if resolver is None:
+            resolver = self._type_resolvers[language] = TypeResolver(language)
+        return resolver
+    
+    @property
+    def schema_types(self) -> SchemaTypes:
+        """Language-neutral analysis of the schemas, built on first use"""
+        if self._schema_types is None:
+            self._schema_types = SchemaTypes(self.components)
+        return self._schema_types
     
     def _get_default_type(self, language: str) -> str:
         """Get default/any type for language"""
-        defaults = {
-            "python": "Any",
-            "javascript": "any",
-            "go": "interface{}",
-            "rust": "serde_json::Value",
-            "csharp": "object",
-            "java": "Object",
-            "php": "mixed"
-        }
-        return defaults.get(language, "any")
+        return RULES.get(language, RULES["javascript"]).any
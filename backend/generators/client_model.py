@@ -0,0 +1,124 @@
+"""
+Language-neutral client model shared by every generator.
+
+The analysis that does not depend on the target language (splitting parameters
+by location, resolving parameter and property schemas to ``TypeRef`` values)
+is done once per parse result by ``ClientModel.build``. Generators are
+emitters over it: they only spell names and types in their language and render
+templates.
+
+``with_client_model`` is the pipeline stage between the parser and the
+generators. It adds the model to the parse result under ``"client_model"``, so
+generating several languages from one parse result, in one process or in
+workers that receive it pickled, analyzes the spec once. A generator given a
+parse result without a model derives each spec as it renders it, which keeps
+single-language streaming from holding the whole model.
+"""
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .types import SchemaTypes, TypeRef
+
+
+class ParamSpec(NamedTuple):
+    """A parameter, or a model property (location "property")"""
+    name: str
+    location: str
+    required: bool
+    description: str
+    type: TypeRef
+
+
+class OperationSpec(NamedTuple):
+    """An operation, with its parameters split by location"""
+    operation_id: str
+    method: str
+    path: str
+    summary: str
+    description: str
+    path_params: Tuple[ParamSpec, ...]
+    query_params: Tuple[ParamSpec, ...]
+    header_params: Tuple[ParamSpec, ...]
+    has_body: bool
+    body_required: bool
+
+
+class ModelSpec(NamedTuple):
+    """A component schema"""
+    schema_name: str
+    description: str
+    properties: Tuple[ParamSpec, ...]
+
+
+class ClientModel(NamedTuple):
+    """Operations and models of a parse result, in document order"""
+    operations: Tuple[OperationSpec, ...]
+    models: Tuple[ModelSpec, ...]
+
+    @classmethod
+    def build(cls, parsed_data: Mapping[str, Any],
+              schema_types: Optional[SchemaTypes] = None) -> "ClientModel":
+        """Analyze a parse result once for every language"""
+        components = parsed_data.get("components") or {}
+        if schema_types is None:
+            schema_types = SchemaTypes(components)
+        return cls(
+            operations=tuple(operation_spec(operation, schema_types)
+                             for operation in parsed_data.get("paths") or ()),
+            models=tuple(model_spec(name, schema, schema_types)
+                         for name, schema in (components.get("schemas") or {}).items())
+        )
+
+
+def with_client_model(parsed_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The parse result with its ``ClientModel`` under ``"client_model"``"""
+    if parsed_data.get("client_model") is not None:
+        return parsed_data
+    return {**parsed_data, "client_model": ClientModel.build(parsed_data)}
+
+
+def operation_spec(operation: Mapping[str, Any], schema_types: SchemaTypes) -> OperationSpec:
+    """Language-neutral form of one parsed operation"""
+    params: Dict[str, list] = {"path": [], "query": [], "header": []}
+    for param in operation["parameters"]:
+        location = param["in"]
+        if location in params:
+            params[location].append(ParamSpec(
+                name=param["name"],
+                location=location,
+                required=bool(param["required"] or location == "path"),
+                description=param["description"] or "",
+                type=schema_types.ref(param["schema"], models=False)
+            ))
+    request_body = operation["request_body"]
+    return OperationSpec(
+        operation_id=operation["operation_id"],
+        method=operation["method"],
+        path=operation["path"],
+        summary=operation["summary"] or "",
+        description=operation["description"] or "",
+        path_params=tuple(params["path"]),
+        query_params=tuple(params["query"]),
+        header_params=tuple(params["header"]),
+        has_body=request_body is not None,
+        body_required=bool(request_body and request_body["required"])
+    )
+
+
+def model_spec(name: str, schema: Mapping[str, Any], schema_types: SchemaTypes) -> ModelSpec:
+    """Language-neutral form of one component schema"""
+    required = set(schema.get("required") or ())
+    properties = tuple(
+        ParamSpec(
+            name=prop_name,
+            location="property",
+            required=prop_name in required,
+            description=prop_schema.get("description", "") or "",
+            type=schema_types.ref(prop_schema)
+        )
+        for prop_name, prop_schema in (schema.get("properties") or {}).items()
+    )
+    return ModelSpec(
+        schema_name=name,
+        description=schema.get("description") or "",
+        properties=properties
+    )
@@ -1,54 +1,27 @@
 # C# Generator - Modern .NET patterns
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Iterator
+from .base_generator import BaseGenerator, FileChunk
 
 class CSharpGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        files["Client.cs"] = self.generate_client()
-        files[f"{self.to_pascal_case(self.package_name)}.csproj"] = f"""<Project Sdk="Microsoft.NET.Sdk">
-  <PropertyGroup>
-    <TargetFramework>net8.0</TargetFramework>
-  </PropertyGroup>
-  <ItemGroup>
-    <PackageReference Include="System.Net.Http.Json" Version="8.0.0" />
-  </ItemGroup>
-</Project>"""
+    language = "csharp"
+    method_case = "pascal"
+    param_case = "camel"
+    path_placeholder = "{{Uri.EscapeDataString({}.ToString())}}"
+    
+    def stream(self) -> Iterator[FileChunk]:
+        yield from self.file_chunks("Client.cs", self.stream_client())
+        yield from self.file_chunks("Models.cs", self.stream_models())
+        yield f"{self.to_pascal_case(self.package_name)}.csproj", self.render("project.csproj.j2")
         if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nC# .NET Client"
-        return files
+            yield "README.md", self.render("README.md.j2")
     
-    def generate_client(self) -> str:
-        class_name = self.to_pascal_case(self.package_name)
-        return f"""
-using System;
-using System.Net.Http;
-using System.Threading.Tasks;
-
-namespace {class_name}
-{{
-    public class Client
-    {{
-        private readonly HttpClient _httpClient;
-        private readonly string _baseUrl;
-        
-        public Client(string baseUrl = "{self.get_base_url()}", string apiKey = null)
-        {{
-            _baseUrl = baseUrl.TrimEnd('/');
-            _httpClient = new HttpClient();
-            if (!string.IsNullOrEmpty(apiKey))
-            {{
-                _httpClient.DefaultRequestHeaders.Add("Authorization", $"Bearer {{apiKey}}");
-            }}
-        }}
-        
-        public async Task<HttpResponseMessage> GetAsync(string endpoint)
-        {{
-            return await _httpClient.GetAsync($"{{_baseUrl}}{{endpoint}}");
-        }}
-    }}
-}}
-"""
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.cs.j2")
+        return self.render_stream("Client.cs.j2", operations=operations)
+    
+    def stream_models(self) -> Iterator[str]:
+        models = self.render_models("model.cs.j2")
+        return self.render_stream("Models.cs.j2", models=models)
     
     def generate_models(self) -> str:
-        return f"namespace {self.to_pascal_case(self.package_name)}.Models {{ }}"
+        return "".join(self.stream_models())
@@ -1,42 +1,37 @@
 # Go Generator - Idiomatic with context
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Iterator
+from .base_generator import BaseGenerator, FileChunk
 
 class GoGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        pkg = self.to_snake_case(self.package_name)
-        files["client.go"] = self.generate_client()
-        files["go.mod"] = f"module github.com/user/{pkg}\n\ngo 1.21"
+    language = "go"
+    method_case = "pascal"
+    param_case = "camel"
+    path_placeholder = '" + url.PathEscape(fmt.Sprint({})) + "'
+    path_brace_escapes = {}
+    
+    def stream(self) -> Iterator[FileChunk]:
+        yield from self.file_chunks("client.go", self.stream_client())
+        yield from self.file_chunks("models.go", self.stream_models())
+        yield "go.mod", self.render("go.mod.j2")
         if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nGo Client"
-        return files
+            yield "README.md", self.render("README.md.j2")
     
-    def generate_client(self) -> str:
-        pkg = self.to_snake_case(self.package_name)
-        return f"""
-package {pkg}
-
-import (
-    "context"
-    "net/http"
-    "time"
-)
-
-type Client struct {{
-    baseURL    string
-    apiKey     string
-    httpClient *http.Client
-}}
-
-func NewClient(baseURL, apiKey string) *Client {{
-    return &Client{{
-        baseURL: baseURL,
-        apiKey: apiKey,
-        httpClient: &http.Client{{Timeout: 30 * time.Second}},
-    }}
-}}
-"""
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.go.j2")
+        return self.render_stream("client.go.j2", operations=operations)
+    
+    def stream_models(self) -> Iterator[str]:
+        models = self.render_models("model.go.j2")
+        return self.render_stream("models.go.j2", models=models, uses_time=self.uses_time())
+    
+    def uses_time(self) -> bool:
+        """Whether a model field is a time.Time (the types are memoized for rendering)"""
+        resolver = self.type_resolver(self.language)
+        return any(
+            "time.Time" in resolver.spell(prop.type)
+            for model in self.model_specs()
+            for prop in model.properties
+        )
     
     def generate_models(self) -> str:
-        return f"package {self.to_snake_case(self.package_name)}"
+        return "".join(self.stream_models())
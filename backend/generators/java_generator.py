@@ -1,61 +1,33 @@
 # Java Generator - Modern Java patterns
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Dict, Iterator
+from .base_generator import BaseGenerator, FileChunk, collect_files
 
 class JavaGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        class_name = self.to_pascal_case(self.package_name)
-        files[f"src/main/java/com/api/{class_name}Client.java"] = self.generate_client()
-        files["pom.xml"] = f"""<?xml version="1.0" encoding="UTF-8"?>
-<project xmlns="http://maven.apache.org/POM/4.0.0">
-    <modelVersion>4.0.0</modelVersion>
-    <groupId>com.api</groupId>
-    <artifactId>{self.package_name}</artifactId>
-    <version>{self.info.get('version', '1.0.0')}</version>
-    <dependencies>
-        <dependency>
-            <groupId>com.squareup.okhttp3</groupId>
-            <artifactId>okhttp</artifactId>
-            <version>4.12.0</version>
-        </dependency>
-    </dependencies>
-</project>"""
-        if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nJava Client"
-        return files
+    language = "java"
+    method_case = "camel"
+    param_case = "camel"
+    path_placeholder = '" + {} + "'
+    path_brace_escapes = {}
     
-    def generate_client(self) -> str:
+    def stream(self) -> Iterator[FileChunk]:
         class_name = self.to_pascal_case(self.package_name)
-        return f"""
-package com.api;
-
-import okhttp3.*;
-import java.io.IOException;
-
-public class {class_name}Client {{
-    private final OkHttpClient client;
-    private final String baseUrl;
-    private final String apiKey;
+        yield from self.file_chunks(f"src/main/java/com/api/{class_name}Client.java", self.stream_client())
+        yield from self.stream_model_files()
+        yield "pom.xml", self.render("pom.xml.j2")
+        if self.include_docs:
+            yield "README.md", self.render("README.md.j2")
     
-    public {class_name}Client(String baseUrl, String apiKey) {{
-        this.baseUrl = baseUrl.replaceAll("/$", "");
-        this.apiKey = apiKey;
-        this.client = new OkHttpClient();
-    }}
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.java.j2")
+        return self.render_stream("Client.java.j2", class_name=self.to_pascal_case(self.package_name),
+                                  operations=operations)
     
-    public Response get(String endpoint) throws IOException {{
-        Request.Builder builder = new Request.Builder()
-            .url(baseUrl + endpoint);
-        
-        if (apiKey != null) {{
-            builder.header("Authorization", "Bearer " + apiKey);
-        }}
-        
-        return client.newCall(builder.build()).execute();
-    }}
-}}
-"""
+    def stream_model_files(self) -> Iterator[FileChunk]:
+        """One source file per model"""
+        specs = list(self.model_specs())
+        sources = self.render_specs("Model.java.j2", "model", specs, self.model_view)
+        for model, source in zip(specs, sources):
+            yield f"src/main/java/com/api/models/{self.identifier(model.schema_name, 'pascal')}.java", source
     
-    def generate_models(self) -> str:
-        return "package com.api.models;"
+    def generate_models(self) -> Dict[str, str]:
+        return collect_files(self.stream_model_files())
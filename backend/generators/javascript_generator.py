@@ -1,42 +1,31 @@
 # JavaScript/TypeScript Generator
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Iterator
+from .base_generator import BaseGenerator, FileChunk
 
 class JavaScriptGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        files["src/client.js"] = self.generate_client()
-        files["src/types.d.ts"] = self.generate_types()
-        files["package.json"] = f"""{{
-  "name": "{self.package_name}",
-  "version": "{self.info.get('version', '1.0.0')}",
-  "main": "src/client.js",
-  "dependencies": {{ "axios": "^1.6.0" }}
-}}"""
+    language = "javascript"
+    method_case = "camel"
+    param_case = "camel"
+    path_placeholder = "${{{}}}"
+    path_brace_escapes = {}
+    
+    def stream(self) -> Iterator[FileChunk]:
+        yield from self.file_chunks("src/client.js", self.stream_client())
+        yield from self.file_chunks("src/types.d.ts", self.stream_types())
+        yield "package.json", self.render("package.json.j2")
         if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nJavaScript/TypeScript Client"
-        return files
+            yield "README.md", self.render("README.md.j2")
     
-    def generate_client(self) -> str:
-        return f"""
-const axios = require('axios');
-
-class {self.to_pascal_case(self.package_name)} {{
-    constructor(options = {{}}) {{
-        this.baseURL = options.baseURL || '{self.get_base_url()}';
-        this.apiKey = options.apiKey;
-        this.client = axios.create({{
-            baseURL: this.baseURL,
-            headers: this.apiKey ? {{ 'Authorization': `Bearer ${{this.apiKey}}` }} : {{}}
-        }});
-    }}
-}}
-
-module.exports = {self.to_pascal_case(self.package_name)};
-"""
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.js.j2")
+        return self.render_stream("client.js.j2", operations=operations)
+    
+    def stream_types(self) -> Iterator[str]:
+        models = self.render_models("model.d.ts.j2")
+        return self.render_stream("types.d.ts.j2", models=models)
     
     def generate_types(self) -> str:
-        return f"export interface ClientOptions {{ baseURL?: string; apiKey?: string; }}"
+        return "".join(self.stream_types())
     
     def generate_models(self) -> str:
-        return "// Data models\nexport interface Model {}"
+        return self.generate_types()
@@ -0,0 +1,131 @@
+"""
+Name conversion shared by all generators.
+
+Operation, parameter and property names are converted for every language, and
+the same few thousand names recur across operations and languages, so each
+conversion is memoized in a bounded LRU cache keyed by ``(style, name)``. The
+patterns are compiled once at import.
+
+Identifiers that collide with a reserved word of the target language, or with
+a name the language's operation template binds itself (``body``, ``query``,
+...), get a trailing underscore.
+"""
+import keyword
+import re
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet
+
+# Entries per memoized conversion; a 50k-operation spec has far fewer distinct names
+CACHE_SIZE = 65536
+
+_NON_IDENTIFIER = re.compile(r'[^a-zA-Z0-9_]')
+_LEADING_DIGITS = re.compile(r'^[0-9]+')
+_CAPITALIZED_WORD = re.compile(r'(.)([A-Z][a-z]+)')
+_LOWER_UPPER = re.compile(r'([a-z0-9])([A-Z])')
+_UNDERSCORES = re.compile(r'_+')
+
+RESERVED_WORDS: Dict[str, FrozenSet[str]] = {
+    "python": frozenset(keyword.kwlist) | {"self", "body", "params", "headers"},
+    "javascript": frozenset({
+        "await", "break", "case", "catch", "class", "const", "continue", "debugger", "default",
+        "delete", "do", "else", "enum", "export", "extends", "false", "finally", "for", "function",
+        "if", "implements", "import", "in", "instanceof", "interface", "let", "new", "null",
+        "package", "private", "protected", "public", "return", "static", "super", "switch", "this",
+        "throw", "true", "try", "typeof", "var", "void", "while", "with", "yield", "arguments",
+        "eval", "body", "response",
+    }),
+    "go": frozenset({
+        "break", "case", "chan", "const", "continue", "default", "defer", "else", "fallthrough",
+        "for", "func", "go", "goto", "if", "import", "interface", "map", "package", "range",
+        "return", "select", "struct", "switch", "type", "var", "c", "ctx", "body", "query",
+        "headers", "url", "fmt", "http", "context",
+    }),
+    "rust": frozenset({
+        "as", "async", "await", "break", "const", "continue", "crate", "dyn", "else", "enum",
+        "extern", "false", "fn", "for", "if", "impl", "in", "let", "loop", "match", "mod", "move",
+        "mut", "pub", "ref", "return", "self", "Self", "static", "struct", "super", "trait", "true",
+        "type", "unsafe", "use", "where", "while", "abstract", "become", "box", "do", "final",
+        "macro", "override", "priv", "try", "typeof", "unsized", "virtual", "yield", "body",
+        "request", "value",
+    }),
+    "csharp": frozenset({
+        "abstract", "as", "base", "bool", "break", "byte", "case", "catch", "char", "checked",
+        "class", "const", "continue", "decimal", "default", "delegate", "do", "double", "else",
+        "enum", "event", "explicit", "extern", "false", "finally", "fixed", "float", "for",
+        "foreach", "goto", "if", "implicit", "in", "int", "interface", "internal", "is", "lock",
+        "long", "namespace", "new", "null", "object", "operator", "out", "override", "params",
+        "private", "protected", "public", "readonly", "ref", "return", "sbyte", "sealed", "short",
+        "sizeof", "stackalloc", "static", "string", "struct", "switch", "this", "throw", "true",
+        "try", "typeof", "uint", "ulong", "unchecked", "unsafe", "ushort", "using", "virtual",
+        "void", "volatile", "while", "body", "query", "request", "cancellationToken",
+    }),
+    "java": frozenset({
+        "abstract", "assert", "boolean", "break", "byte", "case", "catch", "char", "class",
+        "const", "continue", "default", "do", "double", "else", "enum", "extends", "final",
+        "finally", "float", "for", "goto", "if", "implements", "import", "instanceof", "int",
+        "interface", "long", "native", "new", "package", "private", "protected", "public",
+        "return", "short", "static", "strictfp", "super", "switch", "synchronized", "this",
+        "throw", "throws", "transient", "try", "void", "volatile", "while", "true", "false",
+        "null", "var", "record", "yield", "body", "url", "headers", "baseUrl",
+    }),
+    "php": frozenset({"this", "body"}),
+}
+
+
+def sanitize(name: str) -> str:
+    """Replace characters that cannot appear in an identifier and drop leading digits"""
+    return _LEADING_DIGITS.sub('', _NON_IDENTIFIER.sub('_', name))
+
+
+def snake_case(name: str) -> str:
+    """camelCase and PascalCase words separated by underscores, lower-cased"""
+    return _LOWER_UPPER.sub(r'\1_\2', _CAPITALIZED_WORD.sub(r'\1_\2', name)).lower()
+
+
+def camel_case(name: str) -> str:
+    """snake_case to camelCase"""
+    components = name.split('_')
+    return components[0] + ''.join(x.title() for x in components[1:])
+
+
+def pascal_case(name: str) -> str:
+    """snake_case to PascalCase"""
+    return ''.join(x.title() for x in name.split('_'))
+
+
+CONVERSIONS: Dict[str, Callable[[str], str]] = {
+    "sanitize": sanitize,
+    "snake": snake_case,
+    "camel": camel_case,
+    "pascal": pascal_case,
+}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def convert(style: str, name: str) -> str:
+    """Apply one conversion of ``CONVERSIONS`` to a name"""
+    return CONVERSIONS[style](name)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def identifier(style: str, name: str) -> str:
+    """Identifier for an API name in snake, camel or pascal style (not escaped)"""
+    snake = _UNDERSCORES.sub('_', snake_case(sanitize(name))).strip('_')
+    if style == "snake":
+        return snake
+    if style == "camel":
+        return camel_case(snake)
+    return pascal_case(snake)
+
+
+def escape(language: str, name: str) -> str:
+    """``name``, with a trailing underscore if it is reserved in ``language``"""
+    if name in RESERVED_WORDS.get(language, ()):
+        return name + "_"
+    return name
+
+
+def clear_caches():
+    """Empty the memoized conversions"""
+    convert.cache_clear()
+    identifier.cache_clear()
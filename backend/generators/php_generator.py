@@ -1,66 +1,31 @@
 # PHP Generator - Modern PHP 8+ patterns
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Dict, Iterator
+from .base_generator import BaseGenerator, FileChunk, collect_files
 
 class PHPGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        files["src/Client.php"] = self.generate_client()
-        files["composer.json"] = f"""{{
-    "name": "api/{self.package_name}",
-    "description": "{self.info.get('description', '')}",
-    "require": {{
-        "php": ">=8.1",
-        "guzzlehttp/guzzle": "^7.8"
-    }},
-    "autoload": {{
-        "psr-4": {{
-            "ApiClient\\": "src/"
-        }}
-    }}
-}}"""
-        if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nPHP Client"
-        return files
+    language = "php"
+    method_case = "camel"
+    param_case = "camel"
+    path_placeholder = '" . rawurlencode((string) ${}) . "'
+    path_brace_escapes = {}
     
-    def generate_client(self) -> str:
-        class_name = self.to_pascal_case(self.package_name)
-        return f"""<?php
-
-namespace ApiClient;
-
-use GuzzleHttp\Client as HttpClient;
-
-class {class_name}
-{{
-    private HttpClient $client;
-    private string $baseUrl;
-    private ?string $apiKey;
+    def stream(self) -> Iterator[FileChunk]:
+        yield from self.file_chunks("src/Client.php", self.stream_client())
+        yield from self.stream_model_files()
+        yield "composer.json", self.render("composer.json.j2")
+        if self.include_docs:
+            yield "README.md", self.render("README.md.j2")
     
-    public function __construct(string $baseUrl = "{self.get_base_url()}", ?string $apiKey = null)
-    {{
-        $this->baseUrl = rtrim($baseUrl, '/');
-        $this->apiKey = $apiKey;
-        
-        $headers = [];
-        if ($apiKey) {{
-            $headers['Authorization'] = "Bearer $apiKey";
-        }}
-        
-        $this->client = new HttpClient([
-            'base_uri' => $this->baseUrl,
-            'headers' => $headers,
-            'timeout' => 30,
-        ]);
-    }}
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.php.j2")
+        return self.render_stream("Client.php.j2", operations=operations)
     
-    public function get(string $endpoint): array
-    {{
-        $response = $this->client->get($endpoint);
-        return json_decode($response->getBody(), true);
-    }}
-}}
-"""
+    def stream_model_files(self) -> Iterator[FileChunk]:
+        """One source file per model (PSR-4)"""
+        specs = list(self.model_specs())
+        sources = self.render_specs("Model.php.j2", "model", specs, self.model_view)
+        for model, source in zip(specs, sources):
+            yield f"src/Models/{self.identifier(model.schema_name, 'pascal')}.php", source
     
-    def generate_models(self) -> str:
-        return "<?php\n\nnamespace ApiClient\\\\Models;"
+    def generate_models(self) -> Dict[str, str]:
+        return collect_files(self.stream_model_files())
@@ -1,38 +1,25 @@
 # Python Generator - Modern with type hints
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Iterator
+from .base_generator import BaseGenerator, FileChunk
 
 class PythonGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        files[f"{self.package_name}/client.py"] = self.generate_client()
-        files[f"{self.package_name}/models.py"] = self.generate_models()
-        files[f"{self.package_name}/__init__.py"] = f"""
-__version__ = "{self.info.get('version', '1.0.0')}"
-from .client import {self.to_pascal_case(self.package_name)}
-"""
-        files["requirements.txt"] = "requests>=2.31.0\npython-dateutil>=2.8.2"
+    language = "python"
+    
+    def stream(self) -> Iterator[FileChunk]:
+        yield from self.file_chunks(f"{self.package_name}/client.py", self.stream_client())
+        yield from self.file_chunks(f"{self.package_name}/models.py", self.stream_models())
+        yield f"{self.package_name}/__init__.py", self.render("__init__.py.j2")
+        yield "requirements.txt", self.render("requirements.txt.j2")
         if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nPython Client"
-        return files
+            yield "README.md", self.render("README.md.j2")
     
-    def generate_client(self) -> str:
-        return f"""
-import requests
-from typing import Optional, Dict, Any
-
-class {self.to_pascal_case(self.package_name)}:
-    def __init__(self, base_url: str = "{self.get_base_url()}", api_key: Optional[str] = None):
-        self.base_url = base_url.rstrip('/')
-        self.api_key = api_key
-        self.session = requests.Session()
-        if api_key:
-            self.session.headers.update({{'Authorization': f'Bearer {{api_key}}'}})
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.j2")
+        return self.render_stream("client.py.j2", operations=operations)
     
-    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
-        url = f"{{self.base_url}}{{endpoint}}"
-        return self.session.request(method, url, **kwargs)
-"""
+    def stream_models(self) -> Iterator[str]:
+        models = self.render_models("model.j2")
+        return self.render_stream("models.py.j2", models=models)
     
     def generate_models(self) -> str:
-        return "# Data models\nfrom dataclasses import dataclass\nfrom typing import Optional"
+        return "".join(self.stream_models())
@@ -1,49 +1,28 @@
 # Rust Generator - Safe with strong typing
-from typing import Dict, Any
-from .base_generator import BaseGenerator
+from typing import Iterator
+from .base_generator import BaseGenerator, FileChunk
 
 class RustGenerator(BaseGenerator):
-    def generate(self) -> Dict[str, str]:
-        files = {}
-        files["src/lib.rs"] = self.generate_lib()
-        files["src/client.rs"] = self.generate_client()
-        files["Cargo.toml"] = f"""[package]
-name = "{self.to_snake_case(self.package_name)}"
-version = "{self.info.get('version', '1.0.0')}"
-edition = "2021"
-
-[dependencies]
-reqwest = {{ version = "0.11", features = ["json"] }}
-serde = {{ version = "1.0", features = ["derive"] }}
-tokio = {{ version = "1.0", features = ["full"] }}
-"""
+    language = "rust"
+    
+    def stream(self) -> Iterator[FileChunk]:
+        yield "src/lib.rs", self.generate_lib()
+        yield from self.file_chunks("src/client.rs", self.stream_client())
+        yield from self.file_chunks("src/models.rs", self.stream_models())
+        yield "Cargo.toml", self.render("Cargo.toml.j2")
         if self.include_docs:
-            files["README.md"] = f"# {self.info.get('title')}\n\nRust Client"
-        return files
+            yield "README.md", self.render("README.md.j2")
     
     def generate_lib(self) -> str:
-        return "pub mod client;\npub use client::Client;"
+        return self.render("lib.rs.j2")
     
-    def generate_client(self) -> str:
-        return """
-use reqwest::Client as HttpClient;
-
-pub struct Client {
-    base_url: String,
-    api_key: Option<String>,
-    http_client: HttpClient,
-}
-
-impl Client {
-    pub fn new(base_url: impl Into<String>, api_key: Option<String>) -> Self {
-        Self {
-            base_url: base_url.into(),
-            api_key,
-            http_client: HttpClient::new(),
-        }
-    }
-}
-"""
+    def stream_client(self) -> Iterator[str]:
+        operations = self.render_operations("operation.rs.j2")
+        return self.render_stream("client.rs.j2", operations=operations)
+    
+    def stream_models(self) -> Iterator[str]:
+        models = self.render_models("model.rs.j2")
+        return self.render_stream("models.rs.j2", models=models)
     
     def generate_models(self) -> str:
-        return "use serde::{Deserialize, Serialize};"
+        return "".join(self.stream_models())
@@ -0,0 +1,328 @@
+"""
+Resolution of JSON schemas to target-language types.
+
+Primitive types come from one flat table keyed by ``(language, type, format)``
+that is built once at import. Composite schemas are built by per-language
+rules: arrays with their item type, maps from ``additionalProperties``,
+references to component models, ``nullable`` and ``oneOf``/``anyOf`` unions.
+
+Resolution has two stages. ``SchemaTypes`` turns schemas into language-neutral
+``TypeRef`` values once per parse result, memoized by schema object identity;
+resolved ``$ref`` targets are shared objects (in the dict IR and the compact IR
+alike), so a schema used by thousands of properties is analyzed once. A
+``TypeResolver`` then spells each distinct ``TypeRef`` once for its language.
+
+Component schemas with properties (object models) resolve to their model name.
+Other component schemas (enums, aliases of arrays or primitives) resolve to
+their structure, since the model generated for them has no fields.
+
+Parameters are resolved with ``models=False``: they are serialized into the
+URL or headers, so models resolve to their structure, dates stay strings and
+nullability is not expressed.
+"""
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+from parsers.ref_resolver import cyclic_nodes
+
+from . import naming
+
+
+class TypeRules(NamedTuple):
+    """How a language spells composite types"""
+    any: str
+    object: str
+    array: str                     # format of an array, given the item type
+    map: str                       # format of a string-keyed map, given the value type
+    union: Optional[str]           # format given the joined member types; None: use ``any``
+    union_separator: str
+    nullable: Optional[str]        # format of a nullable type; None: not expressed
+    optional: str                  # format of a value that may be absent
+    nilable: Tuple[str, ...]       # prefixes of types that are already optional
+    nilable_suffixes: Tuple[str, ...]
+    recursive_model: str           # format of a reference to a model on a reference cycle
+
+
+RULES: Dict[str, TypeRules] = {
+    "python": TypeRules("Any", "Dict[str, Any]", "List[{}]", "Dict[str, {}]", "Union[{}]", ", ",
+                        "Optional[{}]", "Optional[{}]", ("Optional[",), (), "{}"),
+    "javascript": TypeRules("any", "object", "Array<{}>", "Record<string, {}>", "{}", " | ",
+                            "{} | null", "{}", (), (), "{}"),
+    "go": TypeRules("interface{}", "map[string]interface{}", "[]{}", "map[string]{}", None, "",
+                    None, "*{}", ("*", "[]", "map[", "interface{}"), (), "*{}"),
+    "rust": TypeRules("serde_json::Value", "serde_json::Value", "Vec<{}>",
+                      "std::collections::HashMap<String, {}>", None, "",
+                      "Option<{}>", "Option<{}>", ("Option<",), (), "Box<{}>"),
+    "csharp": TypeRules("object", "Dictionary<string, object>", "List<{}>", "Dictionary<string, {}>",
+                        None, "", "{}?", "{}?", (), ("?",), "{}"),
+    "java": TypeRules("Object", "Map<String, Object>", "List<{}>", "Map<String, {}>", None, "",
+                      None, "{}", (), (), "{}"),
+    "php": TypeRules("mixed", "array", "array", "array", None, "", "?{}", "?{}", ("?", "mixed"), (), "{}"),
+}
+
+
+def _primitive_table() -> Dict[Tuple[str, str, Optional[str]], str]:
+    # (type, format) -> type per language; a None format is the type's default
+    columns = ("python", "javascript", "go", "rust", "csharp", "java", "php")
+    rows = {
+        ("string", None): ("str", "string", "string", "String", "string", "String", "string"),
+        ("string", "date"): ("date", "string", "string", "String", "DateTimeOffset", "LocalDate", "string"),
+        ("string", "date-time"): ("datetime", "string", "time.Time", "String", "DateTimeOffset",
+                                  "OffsetDateTime", "string"),
+        ("string", "binary"): ("bytes", "Blob", "[]byte", "Vec<u8>", "byte[]", "byte[]", "string"),
+        ("integer", None): ("int", "number", "int", "i64", "int", "Integer", "int"),
+        ("integer", "int32"): ("int", "number", "int32", "i32", "int", "Integer", "int"),
+        ("integer", "int64"): ("int", "number", "int64", "i64", "long", "Long", "int"),
+        ("number", None): ("float", "number", "float64", "f64", "double", "Double", "float"),
+        ("number", "float"): ("float", "number", "float32", "f32", "float", "Float", "float"),
+        ("number", "double"): ("float", "number", "float64", "f64", "double", "Double", "float"),
+        ("boolean", None): ("bool", "boolean", "bool", "bool", "bool", "Boolean", "bool"),
+    }
+    return {
+        (language, schema_type, schema_format): types[column]
+        for (schema_type, schema_format), types in rows.items()
+        for column, language in enumerate(columns)
+    }
+
+
+PRIMITIVE_TYPES = _primitive_table()
+
+# Formats that are plain strings where a value is serialized into the URL
+WIRE_STRING_FORMATS = frozenset({"date", "date-time"})
+
+
+def is_model(schema: Any) -> bool:
+    """Whether a component schema is generated as a model with fields"""
+    return isinstance(schema, Mapping) and bool(schema.get("properties")) and \
+        schema.get("type", "object") == "object"
+
+
+# Kinds of TypeRef
+ANY = "any"
+OBJECT = "object"
+PRIMITIVE = "primitive"
+ARRAY = "array"
+MAP = "map"
+MODEL = "model"
+UNION = "union"
+
+
+class TypeRef(NamedTuple):
+    """Language-neutral type of a schema, spelled per language by ``TypeResolver``"""
+    kind: str
+    name: str = ""                 # PRIMITIVE: the schema type; MODEL: the component schema name
+    format: Optional[str] = None   # PRIMITIVE: the schema format
+    args: Tuple["TypeRef", ...] = ()  # ARRAY and MAP: the item type; UNION: the members
+    nullable: bool = False
+    recursive: bool = False        # MODEL: the model reaches itself through its fields
+
+
+ANY_TYPE = TypeRef(ANY)
+
+
+class SchemaTypes:
+    """Language-neutral analysis of the schemas of one parse result.
+
+    Finds the component models, the models on reference cycles, and turns each
+    schema into a ``TypeRef``. Refs are memoized by schema identity and equal
+    refs are shared, so the analysis is done once for every language.
+    """
+
+    def __init__(self, components: Optional[Mapping[str, Any]] = None):
+        schemas = (components or {}).get("schemas") or {}
+        # Model schemas by identity
+        self.models: Dict[int, str] = {id(schema): name for name, schema in schemas.items() if is_model(schema)}
+        self.recursive = self._find_recursive(schemas)
+        # Memoized refs by (id(schema), models); the schemas are kept alive by the parse result
+        self._memo: Dict[Tuple[int, bool], TypeRef] = {}
+        self._shared: Dict[TypeRef, TypeRef] = {}
+        self._active: Set[int] = set()
+
+    def ref(self, schema: Any, models: bool = True) -> TypeRef:
+        """Type of a schema; ``models=False`` resolves a parameter (see module docstring)"""
+        if not isinstance(schema, Mapping) or not schema:
+            return ANY_TYPE
+        schema_type = schema.get("type")
+        if schema_type.__class__ is str and schema_type not in ("array", "object") and \
+                (not models or id(schema) not in self.models):
+            # Most schemas are inline primitives: cheap to rebuild, and not worth
+            # a memo entry each (a large spec has one per parameter)
+            result = self._primitive(schema, schema_type, models)
+            if models and schema.get("nullable"):
+                result = result._replace(nullable=True)
+            return self._shared.setdefault(result, result)
+        key = (id(schema), models)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+        if id(schema) in self._active:
+            # A structural cycle outside the models (e.g. an array alias of itself)
+            return ANY_TYPE
+        self._active.add(id(schema))
+        try:
+            result = self._ref(schema, models)
+        finally:
+            self._active.discard(id(schema))
+        result = self._memo[key] = self._shared.setdefault(result, result)
+        return result
+
+    def _ref(self, schema: Mapping[str, Any], models: bool) -> TypeRef:
+        name = self.models.get(id(schema)) if models else None
+        if name is not None:
+            return TypeRef(MODEL, name, nullable=bool(schema.get("nullable")),
+                           recursive=id(schema) in self.recursive)
+
+        schema_type = schema.get("type")
+        nullable = models and bool(schema.get("nullable"))
+        if isinstance(schema_type, list):
+            # OpenAPI 3.1: a list of types, possibly with "null"
+            types = [t for t in schema_type if t != "null"]
+            nullable = models and (nullable or len(types) < len(schema_type))
+            schema_type = types[0] if len(types) == 1 else None
+            if len(types) > 1:
+                return self._union([self._typed(schema, t, models) for t in types], nullable)
+
+        members = schema.get("oneOf") or schema.get("anyOf")
+        if members and not schema_type:
+            options = [member for member in members if not self._is_null(member)]
+            nullable = models and (nullable or len(options) < len(members))
+            return self._union([self.ref(member, models) for member in options], nullable)
+
+        all_of = schema.get("allOf")
+        if all_of and not schema_type and not schema.get("properties") and len(all_of) == 1:
+            return self._nullable(self.ref(all_of[0], models), nullable)
+
+        return self._nullable(self._typed(schema, schema_type or "object", models), nullable)
+
+    def _typed(self, schema: Mapping[str, Any], schema_type: str, models: bool) -> TypeRef:
+        if schema_type == "array":
+            return TypeRef(ARRAY, args=(self.ref(schema.get("items"), models),))
+        if schema_type == "object":
+            values = schema.get("additionalProperties")
+            if isinstance(values, Mapping) and values and not schema.get("properties"):
+                return TypeRef(MAP, args=(self.ref(values, models),))
+            return TypeRef(OBJECT)
+        return self._primitive(schema, schema_type, models)
+
+    @staticmethod
+    def _primitive(schema: Mapping[str, Any], schema_type: str, models: bool) -> TypeRef:
+        schema_format = schema.get("format")
+        if not models and schema_format in WIRE_STRING_FORMATS:
+            schema_format = None
+        return TypeRef(PRIMITIVE, schema_type, schema_format)
+
+    @staticmethod
+    def _union(members: List[TypeRef], nullable: bool) -> TypeRef:
+        members = list(dict.fromkeys(members))
+        if len(members) == 1:
+            return SchemaTypes._nullable(members[0], nullable)
+        return TypeRef(UNION, args=tuple(members), nullable=nullable)
+
+    @staticmethod
+    def _nullable(ref: TypeRef, nullable: bool) -> TypeRef:
+        return ref._replace(nullable=True) if nullable and not ref.nullable else ref
+
+    @staticmethod
+    def _is_null(schema: Any) -> bool:
+        return isinstance(schema, Mapping) and schema.get("type") == "null"
+
+    def _find_recursive(self, schemas: Mapping[str, Any]) -> Set[int]:
+        """Models that reach themselves through fields (not through arrays or maps)"""
+        edges: Dict[int, List[int]] = {}
+        for schema in schemas.values():
+            if id(schema) in self.models:
+                edges[id(schema)] = [
+                    id(target) for target in self._field_models(schema)
+                ]
+        return cyclic_nodes(edges)
+
+    def _field_models(self, schema: Mapping[str, Any]) -> List[Any]:
+        """Models held directly by the fields of a model"""
+        found = []
+        for prop in (schema.get("properties") or {}).values():
+            pending = [prop]
+            while pending:
+                node = pending.pop()
+                if not isinstance(node, Mapping):
+                    continue
+                if id(node) in self.models:
+                    found.append(node)
+                    continue
+                for key in ("oneOf", "anyOf", "allOf"):
+                    pending.extend(node.get(key) or ())
+        return found
+
+
+class TypeResolver:
+    """Spelling of schema types in one language.
+
+    ``spell`` is memoized by ``TypeRef``, so each distinct type is spelled once
+    per language however many schemas share it. The schema analysis is built on
+    first use unless a shared ``SchemaTypes`` is passed in.
+    """
+
+    def __init__(self, language: str, components: Optional[Mapping[str, Any]] = None,
+                 schema_types: Optional[SchemaTypes] = None):
+        self.language = language
+        self.rules = RULES.get(language, RULES["javascript"])
+        self._components = components
+        self._schema_types = schema_types
+        self._spelled: Dict[TypeRef, str] = {}
+
+    @property
+    def schema_types(self) -> SchemaTypes:
+        if self._schema_types is None:
+            self._schema_types = SchemaTypes(self._components)
+        return self._schema_types
+
+    def resolve(self, schema: Any, models: bool = True) -> str:
+        """Type of a schema; ``models=False`` resolves a parameter (see module docstring)"""
+        return self.spell(self.schema_types.ref(schema, models))
+
+    def spell(self, ref: TypeRef) -> str:
+        """The language's spelling of a type"""
+        result = self._spelled.get(ref)
+        if result is None:
+            result = self._spelled[ref] = self._spell(ref)
+        return result
+
+    def optional(self, type_name: str) -> str:
+        """Type of a value of ``type_name`` that may be absent"""
+        rules = self.rules
+        if type_name.startswith(rules.nilable) or \
+                (rules.nilable_suffixes and type_name.endswith(rules.nilable_suffixes)):
+            return type_name
+        return rules.optional.format(type_name)
+
+    def _spell(self, ref: TypeRef) -> str:
+        rules = self.rules
+        kind = ref.kind
+        if kind == PRIMITIVE:
+            language = self.language
+            type_name = PRIMITIVE_TYPES.get((language, ref.name, ref.format)) or \
+                PRIMITIVE_TYPES.get((language, ref.name, None)) or rules.any
+        elif kind == MODEL:
+            type_name = naming.escape(self.language, naming.identifier("pascal", ref.name))
+            if ref.recursive:
+                type_name = rules.recursive_model.format(type_name)
+        elif kind == ARRAY:
+            type_name = rules.array.format(self.spell(ref.args[0]))
+        elif kind == MAP:
+            type_name = rules.map.format(self.spell(ref.args[0]))
+        elif kind == UNION:
+            members = list(dict.fromkeys(self.spell(member) for member in ref.args))
+            if len(members) == 1:
+                type_name = members[0]
+            elif rules.union is None:
+                type_name = rules.any
+            else:
+                type_name = rules.union.format(rules.union_separator.join(members))
+        elif kind == OBJECT:
+            type_name = rules.object
+        else:
+            type_name = rules.any
+
+        if not ref.nullable or rules.nullable is None:
+            return type_name
+        if rules.nullable == rules.optional:
+            return self.optional(type_name)
+        return rules.nullable.format(type_name)
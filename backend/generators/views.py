@@ -0,0 +1,51 @@
+"""
+Template contexts of operations and models.
+
+Generators turn the parsed spec into these views once and render each through
+the language's templates. Views are named tuples rather than dicts because
+attribute lookups on them are the cheapest Jinja2 can do, and templates look
+up fields once per parameter per operation.
+"""
+from typing import List, NamedTuple
+
+
+class ParamView(NamedTuple):
+    """A parameter or a model property"""
+    name: str
+    is_identifier: bool
+    var: str
+    field: str
+    type: str
+    # Type of a value that may be absent (``type`` if it is already nilable)
+    optional_type: str
+    required: bool
+    description: str
+
+
+class OperationView(NamedTuple):
+    """An operation, with its parameters split by location"""
+    name: str
+    method: str
+    path: str
+    url: str
+    summary: str
+    description: str
+    path_params: List[ParamView]
+    query_params: List[ParamView]
+    header_params: List[ParamView]
+    # Query and header parameters: all, required ones and optional ones
+    options: List[ParamView]
+    required_options: List[ParamView]
+    optional_options: List[ParamView]
+    has_body: bool
+    body_required: bool
+
+
+class ModelView(NamedTuple):
+    """A component schema"""
+    name: str
+    schema_name: str
+    description: str
+    properties: List[ParamView]
+    required_properties: List[ParamView]
+    optional_properties: List[ParamView]
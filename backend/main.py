@@ -1,31 +1,137 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
-import yaml
+from starlette.background import BackgroundTask
+from typing import Optional, Dict, Any, List, Tuple
+import functools
+import hmac
 import json
 import io
-import zipfile
 import asyncio
+import os
+import time
 from pathlib import Path
 
-# Import generators and parsers
-from generators import (
-    PythonGenerator,
-    JavaScriptGenerator,
-    GoGenerator,
-    RustGenerator,
-    CSharpGenerator,
-    JavaGenerator,
-    PHPGenerator
+# Import the generation engine (parsers and generators run in its workers)
+from engine import (
+    GenerationEngine,
+    JobStream,
+    EngineBusyError,
+    EngineTimeoutError,
+    GenerationError,
+    GENERATOR_CLASSES,
+    Job,
+    JobQueue,
+    CacheHit,
+    ResultCache,
+    content_digest
 )
-from parsers import OpenAPIParser
+from engine import jobs, tasks
+from engine.compression import DecompressionMiddleware
+from engine.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry, resident_memory_bytes, spec_size_label
+from engine.zipstream import ZipStreamWriter
+from parsers.spec_loader import load_spec
+
+# Process pool shared by /api/generate, /api/preview and /api/batch-generate
+engine = GenerationEngine.from_env()
+
+# Generated archives keyed by spec hash, options and generator fingerprint
+result_cache = ResultCache.from_env()
+
+# Request metrics, exposed in the Prometheus text format at /metrics
+metrics = MetricsRegistry()
+phase_seconds = metrics.histogram(
+    "apigen_phase_seconds",
+    "Time spent in each phase of generation requests",
+    ("phase", "language", "spec_size")
+)
+requests_total = metrics.counter(
+    "apigen_requests_total",
+    "Generation requests by endpoint and HTTP status",
+    ("endpoint", "status")
+)
+metrics.gauge("apigen_engine_pending_jobs", "Engine jobs waiting for a worker or holding one", lambda: engine.pending)
+metrics.gauge("apigen_engine_workers", "Engine worker processes", lambda: engine.max_workers)
+metrics.gauge("apigen_job_queue_active", "Background jobs queued or running", lambda: job_queue.active)
+metrics.gauge("process_resident_memory_bytes", "Resident memory of the server process", resident_memory_bytes)
+
+# Phase label of each timing reported by the server and its workers
+PHASES = {
+    "upload_seconds": "upload",
+    "decode_seconds": "decode",
+    "validate_seconds": "validate",
+    "parse_seconds": "parse",
+    "resolve_seconds": "resolve",
+    "generate_seconds": "generate",
+    "zip_seconds": "zip",
+    "response_seconds": "response",
+}
+
+def observe_phases(timings: Dict[str, Any], language: str, spec_size: str):
+    """Record the phase timings of one request"""
+    for key, phase in PHASES.items():
+        if key in timings:
+            phase_seconds.observe(timings[key], phase, language, spec_size)
+
+def counted(endpoint: str):
+    """Count the requests of an endpoint by the HTTP status they end with"""
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            status = 500
+            try:
+                response = await handler(*args, **kwargs)
+                status = getattr(response, "status_code", 200)
+                return response
+            except HTTPException as e:
+                status = e.status_code
+                raise
+            finally:
+                requests_total.inc(endpoint, str(status))
+        return wrapper
+    return decorate
+
+async def read_upload(file: UploadFile) -> Tuple[bytes, float]:
+    """The uploaded spec and the seconds it took to read"""
+    started = time.perf_counter()
+    content = await file.read()
+    return content, time.perf_counter() - started
+
+def record_job(job: Job, result: Dict[str, Any]):
+    observe_phases(result.get("timings", {}), job.options["language"], spec_size_label(result["spec_bytes"]))
+
+# Background jobs of /api/jobs, polled by clients instead of holding a request open
+job_queue = JobQueue.from_env(engine, result_cache, on_done=record_job)
+
+# Secret that opts a request into profiling (X-Profile header or ?profile= query
+# parameter); profiling is disabled while it is unset
+PROFILE_TOKEN = os.environ.get("GENERATION_PROFILE_TOKEN", "")
+
+def profile_requested(request: Request) -> bool:
+    """Whether a request asks for a profile; 403 unless it presents the configured token"""
+    token = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not token:
+        return False
+    if not PROFILE_TOKEN or not hmac.compare_digest(token.encode("utf-8"), PROFILE_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled for this request")
+    return True
+
+# Seconds between keep-alive comments on an idle job event stream
+JOB_EVENTS_KEEPALIVE = 15.0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await job_queue.shutdown()
+    engine.shutdown()
 
 app = FastAPI(
     title="Universal API Client Generator",
     version="1.0.0",
-    description="Generate API clients in 10+ languages with advanced features"
+    description="Generate API clients in 10+ languages with advanced features",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -37,6 +143,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip- and deflate-encoded uploads (the CLI compresses specs), inflated as they arrive
+app.add_middleware(
+    DecompressionMiddleware,
+    max_bytes=int(float(os.environ.get("UPLOAD_MAX_INFLATED_MB", "512")) * 1024 * 1024)
+)
+
 # Available generators registry
 GENERATORS = {
     "python": {"class": "PythonGenerator", "name": "Python", "status": "available"},
@@ -70,90 +182,143 @@ async def root():
 async def health():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Phase latencies, request counts, memory and queue depth in Prometheus text format"""
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+def check_language(language: str) -> str:
+    """Validate a requested language and return its normalized id"""
+    if language.lower() not in GENERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language: {language}. Supported: {', '.join(GENERATORS.keys())}"
+        )
+    
+    if GENERATORS[language.lower()]["status"] == "coming_soon":
+        raise HTTPException(
+            status_code=501,
+            detail=f"{language} generator is coming soon! Currently available: {', '.join(GENERATOR_CLASSES.keys())}"
+        )
+    
+    return language.lower()
+
+@contextmanager
+def engine_errors():
+    """Map generation engine errors to HTTP errors"""
+    try:
+        yield
+    except GenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except EngineBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except EngineTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+async def run_job(fn, *args):
+    """Run a generation job on the engine"""
+    with engine_errors():
+        return await engine.run(fn, *args)
+
+async def stream_job(fn, *args, on_meta=None) -> JobStream:
+    """Start a streaming generation job on the engine"""
+    with engine_errors():
+        return await engine.stream(fn, *args, on_meta=on_meta)
+
 @app.post("/api/generate")
+@counted("generate")
 async def generate_client(
+    request: Request,
     file: UploadFile = File(...),
     language: str = Form(...),
     package_name: str = Form("api_client"),
     include_tests: bool = Form(False),
     include_docs: bool = Form(True)
 ):
-    """Generate API client from OpenAPI specification"""
+    """Generate API client from OpenAPI specification
+    
+    A profiled request (see ``profile_requested``) bypasses the result cache
+    and returns the archive with the profile summary and collapsed stacks
+    added under ``apigen-profile/``.
+    """
     try:
-        content = await file.read()
-        
-        # Parse spec
-        try:
-            if file.filename.endswith(('.yaml', '.yml')):
-                spec = yaml.safe_load(content)
-            else:
-                spec = json.loads(content)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid OpenAPI format: {str(e)}")
+        profile = profile_requested(request)
+        content, upload_seconds = await read_upload(file)
+        language = check_language(language)
+        spec_size = spec_size_label(len(content))
+        options = {
+            "language": language,
+            "package_name": package_name,
+            "include_tests": include_tests,
+            "include_docs": include_docs
+        }
+        headers = {"Content-Disposition": f"attachment; filename={package_name}_{language}.zip"}
         
-        # Validate language
-        if language.lower() not in GENERATORS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported language: {language}. Supported: {', '.join(GENERATORS.keys())}"
+        if profile:
+            # Not recorded in the phase histograms: sampling skews the timings
+            result = await run_job(tasks.profile_archive, content, file.filename or "", language,
+                                   package_name, include_tests, include_docs)
+            return Response(
+                result["archive"],
+                media_type="application/zip",
+                headers={**headers, "X-Cache": "BYPASS", "X-Profile-Samples": str(result["summary"]["samples"])}
             )
         
-        # Check if generator is available
-        if GENERATORS[language.lower()]["status"] == "coming_soon":
-            raise HTTPException(
-                status_code=501,
-                detail=f"{language} generator is coming soon! Currently available: python, javascript, go, rust, csharp, java, php"
+        # Repeat uploads are served from the cache without parsing or generating,
+        # new bytes of a known spec (reformatted or reordered) once it is decoded
+        upload_digest = content_digest(content)
+        archive = result_cache.lookup(upload_digest, **options)
+        stream = None
+        if archive is None:
+            try:
+                stream = await stream_job(
+                    tasks.stream_archive,
+                    content,
+                    file.filename or "",
+                    language,
+                    package_name,
+                    include_tests,
+                    include_docs,
+                    on_meta=result_cache.spec_hash_check(upload_digest, **options)
+                )
+            except CacheHit as hit:
+                archive = hit.data
+        if archive is not None:
+            observe_phases({"upload_seconds": upload_seconds}, language, spec_size)
+            return StreamingResponse(
+                io.BytesIO(archive),
+                media_type="application/zip",
+                headers={**headers, "X-Cache": "HIT"}
             )
         
-        # Parse OpenAPI spec
-        try:
-            parser = OpenAPIParser(spec)
-            errors = parser.validate()
-            if errors:
-                raise HTTPException(status_code=400, detail=f"Invalid OpenAPI spec: {', '.join(errors)}")
-            parsed_data = parser.parse()
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to parse OpenAPI spec: {str(e)}")
-        
-        # Get generator class
-        generator_map = {
-            "python": PythonGenerator,
-            "javascript": JavaScriptGenerator,
-            "go": GoGenerator,
-            "rust": RustGenerator,
-            "csharp": CSharpGenerator,
-            "java": JavaGenerator,
-            "php": PHPGenerator
-        }
-        
-        generator_class = generator_map[language.lower()]
-        generator = generator_class(
-            parsed_data=parsed_data,
-            package_name=package_name,
-            include_tests=include_tests,
-            include_docs=include_docs
-        )
-        
-        # Generate client
-        try:
-            generated_files = generator.generate()
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to generate client: {str(e)}")
-        
-        # Create ZIP
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path, content in generated_files.items():
-                zip_file.writestr(file_path, content)
-        
-        zip_buffer.seek(0)
+        async def archive_chunks():
+            # Keep a copy for the cache unless the archive outgrows every tier
+            kept: Optional[List[bytes]] = [] if result_cache.enabled else None
+            kept_bytes = 0
+            response_seconds = 0.0
+            async for chunk in stream:
+                if kept is not None:
+                    kept.append(chunk)
+                    kept_bytes += len(chunk)
+                    if kept_bytes > result_cache.max_entry_bytes:
+                        kept = None
+                sent = time.perf_counter()
+                yield chunk
+                response_seconds += time.perf_counter() - sent
+            observe_phases(
+                {**stream.meta.get("timings", {}), "upload_seconds": upload_seconds, "response_seconds": response_seconds},
+                language,
+                spec_size
+            )
+            if kept is not None:
+                result_cache.store(upload_digest, stream.meta["spec_hash"], b"".join(kept), **options)
         
+        # Closed after the response, also when the client left before the body started
         return StreamingResponse(
-            zip_buffer,
+            archive_chunks(),
             media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename={package_name}_{language}.zip"}
+            headers={**headers, "X-Cache": "MISS"},
+            background=BackgroundTask(stream.close)
         )
         
     except HTTPException:
@@ -161,33 +326,200 @@ async def generate_client(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def job_status(job: Job) -> Dict[str, Any]:
+    """Job status with the URLs of its status, events and archive"""
+    base = f"/api/jobs/{job.id}"
+    return {
+        **job.to_dict(),
+        "status_url": base,
+        "events_url": f"{base}/events",
+        "download_url": f"{base}/download"
+    }
+
+def get_job(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.post("/api/jobs", status_code=202)
+@counted("jobs")
+async def submit_job(
+    file: UploadFile = File(...),
+    language: str = Form(...),
+    package_name: str = Form("api_client"),
+    include_tests: bool = Form(False),
+    include_docs: bool = Form(True)
+):
+    """Queue generation of an API client and return its job at once.
+    
+    Poll the status URL, or follow the events URL (Server-Sent Events), until
+    the job is done, then fetch the archive from the download URL.
+    """
+    content, upload_seconds = await read_upload(file)
+    language = check_language(language)
+    observe_phases({"upload_seconds": upload_seconds}, language, spec_size_label(len(content)))
+    with engine_errors():
+        job = job_queue.submit(
+            content,
+            file.filename or "",
+            language=language,
+            package_name=package_name,
+            include_tests=include_tests,
+            include_docs=include_docs
+        )
+    return JSONResponse(job_status(job), status_code=202)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status, phase and percentage of a generation job"""
+    return job_status(get_job(job_id))
+
+@app.get("/api/jobs/{job_id}/download")
+async def download_job(job_id: str):
+    """Archive of a finished generation job"""
+    job = get_job(job_id)
+    if job.status == jobs.FAILED:
+        raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+    if job.status != jobs.DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, not done yet")
+    artifact = job_queue.artifact(job)
+    if not artifact.is_file():
+        raise HTTPException(status_code=410, detail="Job archive is no longer available")
+    return FileResponse(artifact, media_type="application/zip", filename=job.filename)
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events stream of a job's progress, ending once it finishes"""
+    job = get_job(job_id)
+    
+    async def events():
+        nonlocal job
+        sent = None
+        while True:
+            version = job.version
+            status = job_status(job)
+            if status != sent:
+                sent = status
+                event = job.status if job.status in jobs.FINISHED else "progress"
+                yield f"event: {event}\ndata: {json.dumps(status)}\n\n"
+                if job.status in jobs.FINISHED:
+                    return
+            else:
+                yield ": keep-alive\n\n"
+            await job.wait(version, JOB_EVENTS_KEEPALIVE)
+            # A job run by another server process is re-read from the store instead
+            job = job_queue.get(job_id) or job
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/preview")
+@counted("preview")
 async def preview_client(
     file: UploadFile = File(...),
     language: str = Form(...),
     package_name: str = Form("api_client")
 ):
     """Preview generated code before downloading"""
-    return JSONResponse({
-        "preview": "Code preview feature - Implementation in progress",
-        "files": ["client.py", "models.py", "README.md"],
-        "language": language
-    })
+    content, upload_seconds = await read_upload(file)
+    language = check_language(language)
+    
+    preview = await run_job(tasks.preview_files, content, file.filename or "", language, package_name)
+    observe_phases({**preview.pop("timings"), "upload_seconds": upload_seconds}, language, spec_size_label(len(content)))
+    return JSONResponse(preview)
 
 @app.post("/api/batch-generate")
+@counted("batch-generate")
 async def batch_generate(
     file: UploadFile = File(...),
     languages: str = Form(...),  # Comma-separated
-    package_name: str = Form("api_client")
+    package_name: str = Form("api_client"),
+    include_tests: bool = Form(False),
+    include_docs: bool = Form(True)
 ):
-    """Generate clients for multiple languages at once"""
-    lang_list = [l.strip() for l in languages.split(',')]
+    """Generate clients for multiple languages at once.
+    
+    The spec is parsed once; each language is then generated in its own
+    worker. The archive has one folder per language and a manifest.json with
+    per-language timings.
+    """
+    lang_list = list(dict.fromkeys(
+        check_language(l.strip()) for l in languages.split(',') if l.strip()
+    ))
+    if not lang_list:
+        raise HTTPException(status_code=400, detail="No languages selected")
     
-    return JSONResponse({
-        "message": "Batch generation feature - Implementation in progress",
-        "languages": lang_list,
-        "status": "queued"
-    })
+    content, upload_seconds = await read_upload(file)
+    spec_size = spec_size_label(len(content))
+    started = time.perf_counter()
+    prepared = await run_job(tasks.prepare_batch, content, file.filename or "")
+    observe_phases({**prepared["timings"], "upload_seconds": upload_seconds}, "batch", spec_size)
+    
+    async def generate_language(language: str) -> Dict[str, Any]:
+        language_started = time.perf_counter()
+        result = await run_job(
+            tasks.compress_language,
+            prepared["parsed"],
+            language,
+            package_name,
+            include_tests,
+            include_docs
+        )
+        result["timings"]["wall_seconds"] = round(time.perf_counter() - language_started, 4)
+        timings = result["timings"]
+        observe_phases({"generate_seconds": timings["render_seconds"], "zip_seconds": timings["zip_seconds"]},
+                       language, spec_size)
+        return result
+    
+    results = await asyncio.gather(
+        *(generate_language(language) for language in lang_list),
+        return_exceptions=True
+    )
+    
+    manifest: Dict[str, Any] = {
+        "package_name": package_name,
+        "spec_hash": prepared["spec_hash"],
+        "endpoints": prepared["endpoints"],
+        "parse_seconds": prepared["parse_seconds"],
+        "languages": {}
+    }
+    members = []
+    for language, result in zip(lang_list, results):
+        if isinstance(result, BaseException):
+            error = result.detail if isinstance(result, HTTPException) else str(result)
+            manifest["languages"][language] = {"status": "failed", "error": error}
+        else:
+            manifest["languages"][language] = {"status": "ok", **result["timings"]}
+            members.extend(result["members"])
+    manifest["total_seconds"] = round(time.perf_counter() - started, 4)
+    
+    if not members:
+        errors = [f"{lang}: {info['error']}" for lang, info in manifest["languages"].items()]
+        raise HTTPException(status_code=500, detail=f"Batch generation failed: {'; '.join(errors)}")
+    
+    def archive_chunks():
+        writer = ZipStreamWriter()
+        response_seconds = 0.0
+        for member in members:
+            sent = time.perf_counter()
+            yield writer.add_compressed(member)
+            response_seconds += time.perf_counter() - sent
+        yield (
+            writer.start_file("manifest.json")
+            + writer.write(json.dumps(manifest, indent=2))
+            + writer.finish()
+        )
+        observe_phases({"response_seconds": response_seconds}, "batch", spec_size)
+    
+    return StreamingResponse(
+        archive_chunks(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={package_name}_batch.zip"}
+    )
 
 @app.post("/api/validate")
 async def validate_spec(file: UploadFile = File(...)):
@@ -196,10 +528,7 @@ async def validate_spec(file: UploadFile = File(...)):
         content = await file.read()
         
         try:
-            if file.filename.endswith(('.yaml', '.yml')):
-                spec = yaml.safe_load(content)
-            else:
-                spec = json.loads(content)
+            spec = load_spec(content)
         except Exception as e:
             return JSONResponse(
                 status_code=400,
@@ -266,6 +595,11 @@ async def validate_spec_json(spec: dict):
             content={"valid": False, "errors": [str(e)]}
         )
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Result cache hit, miss and eviction counters"""
+    return result_cache.stats()
+
 @app.get("/api/languages")
 async def get_supported_languages():
     """Get list of supported programming languages"""
@@ -1,5 +1,6 @@
 """OpenAPI parser module."""
 
 from .openapi_parser import OpenAPIParser
+from .ref_resolver import RefResolver, RefResolutionError
 
-__all__ = ['OpenAPIParser']
\ No newline at end of file
+__all__ = ['OpenAPIParser', 'RefResolver', 'RefResolutionError']
@@ -0,0 +1,169 @@
+"""
+Incremental re-parsing of an edited spec.
+
+``diff_specs`` compares two decoded documents section by section and operation
+by operation. ``IncrementalParser`` keeps the last document and its parse
+result; on an update it re-parses only the operations that were added or
+changed and reuses the parsed form of every other operation. An edit that
+touches ``components`` (or anything a partial parse cannot resolve on its own)
+falls back to a full parse, since resolved schemas are inlined into the
+operations that reference them.
+"""
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from .index import SpecIndex
+from .openapi_parser import OpenAPIParser
+
+HTTP_METHODS = ("get", "post", "put", "patch", "delete", "options", "head")
+
+# Sections of the parse result (all but the derived "index")
+SECTIONS = ("info", "servers", "paths", "components", "security")
+
+OperationKey = Tuple[str, str]
+
+
+class SpecDelta(NamedTuple):
+    """What changed between two versions of a spec"""
+    sections: FrozenSet[str]
+    operations: FrozenSet[OperationKey]
+    schemas: FrozenSet[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.sections)
+
+
+FULL_DELTA = SpecDelta(frozenset(SECTIONS), frozenset(), frozenset())
+
+
+def operation_keys(spec: Dict[str, Any]) -> List[OperationKey]:
+    """``(path, METHOD)`` of every operation, in document order"""
+    keys = []
+    for path, path_item in (spec.get("paths") or {}).items():
+        for method in path_item:
+            if method in HTTP_METHODS:
+                keys.append((path, method.upper()))
+    return keys
+
+
+def diff_specs(old: Dict[str, Any], new: Dict[str, Any]) -> SpecDelta:
+    """Compare two decoded specs structurally"""
+    sections = set()
+    for section in ("info", "servers", "security"):
+        if old.get(section) != new.get(section):
+            sections.add(section)
+
+    old_components = old.get("components") or {}
+    new_components = new.get("components") or {}
+    schemas = set()
+    if old_components != new_components:
+        sections.add("components")
+        old_schemas = old_components.get("schemas") or {}
+        new_schemas = new_components.get("schemas") or {}
+        for name in old_schemas.keys() | new_schemas.keys():
+            if old_schemas.get(name) != new_schemas.get(name):
+                schemas.add(name)
+
+    old_paths = old.get("paths") or {}
+    new_paths = new.get("paths") or {}
+    operations = set()
+    if old_paths != new_paths:
+        for path in old_paths.keys() | new_paths.keys():
+            old_item = old_paths.get(path) or {}
+            new_item = new_paths.get(path) or {}
+            if old_item == new_item:
+                continue
+            # Path-item parameters are part of every operation of the path
+            shared_changed = old_item.get("parameters") != new_item.get("parameters")
+            for method in HTTP_METHODS:
+                if old_item.get(method) != new_item.get(method) or (shared_changed and method in new_item):
+                    operations.add((path, method.upper()))
+    # Reordered paths reorder the parsed operations
+    if operations or list(old_paths) != list(new_paths):
+        sections.add("paths")
+
+    return SpecDelta(frozenset(sections), frozenset(operations), frozenset(schemas))
+
+
+class IncrementalParser:
+    """Parse successive versions of one spec, reusing unchanged operations"""
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        self.spec: Optional[Dict[str, Any]] = None
+        self.parsed: Optional[Dict[str, Any]] = None
+        self.full_parses = 0
+        self.partial_parses = 0
+
+    def reset(self):
+        """Forget the previous version; the next update parses in full"""
+        self.spec = None
+        self.parsed = None
+
+    def update(self, spec: Dict[str, Any]) -> Tuple[List[str], Optional[Dict[str, Any]], SpecDelta]:
+        """Parse a new version. Returns (errors, parsed, delta against the previous version)
+
+        On validation errors the previous version is forgotten, so the next
+        valid version is parsed in full.
+        """
+        if self.parsed is None:
+            return self._full(spec, FULL_DELTA)
+
+        delta = diff_specs(self.spec, spec)
+        if not delta:
+            self.spec = spec
+            return [], self.parsed, delta
+        # Components are inlined into operations, and global security decides
+        # the security schemes of every operation in the index
+        if ("components" in delta.sections or "security" in delta.sections
+                or self._has_path_item_refs(self.spec) or self._has_path_item_refs(spec)):
+            return self._full(spec, delta)
+
+        # Parse the changed operations against the rest of the document
+        changed: Dict[str, Dict[str, Any]] = {}
+        for path, method in delta.operations:
+            operation = (spec.get("paths") or {}).get(path, {}).get(method.lower())
+            if operation is not None:
+                changed.setdefault(path, {})[method.lower()] = operation
+        partial = dict(spec, paths=changed)
+        errors = OpenAPIParser(spec).validate_structure()
+        sub_parser = OpenAPIParser(partial)
+        if errors or sub_parser.resolver.unresolved_refs():
+            # References outside components (or errors to report): parse everything
+            return self._full(spec, delta)
+
+        sub_parsed = sub_parser.parse(compact=self.compact)
+        previous, changed_index = self.parsed["index"], sub_parsed["index"]
+        operations = []
+        for path, method in operation_keys(spec):
+            operation = changed_index.operation(path, method)
+            operations.append(operation if operation is not None else previous.operation(path, method))
+        sub_parsed["paths"] = operations
+        sub_parsed["components"] = self.parsed["components"]
+        sub_parsed["index"] = SpecIndex(operations, {**previous.refs, **changed_index.refs})
+
+        self.spec = spec
+        self.parsed = sub_parsed
+        self.partial_parses += 1
+        return [], sub_parsed, delta
+
+    def _full(self, spec: Dict[str, Any], delta: SpecDelta):
+        parser = OpenAPIParser(spec)
+        errors = parser.validate()
+        parsed = None
+        if not errors:
+            try:
+                parsed = parser.parse(compact=self.compact)
+            except Exception as e:
+                errors = [f"Failed to parse: {str(e)}"]
+        if errors:
+            self.reset()
+            return errors, None, FULL_DELTA
+        self.spec = spec
+        self.parsed = parsed
+        self.full_parses += 1
+        return [], parsed, delta
+
+    @staticmethod
+    def _has_path_item_refs(spec: Dict[str, Any]) -> bool:
+        # The operations of a referenced path item are not visible to diff_specs
+        return any("$ref" in (item or {}) for item in (spec.get("paths") or {}).values())
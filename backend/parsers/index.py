@@ -0,0 +1,166 @@
+"""
+Precomputed lookup tables over the parsed operations.
+
+``OpenAPIParser.parse()`` adds a ``SpecIndex`` to its result under ``"index"``,
+so generators and tools look operations up by tag, operationId, path, the
+component schemas they use or their security schemes without scanning
+``paths``. The index is built in the same pass that parses the operations and
+is read-only: every table is a ``MappingProxyType`` of tuples.
+
+Schema references are found by identity: the resolver replaces each ``$ref``
+with the shared resolved target, so a component schema is reached as the very
+object stored under ``components.schemas``. An operation uses a schema when it
+references it directly or through other component schemas.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+OperationKey = Tuple[str, str]
+
+# Tag of operations without tags
+DEFAULT_TAG = "default"
+
+
+class OperationRefs(NamedTuple):
+    """What an operation depends on besides its own definition"""
+    schemas: Tuple[str, ...]
+    security_schemes: Tuple[str, ...]
+
+
+def _frozen(groups: Dict[Any, List[Any]]) -> Mapping[Any, Tuple[Any, ...]]:
+    return MappingProxyType({key: tuple(values) for key, values in groups.items()})
+
+
+class SpecIndex:
+    """Immutable tables of parsed operations, in document order within each entry"""
+
+    __slots__ = ("operations", "refs", "by_tag", "by_operation_id", "by_path", "by_schema",
+                 "by_security_scheme")
+
+    def __init__(self, operations: Iterable[Mapping[str, Any]],
+                 refs: Optional[Mapping[OperationKey, OperationRefs]] = None):
+        operations = tuple(operations)
+        refs = refs or {}
+        by_tag: Dict[str, List[Any]] = {}
+        by_operation_id: Dict[str, Any] = {}
+        by_path: Dict[str, Dict[str, Any]] = {}
+        by_schema: Dict[str, List[Any]] = {}
+        by_security_scheme: Dict[str, List[Any]] = {}
+
+        for operation in operations:
+            key = (operation["path"], operation["method"])
+            for tag in operation["tags"] or (DEFAULT_TAG,):
+                by_tag.setdefault(tag, []).append(operation)
+            by_operation_id.setdefault(operation["operation_id"], operation)
+            by_path.setdefault(key[0], {})[key[1]] = operation
+            operation_refs = refs.get(key)
+            if operation_refs is not None:
+                for name in operation_refs.schemas:
+                    by_schema.setdefault(name, []).append(operation)
+                for scheme in operation_refs.security_schemes:
+                    by_security_scheme.setdefault(scheme, []).append(operation)
+
+        setattr_ = object.__setattr__
+        setattr_(self, "operations", operations)
+        setattr_(self, "refs", MappingProxyType(
+            {key: value for key, value in refs.items() if key[1] in by_path.get(key[0], ())}
+        ))
+        setattr_(self, "by_tag", _frozen(by_tag))
+        setattr_(self, "by_operation_id", MappingProxyType(by_operation_id))
+        setattr_(self, "by_path", MappingProxyType(
+            {path: MappingProxyType(methods) for path, methods in by_path.items()}
+        ))
+        setattr_(self, "by_schema", _frozen(by_schema))
+        setattr_(self, "by_security_scheme", _frozen(by_security_scheme))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("SpecIndex is read-only")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("SpecIndex is read-only")
+
+    def operation(self, path: str, method: str) -> Optional[Mapping[str, Any]]:
+        """The operation at a path template and (upper-case) method, if any"""
+        return self.by_path.get(path, {}).get(method)
+
+    # Mapping proxies cannot be pickled; the tables are rebuilt from the
+    # operations, which the pickle shares with the parse result's ``paths``
+    def __reduce__(self):
+        return SpecIndex, (self.operations, dict(self.refs))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SpecIndex):
+            return NotImplemented
+        return self.operations == other.operations and self.refs == other.refs
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"SpecIndex({len(self.operations)} operations, {len(self.by_schema)} schemas used)"
+
+
+class IndexBuilder:
+    """Collect the references of each operation while the parser visits it"""
+
+    def __init__(self, document: Dict[str, Any]):
+        schemas = (document.get("components") or {}).get("schemas") or {}
+        # Resolved component schemas by identity
+        self._names: Dict[int, str] = {
+            id(schema): name for name, schema in schemas.items() if isinstance(schema, (dict, list))
+        }
+        self._schemas = schemas
+        self._schema_refs: Dict[str, Tuple[str, ...]] = {}
+        self._global_security = document.get("security") or []
+        self.refs: Dict[OperationKey, OperationRefs] = {}
+
+    def add(self, path: str, method: str, path_item: Dict[str, Any], operation: Dict[str, Any]):
+        """Record the references of one resolved operation"""
+        direct = self._direct_refs((path_item.get("parameters"), operation))
+        security = operation["security"] if "security" in operation else self._global_security
+        schemes: Dict[str, None] = {}
+        for requirement in security or ():
+            if isinstance(requirement, dict):
+                schemes.update(dict.fromkeys(requirement))
+        self.refs[(path, method)] = OperationRefs(self._closure(direct), tuple(schemes))
+
+    def build(self, operations: Iterable[Mapping[str, Any]]) -> SpecIndex:
+        return SpecIndex(operations, self.refs)
+
+    def _direct_refs(self, node: Any) -> List[str]:
+        """Component schemas reachable from ``node`` without passing through another one"""
+        found: Dict[str, None] = {}
+        seen: Set[int] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                values = node.values()
+            elif isinstance(node, (list, tuple)):
+                values = node
+            else:
+                continue
+            for value in values:
+                if not isinstance(value, (dict, list, tuple)) or id(value) in seen:
+                    continue
+                seen.add(id(value))
+                name = self._names.get(id(value))
+                if name is not None:
+                    found[name] = None
+                else:
+                    stack.append(value)
+        return list(found)
+
+    def _closure(self, names: List[str]) -> Tuple[str, ...]:
+        """``names`` plus every component schema they use, in discovery order"""
+        result: Dict[str, None] = dict.fromkeys(names)
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            refs = self._schema_refs.get(name)
+            if refs is None:
+                refs = self._schema_refs[name] = tuple(self._direct_refs(self._schemas[name]))
+            for ref in refs:
+                if ref not in result:
+                    result[ref] = None
+                    pending.append(ref)
+        return tuple(result)
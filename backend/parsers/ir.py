@@ -0,0 +1,221 @@
+"""
+Compact intermediate representation of parsed operations.
+
+``OpenAPIParser.parse(compact=True)`` returns these records instead of one dict
+per operation, parameter and response. Records use ``__slots__``, hold tuples
+instead of lists and intern repeated strings (methods, parameter locations,
+tags, content types, status codes, schema types), so a large spec costs a
+fraction of the memory of the dict IR. Every record is a read-only mapping
+with the same keys as the dict it replaces, so generators written against the
+dict IR work unchanged.
+"""
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def intern(value: Any) -> Any:
+    """Intern a string; other values are returned unchanged"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def intern_all(values: Any) -> Tuple[Any, ...]:
+    """Tuple of interned strings"""
+    return tuple(intern(value) for value in values or ())
+
+
+class Record(Mapping):
+    """Read-only, slotted mapping over a fixed set of keys"""
+
+    __slots__ = ()
+
+    # (mapping key, attribute name) pairs; keys such as ``in`` are not identifiers
+    _fields: Tuple[Tuple[str, str], ...] = ()
+    # Keys holding a None value are left out of the mapping
+    _omit_none = False
+    _attrs: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._attrs = dict(cls._fields)
+
+    def __init__(self, **values: Any):
+        for key, attr in self._fields:
+            setattr(self, attr, values.get(key))
+
+    def __getitem__(self, key: str) -> Any:
+        attr = self._attrs.get(key)
+        if attr is not None:
+            value = getattr(self, attr)
+            if value is not None or not self._omit_none:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, attr in self._fields:
+            if not self._omit_none or getattr(self, attr) is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    # Positional state keeps pickles (e.g. for batch workers) small
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __setstate__(self, state: Tuple[Any, ...]):
+        for attr, value in zip(self.__slots__, state):
+            setattr(self, attr, value)
+
+    # Identity semantics: schemas may be cyclic, so structural comparison
+    # (Mapping's default) could recurse forever
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{k}={self[k]!r}' for k in self)})"
+
+
+class Schema(Record):
+    """A JSON schema; uncommon keywords and extensions are kept in ``extra``"""
+
+    __slots__ = ("type", "format", "title", "description", "properties", "items", "required",
+                 "enum", "nullable", "default", "example", "all_of", "one_of", "any_of",
+                 "additional_properties", "extra")
+    _fields = (
+        ("type", "type"), ("format", "format"), ("title", "title"), ("description", "description"),
+        ("properties", "properties"), ("items", "items"), ("required", "required"), ("enum", "enum"),
+        ("nullable", "nullable"), ("default", "default"), ("example", "example"),
+        ("allOf", "all_of"), ("oneOf", "one_of"), ("anyOf", "any_of"),
+        ("additionalProperties", "additional_properties"),
+    )
+    _omit_none = True
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return super().__getitem__(key)
+        except KeyError:
+            if self.extra is not None and key in self.extra:
+                return self.extra[key]
+            raise
+
+    def __iter__(self) -> Iterator[str]:
+        yield from super().__iter__()
+        if self.extra is not None:
+            yield from self.extra
+
+
+class MediaType(Record):
+    __slots__ = ("schema", "example", "examples", "encoding")
+    _fields = (("schema", "schema"), ("example", "example"), ("examples", "examples"), ("encoding", "encoding"))
+    _omit_none = True
+
+
+class Parameter(Record):
+    __slots__ = ("name", "location", "description", "required", "schema", "example")
+    _fields = (
+        ("name", "name"), ("in", "location"), ("description", "description"),
+        ("required", "required"), ("schema", "schema"), ("example", "example"),
+    )
+
+
+class RequestBody(Record):
+    __slots__ = ("description", "required", "content")
+    _fields = (("description", "description"), ("required", "required"), ("content", "content"))
+
+
+class Response(Record):
+    __slots__ = ("status_code", "description", "content", "headers")
+    _fields = (
+        ("status_code", "status_code"), ("description", "description"),
+        ("content", "content"), ("headers", "headers"),
+    )
+
+
+class Operation(Record):
+    __slots__ = ("path", "method", "operation_id", "summary", "description", "parameters",
+                 "request_body", "responses", "security", "tags")
+    _fields = (
+        ("path", "path"), ("method", "method"), ("operation_id", "operation_id"),
+        ("summary", "summary"), ("description", "description"), ("parameters", "parameters"),
+        ("request_body", "request_body"), ("responses", "responses"),
+        ("security", "security"), ("tags", "tags"),
+    )
+
+
+# Schema keywords whose values are sub-schemas
+_SCHEMA_KEYS = {"items", "additionalProperties", "not"}
+_SCHEMA_LIST_KEYS = {"allOf", "oneOf", "anyOf"}
+
+
+class SchemaCompactor:
+    """Convert resolved schema dicts into shared ``Schema`` records.
+
+    Conversion is memoized by object identity, so a schema shared between
+    operations (a resolved ``$ref``) becomes one shared record, and cyclic
+    schemas stay cyclic. Like the resolver it works iteratively.
+    """
+
+    def __init__(self):
+        self._converted: Dict[int, Schema] = {}
+        self._sources: List[Any] = []
+        self._pending: List[Tuple[Dict[str, Any], Schema]] = []
+
+    def convert(self, schema: Any) -> Any:
+        """Return the record for a schema dict (other values are returned unchanged)"""
+        result = self._shell(schema)
+        while self._pending:
+            source, record = self._pending.pop()
+            self._fill(source, record)
+        return result
+
+    def media(self, content: Optional[Dict[str, Any]]) -> Dict[str, MediaType]:
+        """Compact a ``content`` map of media types"""
+        return {
+            intern(content_type): MediaType(**{
+                **media, "schema": self._shell(media.get("schema"))
+            }) if isinstance(media, dict) else media
+            for content_type, media in (content or {}).items()
+        }
+
+    def finish(self):
+        """Fill every record handed out by ``media``"""
+        self.convert(None)
+
+    def _shell(self, schema: Any) -> Any:
+        if not isinstance(schema, dict):
+            return schema
+        record = self._converted.get(id(schema))
+        if record is None:
+            record = Schema.__new__(Schema)
+            self._converted[id(schema)] = record
+            # Keep the source alive so its id cannot be reused mid-conversion
+            self._sources.append(schema)
+            self._pending.append((schema, record))
+        return record
+
+    def _fill(self, source: Dict[str, Any], record: Schema):
+        for key, attr in Schema._fields:
+            setattr(record, attr, None)
+        record.extra = None
+
+        extra = {}
+        for key, value in source.items():
+            attr = Schema._attrs.get(key)
+            if key == "properties" and isinstance(value, dict):
+                value = {intern(name): self._shell(prop) for name, prop in value.items()}
+            elif key in _SCHEMA_KEYS:
+                value = self._shell(value)
+            elif key in _SCHEMA_LIST_KEYS and isinstance(value, list):
+                value = tuple(self._shell(item) for item in value)
+            elif key in ("required", "enum") and isinstance(value, list):
+                value = intern_all(value)
+            elif key in ("type", "format"):
+                value = intern(value)
+
+            if attr is None:
+                extra[key] = value
+            else:
+                setattr(record, attr, value)
+        if extra:
+            record.extra = extra
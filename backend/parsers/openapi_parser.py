@@ -1,15 +1,55 @@
 from typing import Dict, Any, List, Optional
 import re
 
+from .index import IndexBuilder
+from .ref_resolver import RefResolver
+from .ir import (
+    Operation, Parameter, RequestBody, Response, SchemaCompactor, intern, intern_all
+)
+
+def merge_parameters(shared: List[Dict[str, Any]], own: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Parameters of an operation: those of its path item, unless it redefines
+    one with the same name and location, followed by its own"""
+    if not shared:
+        return own
+    redefined = {(param.get("name"), param.get("in")) for param in own}
+    return [param for param in shared if (param.get("name"), param.get("in")) not in redefined] + list(own)
+
 class OpenAPIParser:
     """Parser for OpenAPI 3.0 specifications - 2025 Best Practices"""
     
     def __init__(self, spec: Dict[str, Any]):
         self.spec = spec
         self.openapi_version = spec.get("openapi", "3.0.0")
+        self._resolver: Optional[RefResolver] = None
+        self._document: Optional[Dict[str, Any]] = None
+        self._compactor: Optional[SchemaCompactor] = None
+        self._index: Optional[IndexBuilder] = None
+    
+    @property
+    def resolver(self) -> RefResolver:
+        """JSON-pointer index of the spec, built on first use"""
+        if self._resolver is None:
+            self._resolver = RefResolver(self.spec)
+        return self._resolver
+    
+    @property
+    def document(self) -> Dict[str, Any]:
+        """The spec with every local $ref replaced by its shared resolved target"""
+        if self._document is None:
+            self._document = self.resolver.resolve(self.spec)
+        return self._document
         
     def validate(self) -> List[str]:
         """Validate the OpenAPI specification"""
+        errors = self.validate_structure()
+        for ref in self.resolver.unresolved_refs():
+            errors.append(f"Unresolvable $ref '{ref}'")
+            
+        return errors
+    
+    def validate_structure(self) -> List[str]:
+        """Check the required top-level fields, without resolving references"""
         errors = []
         
         if "openapi" not in self.spec:
@@ -23,19 +63,37 @@ class OpenAPIParser:
             
         return errors
     
-    def parse(self) -> Dict[str, Any]:
-        """Parse the OpenAPI specification into a structured format"""
-        return {
+    def parse(self, compact: bool = False) -> Dict[str, Any]:
+        """Parse the OpenAPI specification into a structured format
+        
+        With ``compact=True`` operations, parameters, responses and schemas are
+        slotted records with interned strings (see ``parsers.ir``) instead of
+        dicts. They are read-only mappings with the same keys.
+        
+        ``"index"`` holds a ``SpecIndex`` of the operations (by tag,
+        operationId, path, component schema and security scheme), built while
+        the operations are parsed.
+        """
+        self._compactor = SchemaCompactor() if compact else None
+        self._index = IndexBuilder(self.document)
+        paths = self._parse_paths()
+        parsed = {
             "info": self._parse_info(),
             "servers": self._parse_servers(),
-            "paths": self._parse_paths(),
+            "paths": paths,
             "components": self._parse_components(),
-            "security": self._parse_security()
+            "security": self._parse_security(),
+            "index": self._index.build(paths)
         }
+        self._index = None
+        if self._compactor is not None:
+            self._compactor.finish()
+            self._compactor = None
+        return parsed
     
     def _parse_info(self) -> Dict[str, Any]:
         """Parse API information"""
-        info = self.spec.get("info", {})
+        info = self.document.get("info", {})
         return {
             "title": info.get("title", "API Client"),
             "version": info.get("version", "1.0.0"),
@@ -46,7 +104,7 @@ class OpenAPIParser:
     
     def _parse_servers(self) -> List[Dict[str, Any]]:
         """Parse server information"""
-        servers = self.spec.get("servers", [])
+        servers = self.document.get("servers", [])
         if not servers:
             return [{"url": "http://localhost", "description": "Default server"}]
         return servers
@@ -55,21 +113,37 @@ class OpenAPIParser:
         """Parse API paths/endpoints"""
         paths = []
         
-        for path, path_item in self.spec.get("paths", {}).items():
+        for path, path_item in self.document.get("paths", {}).items():
+            shared_params = path_item.get("parameters") or []
             for method, operation in path_item.items():
                 if method in ["get", "post", "put", "patch", "delete", "options", "head"]:
-                    paths.append({
+                    fields = {
                         "path": path,
                         "method": method.upper(),
                         "operation_id": operation.get("operationId", self._generate_operation_id(method, path)),
                         "summary": operation.get("summary", ""),
                         "description": operation.get("description", ""),
-                        "parameters": self._parse_parameters(operation.get("parameters", [])),
+                        "parameters": self._parse_parameters(
+                            merge_parameters(shared_params, operation.get("parameters") or [])
+                        ),
                         "request_body": self._parse_request_body(operation.get("requestBody")),
                         "responses": self._parse_responses(operation.get("responses", {})),
                         "security": operation.get("security", []),
                         "tags": operation.get("tags", [])
-                    })
+                    }
+                    if self._compactor is not None:
+                        fields.update(
+                            path=intern(path),
+                            method=intern(fields["method"]),
+                            parameters=tuple(fields["parameters"]),
+                            responses=tuple(fields["responses"]),
+                            security=tuple(fields["security"]),
+                            tags=intern_all(fields["tags"])
+                        )
+                        fields = Operation(**fields)
+                    if self._index is not None:
+                        self._index.add(fields["path"], fields["method"], path_item, operation)
+                    paths.append(fields)
         
         return paths
     
@@ -78,14 +152,22 @@ class OpenAPIParser:
         parsed_params = []
         
         for param in parameters:
-            parsed_params.append({
+            fields = {
                 "name": param.get("name"),
                 "in": param.get("in"),
                 "description": param.get("description", ""),
                 "required": param.get("required", False),
                 "schema": param.get("schema", {}),
                 "example": param.get("example")
-            })
+            }
+            if self._compactor is not None:
+                fields.update({
+                    "name": intern(fields["name"]),
+                    "in": intern(fields["in"]),
+                    "schema": self._compactor.convert(fields["schema"])
+                })
+                fields = Parameter(**fields)
+            parsed_params.append(fields)
         
         return parsed_params
     
@@ -96,32 +178,46 @@ class OpenAPIParser:
         
         content = request_body.get("content", {})
         
-        return {
+        fields = {
             "description": request_body.get("description", ""),
             "required": request_body.get("required", False),
             "content": content
         }
+        if self._compactor is not None:
+            fields["content"] = self._compactor.media(content)
+            return RequestBody(**fields)
+        return fields
     
     def _parse_responses(self, responses: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse operation responses"""
         parsed_responses = []
         
         for status_code, response in responses.items():
-            parsed_responses.append({
+            fields = {
                 "status_code": status_code,
                 "description": response.get("description", ""),
                 "content": response.get("content", {}),
                 "headers": response.get("headers", {})
-            })
+            }
+            if self._compactor is not None:
+                fields.update(
+                    status_code=intern(status_code),
+                    content=self._compactor.media(fields["content"])
+                )
+                fields = Response(**fields)
+            parsed_responses.append(fields)
         
         return parsed_responses
     
     def _parse_components(self) -> Dict[str, Any]:
         """Parse reusable components"""
-        components = self.spec.get("components", {})
+        components = self.document.get("components", {})
+        schemas = components.get("schemas", {})
+        if self._compactor is not None:
+            schemas = {intern(name): self._compactor.convert(schema) for name, schema in schemas.items()}
         
         return {
-            "schemas": components.get("schemas", {}),
+            "schemas": schemas,
             "security_schemes": components.get("securitySchemes", {}),
             "parameters": components.get("parameters", {}),
             "responses": components.get("responses", {}),
@@ -130,7 +226,7 @@ class OpenAPIParser:
     
     def _parse_security(self) -> List[Dict[str, Any]]:
         """Parse global security requirements"""
-        return self.spec.get("security", [])
+        return self.document.get("security", [])
     
     def _generate_operation_id(self, method: str, path: str) -> str:
         """Generate operation ID from method and path"""
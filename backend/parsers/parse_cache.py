@@ -0,0 +1,169 @@
+"""
+Persistent cache of loaded and parsed specs for the command-line tools.
+
+Entries are keyed by a hash of the spec file's bytes and a fingerprint of the
+parser sources, and hold the decoded document, its validation errors and the
+``OpenAPIParser.parse()`` result in one pickle. An unchanged spec is therefore
+read and hashed but never decoded or parsed again. A resolved graph too deep
+to pickle (long ``$ref`` chains, or thousands of interlinked schemas) is
+cached as the decoded document alone and parsed again on load. The directory
+has a size cap; the least recently used entries (by mtime, refreshed on every
+hit) are evicted first.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from .openapi_parser import OpenAPIParser
+from .spec_loader import load_spec
+
+PARSERS_DIR = Path(__file__).resolve().parent
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """``$XDG_CACHE_HOME/apigen/specs``, or ``~/.cache/apigen/specs``"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "apigen" / "specs"
+
+
+@lru_cache(maxsize=None)
+def parser_version() -> str:
+    """Fingerprint of the parser sources; changing the parser invalidates entries"""
+    digest = hashlib.sha256()
+    for path in sorted(PARSERS_DIR.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ParsedSpec(NamedTuple):
+    """A decoded spec with its validation errors and parse result"""
+    spec: Any
+    errors: List[str]
+    parsed: Optional[Dict[str, Any]]
+
+
+def parse_content(content: bytes) -> ParsedSpec:
+    """Decode, validate and parse spec bytes without caching"""
+    return parse_decoded(load_spec(content))
+
+
+def parse_decoded(spec: Any) -> ParsedSpec:
+    """Validate and parse a decoded spec"""
+    parser = OpenAPIParser(spec)
+    errors = parser.validate()
+    try:
+        parsed = parser.parse()
+    except Exception as e:
+        parsed = None
+        errors = errors + [f"Failed to parse: {str(e)}"]
+    return ParsedSpec(spec, errors, parsed)
+
+
+class ParseCache:
+    """Directory of pickled ``ParsedSpec`` entries with a size cap"""
+
+    def __init__(self, directory: Union[str, Path, None] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory).expanduser() if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> Optional["ParseCache"]:
+        """Create a cache from a ``cache`` config section; None if it is disabled"""
+        settings = settings or {}
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            directory=settings.get("dir"),
+            max_bytes=int(float(settings.get("max_size_mb", DEFAULT_MAX_BYTES / 1024 / 1024)) * 1024 * 1024)
+        )
+
+    def key(self, content: bytes) -> str:
+        """Cache key of spec bytes for the current parser"""
+        digest = hashlib.sha256(content)
+        digest.update(parser_version().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pickle"
+
+    def load(self, spec_file: Union[str, Path]) -> ParsedSpec:
+        """Return the parsed spec, from the cache when the file is unchanged"""
+        return self.load_content(Path(spec_file).read_bytes())
+
+    def load_content(self, content: bytes) -> ParsedSpec:
+        """Return the parsed spec of file contents, from the cache when seen before"""
+        path = self._path(self.key(content))
+
+        try:
+            with open(path, "rb") as f:
+                data = pickle.load(f)
+            # A lone decoded document stands for a parse result too deep to pickle
+            entry = ParsedSpec(*data) if len(data) == len(ParsedSpec._fields) else parse_decoded(data[0])
+        except FileNotFoundError:
+            entry = None
+        except Exception:
+            # Truncated or incompatible entry; rebuild it
+            path.unlink(missing_ok=True)
+            entry = None
+
+        if entry is not None:
+            os.utime(path)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = parse_content(content)
+        try:
+            try:
+                data = pickle.dumps(tuple(entry), protocol=pickle.HIGHEST_PROTOCOL)
+            except (RecursionError, pickle.PicklingError):
+                data = pickle.dumps((entry.spec,), protocol=pickle.HIGHEST_PROTOCOL)
+            self._write_atomic(path, data)
+            self._trim()
+        except (OSError, RecursionError, pickle.PicklingError):
+            # Neither a read-only or full cache directory nor an unpicklable
+            # document may break the command
+            pass
+        return entry
+
+    def clear(self):
+        """Remove every entry"""
+        for path in self.directory.glob("*/*.pickle"):
+            path.unlink(missing_ok=True)
+
+    def size(self) -> int:
+        """Total bytes of all entries"""
+        return sum(p.stat().st_size for p in self.directory.glob("*/*.pickle"))
+
+    def _trim(self):
+        entries = [(p, p.stat()) for p in self.directory.glob("*/*.pickle")]
+        total = sum(stat.st_size for _, stat in entries)
+        if total <= self.max_bytes:
+            return
+        # Least recently used first: hits refresh the mtime
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,245 @@
+"""
+Resolution of local ``$ref`` pointers in an OpenAPI document.
+
+The document is indexed by JSON pointer in a single pass, then every node is
+resolved at most once: a ``$ref`` object is replaced by the resolved target,
+and all references to the same target share one resolved object. Recursive
+schemas become cyclic object graphs rather than infinite copies. Resolution is
+iterative, so deeply nested or long reference chains cannot exhaust the stack.
+"""
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Set, TypeVar
+from urllib.parse import unquote
+
+
+class RefResolutionError(ValueError):
+    """A ``$ref`` that cannot be resolved"""
+
+
+def escape_token(token: str) -> str:
+    """Escape a key for use as a JSON pointer token"""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape_token(token: str) -> str:
+    """Decode a JSON pointer token"""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+Node = TypeVar("Node", bound=Hashable)
+
+
+def cyclic_nodes(edges: Mapping[Node, Iterable[Node]]) -> Set[Node]:
+    """Nodes of a directed graph that lie on a cycle, in one pass (iterative Tarjan)
+
+    Every node with outgoing edges must be a key of ``edges``.
+    """
+    index: Dict[Node, int] = {}
+    lowlink: Dict[Node, int] = {}
+    stack: List[Node] = []
+    on_stack: Set[Node] = set()
+    cyclic: Set[Node] = set()
+    counter = 0
+    for root in edges:
+        if root in index:
+            continue
+        work = [(root, iter(edges[root]))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in edges.get(node, ()):
+                    cyclic.update(component)
+    return cyclic
+
+
+def _local_ref(node: Any) -> Optional[str]:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#"):
+            return ref
+    return None
+
+
+def _normalize(ref: str) -> str:
+    pointer = unquote(ref)
+    return "#" if pointer == "#/" else pointer
+
+
+class RefResolver:
+    """JSON-pointer index plus memoized resolution of local references"""
+
+    def __init__(self, document: Dict[str, Any]):
+        self.document = document
+
+        self._index: Dict[str, Any] = {}
+        self._resolved: Dict[int, Any] = {}
+        self._refs: Dict[str, Any] = {}
+        self._pointers: Dict[int, str] = {}
+        self._pending: List[Any] = []
+        self._circular: Optional[Set[str]] = None
+        self._build_index()
+
+    def _build_index(self):
+        """Record every container in the document under its JSON pointer"""
+        stack = [("#", self.document)]
+        while stack:
+            pointer, node = stack.pop()
+            self._index[pointer] = node
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if isinstance(value, (dict, list)):
+                        stack.append((f"{pointer}/{escape_token(str(key))}", value))
+            elif isinstance(node, list):
+                for i, value in enumerate(node):
+                    if isinstance(value, (dict, list)):
+                        stack.append((f"{pointer}/{i}", value))
+
+    @property
+    def indexed_nodes(self) -> int:
+        """Number of containers in the JSON-pointer index"""
+        return len(self._index)
+
+    def lookup(self, ref: str) -> Any:
+        """Return the raw node a local reference points to"""
+        pointer = _normalize(ref)
+        node = self._index.get(pointer)
+        if node is not None:
+            return node
+
+        # Scalars are not indexed; look them up in the parent container
+        parent, _, token = pointer.rpartition("/")
+        container = self._index.get(parent)
+        token = unescape_token(token)
+        if isinstance(container, dict) and token in container:
+            return container[token]
+        if isinstance(container, list) and token.isdigit() and int(token) < len(container):
+            return container[int(token)]
+        raise RefResolutionError(f"Unresolvable $ref: {ref}")
+
+    def unresolved_refs(self) -> List[str]:
+        """Local references in the document whose targets do not exist"""
+        missing = []
+        for node in self._index.values():
+            ref = _local_ref(node)
+            if ref is not None:
+                try:
+                    self.lookup(ref)
+                except RefResolutionError:
+                    missing.append(ref)
+        return missing
+
+    def resolve(self, node: Any) -> Any:
+        """Return ``node`` with every local reference replaced by its resolved target"""
+        result = self._value(node)
+        while self._pending:
+            source = self._pending.pop()
+            shell = self._resolved[id(source)]
+            if isinstance(source, dict):
+                for key, value in source.items():
+                    shell[key] = self._value(value)
+            else:
+                shell.extend(self._value(value) for value in source)
+        return result
+
+    def resolve_ref(self, ref: str) -> Any:
+        """Resolve a reference string such as ``#/components/schemas/Pet``"""
+        return self.resolve({"$ref": ref})
+
+    def pointer_of(self, resolved: Any) -> str:
+        """JSON pointer of the ``$ref`` target a resolved object was built from, if any"""
+        return self._pointers.get(id(resolved), "")
+
+    @property
+    def circular(self) -> Set[str]:
+        """Pointers of reference targets that (indirectly) contain a reference to themselves"""
+        if self._circular is None:
+            self._circular = self._find_cycles()
+        return self._circular
+
+    def _value(self, node: Any) -> Any:
+        ref = _local_ref(node)
+        if ref is not None:
+            return self._follow(ref)
+        if isinstance(node, (dict, list)):
+            return self._shell(node)
+        return node
+
+    def _shell(self, node: Any) -> Any:
+        # The empty result is registered before it is filled, so every
+        # reference to this node (including cyclic ones) gets the same object
+        shell = self._resolved.get(id(node))
+        if shell is None:
+            shell = {} if isinstance(node, dict) else []
+            self._resolved[id(node)] = shell
+            self._pending.append(node)
+        return shell
+
+    def _follow(self, ref: str) -> Any:
+        cached = self._refs.get(ref)
+        if cached is not None:
+            return cached
+
+        # Follow consecutive $ref hops to a real target
+        chain = [ref]
+        target = self.lookup(ref)
+        while True:
+            next_ref = _local_ref(target)
+            if next_ref is None:
+                break
+            if next_ref in chain:
+                raise RefResolutionError(f"Circular $ref: {' -> '.join(chain + [next_ref])}")
+            chain.append(next_ref)
+            target = self.lookup(next_ref)
+
+        if isinstance(target, (dict, list)):
+            result = self._shell(target)
+            self._pointers.setdefault(id(result), _normalize(chain[-1]))
+            for hop in chain:
+                self._refs[hop] = result
+            return result
+        return target
+
+    def _find_cycles(self) -> Set[str]:
+        """Strongly connected components of the reference graph between targets"""
+        refs = {
+            pointer: _normalize(ref)
+            for pointer, ref in ((p, _local_ref(n)) for p, n in self._index.items())
+            if ref is not None
+        }
+        targets = set(refs.values())
+
+        # A reference inside a target's subtree is an edge from that target
+        edges: Dict[str, Set[str]] = {target: set() for target in targets}
+        for pointer, target in refs.items():
+            owner = pointer
+            while owner:
+                if owner in targets:
+                    edges[owner].add(target)
+                owner = owner.rpartition("/")[0]
+
+        return cyclic_nodes(edges)
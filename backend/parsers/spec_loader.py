@@ -0,0 +1,121 @@
+"""
+Shared loading of OpenAPI documents.
+
+The format is sniffed from the content rather than trusted from the file
+extension: a document whose first significant character is ``{`` or ``[`` is
+JSON, anything else is YAML. JSON is parsed with orjson when it is installed
+and YAML with PyYAML's libyaml-backed ``CSafeLoader`` when PyYAML was built
+with it; both fall back to the pure-Python parsers. Since JSON is a subset of
+YAML, content that looks like JSON but fails to parse as JSON is retried as
+YAML (e.g. flow-style YAML such as ``{openapi: 3.0.0}``).
+
+The cyclic garbage collector is paused while a document is decoded: decoding
+allocates a large number of containers, and every collection those
+allocations trigger would rescan all long-lived objects of the process (such
+as the previous parse kept by watch mode) for nothing.
+"""
+import gc
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Union
+
+import yaml
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    HAS_LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader
+    HAS_LIBYAML = False
+
+Content = Union[bytes, str]
+
+_BOMS = (b"\xef\xbb\xbf", "\ufeff")
+
+
+class SpecLoadError(ValueError):
+    """A document that is neither valid JSON nor valid YAML"""
+
+
+def sniff_format(content: Content) -> str:
+    """Return ``"json"`` or ``"yaml"`` from the first significant character"""
+    head = content[:1024]
+    for bom in _BOMS:
+        if type(head) is type(bom) and head.startswith(bom):
+            head = head[len(bom):]
+    head = head.lstrip()
+    first = head[:1]
+    if isinstance(first, bytes):
+        first = first.decode("latin-1")
+    return "json" if first in ("{", "[") else "yaml"
+
+
+def loads_json(content: Content) -> Any:
+    """Parse JSON with orjson when available"""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (e.g. integers beyond 64 bits); let json decide
+            pass
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+    return json.loads(content.lstrip("\ufeff"))
+
+
+def loads_yaml(content: Content) -> Any:
+    """Parse YAML with the libyaml loader when available"""
+    return yaml.load(content, Loader=SafeLoader)
+
+
+@contextmanager
+def gc_paused():
+    """Disable the cyclic garbage collector for the duration of the block"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_spec(content: Content) -> Any:
+    """Decode a JSON or YAML document"""
+    with gc_paused():
+        return _decode(content)
+
+
+def _decode(content: Content) -> Any:
+    if sniff_format(content) == "json":
+        try:
+            return loads_json(content)
+        except ValueError as json_error:
+            try:
+                return loads_yaml(content)
+            except yaml.YAMLError:
+                raise SpecLoadError(str(json_error)) from json_error
+    try:
+        return loads_yaml(content)
+    except yaml.YAMLError as e:
+        raise SpecLoadError(str(e)) from e
+
+
+def load_spec_file(path: Union[str, Path]) -> Any:
+    """Read and decode a JSON or YAML document from disk"""
+    return load_spec(Path(path).read_bytes())
+
+
+def loader_backends() -> Dict[str, str]:
+    """Names of the parsers in use, for diagnostics and benchmarks"""
+    return {
+        "json": "orjson" if HAS_ORJSON else "json",
+        "yaml": "libyaml" if HAS_LIBYAML else "pyyaml",
+    }
@@ -1,7 +1,5 @@
-"""Custom templates for code generation."""
+"""Templates for code generation, one directory per language."""
 
-from pathlib import Path
+from .engine import TEMPLATES_DIR, get_environment, preload
 
-TEMPLATES_DIR = Path(__file__).parent
-
-__all__ = ['TEMPLATES_DIR']
\ No newline at end of file
+__all__ = ['TEMPLATES_DIR', 'get_environment', 'preload']
@@ -0,0 +1,148 @@
+"""
+Jinja2 environment shared by all generators.
+
+Templates live in one directory per language (``python/client.py.j2``, ...).
+A custom template directory (``custom_templates`` in ``.apigenrc.yaml``) is
+searched first, so any template can be overridden by a file with the same
+relative path there. Each environment compiles a template once and keeps it
+for the life of the process; compiled code is also stored in a
+``FileSystemBytecodeCache``, so a fresh process loads bytecode instead of
+parsing and compiling the template sources again.
+
+Text from the spec (summaries, descriptions, parameter names, server URLs)
+reaches generated source only through the filters below, which escape it for
+the language of the template rendering it:
+
+``literal``        a double-quoted string literal
+``docstring``      the body of a Python triple-quoted docstring
+``comment(prefix)`` line comments, repeating ``prefix`` on every line
+``block_comment(indent)`` the body of a ``/** ... */`` comment
+"""
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Optional
+
+from jinja2 import ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, pass_context
+from jinja2.runtime import Context
+
+TEMPLATES_DIR = Path(__file__).resolve().parent
+
+TEMPLATE_EXTENSION = "j2"
+
+
+# Escapes shared by the double-quoted strings of every target language
+_STRING_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+# Characters a language's strings cannot hold as they are: interpolations of
+# PHP strings and JavaScript template literals, and backquotes closing the Go
+# raw strings that hold struct tags
+_LANGUAGE_ESCAPES = {
+    "php": {"$": "\\$"},
+    "javascript": {"$": "\\$", "`": "\\`"},
+    "go": {"`": "\\u0060"},
+}
+
+# A backslash run before "u", which Java reads as a unicode escape when its length is odd
+_UNICODE_ESCAPE = re.compile(r"(\\+)u")
+
+# Languages spelling a code point escape \u{...} rather than \uXXXX
+_BRACED_UNICODE = frozenset({"rust", "php"})
+
+
+def escape_string(value: Any, language: str) -> str:
+    """The contents of a double-quoted string literal of ``language`` spelling ``value``"""
+    escapes = {**_STRING_ESCAPES, **_LANGUAGE_ESCAPES.get(language, {})}
+    chars = []
+    for char in str(value):
+        escaped = escapes.get(char)
+        if escaped is None and (char < " " or char == "\x7f"):
+            escaped = f"\\u{{{ord(char):x}}}" if language in _BRACED_UNICODE else f"\\u{ord(char):04x}"
+        chars.append(escaped or char)
+    return "".join(chars)
+
+
+def template_language(context: Context) -> str:
+    """The language of the template being rendered, from its directory"""
+    return context.name.split("/", 1)[0]
+
+
+@pass_context
+def literal(context: Context, value: Any) -> str:
+    return f'"{escape_string(value, template_language(context))}"'
+
+
+def docstring(value: Any) -> str:
+    # Escaping every quote keeps text from closing the docstring or ending in a quote
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def comment(value: Any, prefix: str) -> str:
+    return f"\n{prefix}".join(line.rstrip() for line in str(value).splitlines())
+
+
+@pass_context
+def block_comment(context: Context, value: Any, indent: str = "") -> str:
+    text = str(value).replace("*/", "*\\/")
+    if template_language(context) == "java":
+        # javac reads \uXXXX escapes even in comments, and rejects malformed ones
+        text = _UNICODE_ESCAPE.sub(lambda match: match.group(1) + "\\" * (len(match.group(1)) % 2) + "u", text)
+    return comment(text, f"{indent} * ")
+
+
+FILTERS = {
+    "literal": literal,
+    "docstring": docstring,
+    "comment": comment,
+    "block_comment": block_comment,
+}
+
+
+def default_bytecode_cache_dir() -> Path:
+    """``$XDG_CACHE_HOME/apigen/templates``, or ``~/.cache/apigen/templates``"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "apigen" / "templates"
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    if os.environ.get("APIGEN_TEMPLATE_CACHE", "1") == "0":
+        return None
+    directory = default_bytecode_cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # Without a writable cache directory templates are compiled per process
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
+
+@lru_cache(maxsize=8)
+def get_environment(custom_dir: Optional[str] = None) -> Environment:
+    """The environment for a custom template directory (None for the built-in templates)"""
+    loaders = []
+    if custom_dir:
+        loaders.append(FileSystemLoader(str(Path(custom_dir).expanduser())))
+    loaders.append(FileSystemLoader(str(TEMPLATES_DIR)))
+    environment = Environment(
+        loader=ChoiceLoader(loaders),
+        bytecode_cache=_bytecode_cache(),
+        # Templates are loaded once; never stat the sources again
+        auto_reload=False,
+        cache_size=-1,
+        keep_trailing_newline=True,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        undefined=StrictUndefined
+    )
+    environment.filters.update(FILTERS)
+    return environment
+
+
+def preload(custom_dir: Optional[str] = None) -> List[str]:
+    """Compile every template up front. Returns the template names"""
+    environment = get_environment(custom_dir)
+    names = environment.list_templates(extensions=[TEMPLATE_EXTENSION])
+    for name in names:
+        environment.get_template(name)
+    return names
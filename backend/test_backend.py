@@ -4,6 +4,7 @@ Comprehensive test script for Universal API Client Generator
 Tests all modules, generators, and functionality
 """
 
+import json
 import sys
 from pathlib import Path
 
@@ -13,7 +14,7 @@ print("=" * 70)
 print()
 
 # Test 1: Import all modules
-print("[1/7] Testing module imports...")
+print("[1/29] Testing module imports...")
 try:
     from parsers import OpenAPIParser
     from generators import (
@@ -32,7 +33,7 @@ except ImportError as e:
     sys.exit(1)
 
 # Test 2: Load example OpenAPI spec
-print("\n[2/7] Testing OpenAPI parser...")
+print("\n[2/29] Testing OpenAPI parser...")
 try:
     import yaml
     with open('examples/petstore.yaml', 'r') as f:
@@ -46,23 +47,61 @@ try:
         sys.exit(1)
     
     parsed_data = parser.parse()
+    
+    # Path-item parameters apply to every operation that does not redefine them
+    shared_params_spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Users", "version": "1.0.0"},
+        "paths": {"/users/{userId}": {
+            "parameters": [
+                {"name": "userId", "in": "path", "required": True, "schema": {"type": "string"}},
+                {"name": "verbose", "in": "query", "schema": {"type": "boolean"}}
+            ],
+            "get": {"operationId": "getUser", "responses": {"200": {"description": "OK"}}},
+            "delete": {
+                "operationId": "deleteUser",
+                "parameters": [{"name": "verbose", "in": "query", "required": True, "schema": {"type": "integer"}}],
+                "responses": {"204": {"description": "Deleted"}}
+            }
+        }}
+    }
+    shared_params_parsed = OpenAPIParser(shared_params_spec).parse()
+    get_user, delete_user = shared_params_parsed["paths"]
+    assert [(p["name"], p["schema"]["type"]) for p in get_user["parameters"]] == [("userId", "string"), ("verbose", "boolean")]
+    assert [(p["name"], p["schema"]["type"]) for p in delete_user["parameters"]] == [("userId", "string"), ("verbose", "integer")]
     print(f"✅ Parser working - Found {len(parsed_data['paths'])} endpoints")
 except Exception as e:
     print(f"❌ Parser error: {e}")
     sys.exit(1)
 
 # Test 3: Test Python generator
-print("\n[3/7] Testing Python generator...")
+print("\n[3/29] Testing Python generator...")
 try:
     gen = PythonGenerator(parsed_data, "test_client")
     files = gen.generate()
+    
+    # A client with path-item parameters imports and takes them as arguments
+    import importlib
+    import inspect
+    import tempfile
+    with tempfile.TemporaryDirectory() as client_dir:
+        for path, content in PythonGenerator(shared_params_parsed, "users_client").generate().items():
+            (Path(client_dir) / path).parent.mkdir(parents=True, exist_ok=True)
+            (Path(client_dir) / path).write_text(content)
+        sys.path.insert(0, client_dir)
+        try:
+            client_class = next(value for name, value in vars(importlib.import_module("users_client.client")).items()
+                                if name.endswith("Client") and inspect.isclass(value))
+        finally:
+            sys.path.remove(client_dir)
+        assert list(inspect.signature(client_class.get_user).parameters) == ["self", "user_id", "verbose"]
     print(f"✅ Python generator - Generated {len(files)} files")
 except Exception as e:
     print(f"❌ Python generator error: {e}")
     sys.exit(1)
 
 # Test 4: Test JavaScript generator
-print("\n[4/7] Testing JavaScript generator...")
+print("\n[4/29] Testing JavaScript generator...")
 try:
     gen = JavaScriptGenerator(parsed_data, "test_client")
     files = gen.generate()
@@ -72,17 +111,28 @@ except Exception as e:
     sys.exit(1)
 
 # Test 5: Test Go generator
-print("\n[5/7] Testing Go generator...")
+print("\n[5/29] Testing Go generator...")
 try:
     gen = GoGenerator(parsed_data, "test_client")
     files = gen.generate()
+    
+    # A client with path-item parameters compiles, where a Go toolchain is installed
+    import shutil
+    import subprocess
+    import tempfile
+    if shutil.which("go"):
+        with tempfile.TemporaryDirectory() as client_dir:
+            for path, content in GoGenerator(shared_params_parsed, "users_client").generate().items():
+                (Path(client_dir) / path).write_text(content)
+            result = subprocess.run(["go", "vet", "./..."], cwd=client_dir, capture_output=True, text=True)
+            assert result.returncode == 0, result.stderr
     print(f"✅ Go generator - Generated {len(files)} files")
 except Exception as e:
     print(f"❌ Go generator error: {e}")
     sys.exit(1)
 
 # Test 6: Test new generators (C#, Java, PHP)
-print("\n[6/7] Testing new generators...")
+print("\n[6/29] Testing new generators...")
 try:
     # C#
     gen = CSharpGenerator(parsed_data, "test_client")
@@ -103,7 +153,7 @@ except Exception as e:
     sys.exit(1)
 
 # Test 7: Test Rust generator
-print("\n[7/7] Testing Rust generator...")
+print("\n[7/29] Testing Rust generator...")
 try:
     gen = RustGenerator(parsed_data, "test_client")
     files = gen.generate()
@@ -112,6 +162,955 @@ except Exception as e:
     print(f"❌ Rust generator error: {e}")
     sys.exit(1)
 
+# Test 8: Test result cache
+print("\n[8/29] Testing result cache...")
+try:
+    import tempfile
+    from engine.cache import ResultCache, content_digest, spec_digest
+    
+    cache = ResultCache(max_bytes=100, fingerprint="test")
+    assert cache.lookup(content_digest(b"spec"), language="python") is None
+    cache.store(content_digest(b"spec"), spec_digest(spec), b"x" * 40, language="python")
+    assert cache.lookup(content_digest(b"spec"), language="python") == b"x" * 40
+    assert cache.lookup(content_digest(b"spec"), language="go") is None
+    # A reformatted upload is new bytes but the same spec
+    assert cache.lookup(content_digest(b"spec "), language="python") is None
+    assert cache.lookup_spec(content_digest(b"spec "), spec_digest(spec), language="python") == b"x" * 40
+    assert cache.spec_hash_for(content_digest(b"spec ")) == spec_digest(spec)
+    
+    for i in range(3):
+        cache.put(f"key{i}", b"y" * 40)
+    stats = cache.stats()
+    assert stats["bytes"] <= 100 and stats["evictions"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    
+    # Aliases go with the last archive of their spec on disk
+    with tempfile.TemporaryDirectory() as cache_dir:
+        disk_cache = ResultCache(max_bytes=0, disk_dir=cache_dir, disk_max_bytes=100, fingerprint="test")
+        disk_cache.store(content_digest(b"a"), "a" * 64, b"x" * 40, language="python")
+        disk_cache.store(content_digest(b"a"), "a" * 64, b"x" * 40, language="go")
+        disk_cache.store(content_digest(b"b"), "b" * 64, b"x" * 40, language="python")
+        assert (Path(cache_dir) / "aliases" / content_digest(b"a")).exists()
+        disk_cache.store(content_digest(b"c"), "c" * 64, b"x" * 40, language="python")
+        assert not (Path(cache_dir) / "aliases" / content_digest(b"a")).exists()
+        assert (Path(cache_dir) / "aliases" / content_digest(b"b")).exists()
+
+        # A disk-only cache takes archives up to the disk budget, and a restart
+        # still knows which aliases go with an evicted spec
+        assert disk_cache.enabled and disk_cache.max_entry_bytes == 100
+        disk_cache.store(content_digest(b"d"), "d" * 64, b"x" * 101, language="python")
+        assert disk_cache.lookup(content_digest(b"d"), language="python") is None
+        restarted = ResultCache(max_bytes=0, disk_dir=cache_dir, disk_max_bytes=100, fingerprint="test")
+        restarted.store(content_digest(b"e"), "e" * 64, b"x" * 40, language="python")
+        restarted.store(content_digest(b"f"), "f" * 64, b"x" * 40, language="python")
+        assert not (Path(cache_dir) / "aliases" / content_digest(b"b")).exists()
+
+    # New uploads are looked up as soon as the job reports the spec hash
+    from engine.cache import CacheHit
+    cache = ResultCache(max_bytes=100, fingerprint="test")
+    cache.store(content_digest(b"spec"), spec_digest(spec), b"x" * 40, language="python")
+    check = cache.spec_hash_check(content_digest(b"spec  "), language="python")
+    check({"phase": "parse"})
+    try:
+        check({"spec_hash": spec_digest(spec)})
+        raise AssertionError("a cached spec did not stop the job")
+    except CacheHit as hit:
+        assert hit.data == b"x" * 40
+    assert cache.spec_hash_check(content_digest(b"spec  "), language="python") is None
+    print(f"✅ Result cache - {stats['hits']} hit, {stats['misses']} misses, {stats['evictions']} evictions")
+except Exception as e:
+    print(f"❌ Result cache error: {e}")
+    sys.exit(1)
+
+# Test 9: Test streaming ZIP writer
+print("\n[9/29] Testing streaming ZIP writer...")
+try:
+    import io
+    import struct
+    import zipfile
+    from engine.zipstream import ZIP64_END_LOCATOR_SIGNATURE, ZipStreamWriter, iter_zip
+    
+    files = PythonGenerator(parsed_data, "test_client").generate()
+    pieces = [(path, content) for path, content in files.items()]
+    pieces.append(("big.txt", "a" * 100000))
+    pieces.append(("big.txt", "b" * 100000))
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(iter_zip(pieces, chunk_size=1024))))
+    
+    assert archive.testzip() is None
+    assert archive.namelist() == list(files) + ["big.txt"]
+    assert archive.read("big.txt") == b"a" * 100000 + b"b" * 100000
+    
+    # Past the ZIP32 member count the central directory gets ZIP64 end records
+    many = zipfile.ZipFile(io.BytesIO(b"".join(iter_zip((f"f{i}.txt", "x") for i in range(70000)))))
+    assert len(many.namelist()) == 70000 and many.read("f69999.txt") == b"x"
+    writer = ZipStreamWriter()
+    writer.start_file("late.txt")
+    writer.end_file()
+    writer._offset = 5 << 30  # as if 5 GiB had been streamed before this point
+    directory = writer.finish()
+    assert struct.pack("<I", ZIP64_END_LOCATOR_SIGNATURE) in directory
+    assert struct.pack("<Q", 5 << 30) in directory
+    print(f"✅ Streaming ZIP writer - {len(archive.namelist())} members verified, ZIP64 past 65535 members")
+except Exception as e:
+    print(f"❌ Streaming ZIP writer error: {e}")
+    sys.exit(1)
+
+# Test 10: Test $ref resolution
+print("\n[10/29] Testing $ref resolution...")
+try:
+    from parsers import RefResolver, RefResolutionError
+    
+    schemas = parsed_data["components"]["schemas"]
+    bodies = [p["request_body"] for p in parsed_data["paths"] if p["request_body"]]
+    assert bodies[0]["content"]["application/json"]["schema"] is schemas["NewPet"]
+    
+    doc = {"components": {"schemas": {
+        "Node": {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}},
+        "Loop": {"$ref": "#/components/schemas/Loop"}
+    }}}
+    resolver = RefResolver(doc)
+    node = resolver.resolve_ref("#/components/schemas/Node")
+    assert node["properties"]["children"]["items"] is node
+    assert resolver.circular == {"#/components/schemas/Node", "#/components/schemas/Loop"}
+    try:
+        resolver.resolve_ref("#/components/schemas/Loop")
+        raise AssertionError("circular $ref chain not detected")
+    except RefResolutionError:
+        pass
+    assert resolver.unresolved_refs() == []
+    assert RefResolver({"a": {"$ref": "#/missing"}}).unresolved_refs() == ["#/missing"]
+    print("✅ $ref resolution - shared targets, recursive schemas and cycles handled")
+except Exception as e:
+    print(f"❌ $ref resolution error: {e}")
+    sys.exit(1)
+
+# Test 11: Test compact IR
+print("\n[11/29] Testing compact IR...")
+try:
+    import pickle
+    
+    compact = OpenAPIParser(spec).parse(compact=True)
+    for expected, operation in zip(parsed_data["paths"], compact["paths"]):
+        assert list(operation) == list(expected)
+        assert operation["method"] is sys.intern(expected["method"])
+        for param, expected_param in zip(operation["parameters"], expected["parameters"]):
+            assert list(param) == list(expected_param)
+    bodies = [p["request_body"] for p in compact["paths"] if p["request_body"]]
+    assert bodies[0]["content"]["application/json"]["schema"] is compact["components"]["schemas"]["NewPet"]
+    
+    restored = pickle.loads(pickle.dumps(compact))
+    assert restored["paths"][0]["operation_id"] == compact["paths"][0]["operation_id"]
+    for generator_class in (PythonGenerator, GoGenerator, RustGenerator, JavaGenerator):
+        assert generator_class(compact, "test_client").generate()
+    print(f"✅ Compact IR - {len(compact['paths'])} operations, dict-compatible with generators")
+except Exception as e:
+    print(f"❌ Compact IR error: {e}")
+    sys.exit(1)
+
+# Test 12: Test spec loader
+print("\n[12/29] Testing spec loader...")
+try:
+    from parsers.spec_loader import load_spec, load_spec_file, sniff_format, SpecLoadError, loader_backends
+    
+    assert load_spec_file('examples/petstore.yaml') == spec
+    assert sniff_format(b'  {"openapi": "3.0.0"}') == "json"
+    assert sniff_format(b"\xef\xbb\xbf[1]") == "json"
+    assert sniff_format("openapi: 3.0.0") == "yaml"
+    assert load_spec(json.dumps(spec).encode("utf-8")) == spec
+    assert load_spec(b"{openapi: 3.0.0}") == {"openapi": "3.0.0"}
+    try:
+        load_spec(b"openapi: [")
+        raise AssertionError("invalid YAML accepted")
+    except SpecLoadError:
+        pass
+    print(f"✅ Spec loader - {loader_backends()}")
+except Exception as e:
+    print(f"❌ Spec loader error: {e}")
+    sys.exit(1)
+
+# Test 13: Test parsed-spec cache
+print("\n[13/29] Testing parsed-spec cache...")
+try:
+    import tempfile
+    from parsers.parse_cache import ParseCache
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ParseCache(cache_dir, max_bytes=10 * 1024 * 1024)
+        first = cache.load('examples/petstore.yaml')
+        second = cache.load('examples/petstore.yaml')
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second.spec == spec and second.errors == []
+        assert second.parsed["paths"][0]["operation_id"] == first.parsed["paths"][0]["operation_id"]
+        
+        # With room for a single entry, storing a second one evicts the first
+        other = Path(cache_dir) / "other.json"
+        other.write_text(json.dumps({**spec, "info": {"title": "Other", "version": "2"}}))
+        small = ParseCache(cache_dir, max_bytes=cache.size() + 10)
+        small.load(other)
+        assert len(list(Path(cache_dir).glob("*/*.pickle"))) == 1
+        assert ParseCache.from_settings({"enabled": False}) is None
+        
+        # A 300 deep $ref chain resolves to a graph too deep to pickle; the
+        # decoded document is cached instead and parsed again on load
+        chain = {f"Node{i}": {"type": "object", "properties": {"next": {"$ref": f"#/components/schemas/Node{i + 1}"}}}
+                 for i in range(300)}
+        chain["Node300"] = {"type": "object", "properties": {"name": {"type": "string"}}}
+        deep_spec = {**spec, "components": {**spec["components"], "schemas": {**spec["components"]["schemas"], **chain}}}
+        deep = Path(cache_dir) / "deep.json"
+        deep.write_text(json.dumps(deep_spec))
+        deep_cache = ParseCache(cache_dir, max_bytes=10 * 1024 * 1024)
+        assert deep_cache.load(deep).errors == [] and deep_cache.load(deep).parsed is not None
+        assert (deep_cache.hits, deep_cache.misses) == (1, 1)
+    print(f"✅ Parsed-spec cache - {cache.hits} hit, {cache.misses} miss, LRU eviction working, deep $ref chains cached")
+except Exception as e:
+    print(f"❌ Parsed-spec cache error: {e}")
+    sys.exit(1)
+
+print("\n[14/29] Testing incremental re-parsing...")
+try:
+    import copy
+    from parsers import OpenAPIParser
+    from parsers.incremental import IncrementalParser, diff_specs
+    
+    incremental = IncrementalParser()
+    incremental.update(spec)
+    edited = copy.deepcopy(spec)
+    first_path = next(iter(edited["paths"]))
+    first_method = next(iter(edited["paths"][first_path]))
+    edited["paths"][first_path][first_method]["summary"] = "Edited"
+    edited["paths"]["/added"] = {"get": {"responses": {"200": {"description": "OK"}}}}
+    
+    delta = diff_specs(spec, edited)
+    assert delta.sections == {"paths"}
+    assert delta.operations == {(first_path, first_method.upper()), ("/added", "GET")}
+    errors, parsed, _ = incremental.update(edited)
+    assert errors == [] and incremental.partial_parses == 1
+    assert parsed == OpenAPIParser(edited).parse()
+    assert not diff_specs(edited, copy.deepcopy(edited))
+    
+    # Path-item parameters belong to every operation of the path
+    shared_edit = copy.deepcopy(shared_params_spec)
+    shared_edit["paths"]["/users/{userId}"]["parameters"][1]["schema"] = {"type": "string"}
+    assert diff_specs(shared_params_spec, shared_edit).operations == {("/users/{userId}", "GET"), ("/users/{userId}", "DELETE")}
+    
+    # Component edits are inlined into operations, so they parse in full
+    edited = copy.deepcopy(edited)
+    edited["components"]["schemas"]["Extra"] = {"type": "string"}
+    assert diff_specs(spec, edited).schemas == {"Extra"}
+    incremental.update(edited)
+    assert incremental.full_parses == 2
+    print(f"✅ Incremental re-parsing - {len(delta.operations)} operations re-parsed, unchanged ones reused")
+except Exception as e:
+    print(f"❌ Incremental re-parsing error: {e}")
+    sys.exit(1)
+
+print("\n[15/29] Testing templates...")
+try:
+    import tempfile
+    from pathlib import Path
+    from generators import PythonGenerator
+    from templates import get_environment, preload
+    
+    names = preload()
+    assert "python/operation.j2" in names and "go/client.go.j2" in names
+    assert get_environment() is get_environment()
+    
+    parsed = OpenAPIParser(spec).parse()
+    files = PythonGenerator(parsed, "templated").generate()
+    client = files["templated/client.py"]
+    assert all(f"def {view.name}(" in client for view in PythonGenerator(parsed, "templated").operation_views())
+    
+    # A template in the custom directory overrides the built-in one
+    with tempfile.TemporaryDirectory() as custom_dir:
+        override = Path(custom_dir) / "python" / "requirements.txt.j2"
+        override.parent.mkdir()
+        override.write_text("requests==2.31.0\n")
+        custom = PythonGenerator(parsed, "templated", template_dir=custom_dir).generate()
+        assert custom["requirements.txt"] == "requests==2.31.0\n"
+        assert custom["templated/client.py"] == client
+
+    # Spec text is escaped for the comments and strings it lands in
+    import shutil
+    import subprocess
+    hostile = 'Get the "item" */ $x `y` \\u00zz\nsecond line'
+    hostile_parsed = OpenAPIParser({
+        "openapi": "3.0.0",
+        "info": {"title": "Hostile", "version": '1.0"'},
+        "servers": [{"url": 'https://example.com/"$v'}],
+        "paths": {"/items/{id}/a\"b": {"get": {
+            "operationId": "getItem", "summary": hostile,
+            "parameters": [
+                {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}},
+                {"name": 'q"$`', "in": "query", "schema": {"type": "string"}},
+                {"name": 'X-"Trace"', "in": "header", "schema": {"type": "string"}}
+            ],
+            "responses": {"200": {"description": "OK"}}
+        }}},
+        "components": {"schemas": {"Item": {"type": "object", "description": hostile,
+                                            "properties": {'na"me`': {"type": "string"}}}}}
+    }).parse()
+    hostile_files = {generator_class.language: generator_class(hostile_parsed, "hostile").generate()
+                     for generator_class in (PythonGenerator, JavaScriptGenerator, GoGenerator, RustGenerator,
+                                             CSharpGenerator, JavaGenerator, PHPGenerator)}
+    for language in ("java", "javascript", "php"):
+        assert not any("*/ $x" in content for content in hostile_files[language].values()), language
+    for path, content in hostile_files["python"].items():
+        if path.endswith(".py"):
+            compile(content, path, "exec")
+    with tempfile.TemporaryDirectory() as client_dir:
+        for path, content in hostile_files["go"].items():
+            (Path(client_dir) / path).write_text(content)
+        if shutil.which("go"):
+            result = subprocess.run(["go", "vet", "./..."], cwd=client_dir, capture_output=True, text=True)
+            assert result.returncode == 0, result.stderr
+    if shutil.which("node"):
+        for path, content in hostile_files["javascript"].items():
+            if path.endswith(".js"):
+                result = subprocess.run(["node", "--check"], input=content, capture_output=True, text=True)
+                assert result.returncode == 0, result.stderr
+    print(f"✅ Templates - {len(names)} templates compiled, custom override applied, spec text escaped")
+except Exception as e:
+    print(f"❌ Templates error: {e}")
+    sys.exit(1)
+
+print("\n[16/29] Testing streaming generation...")
+try:
+    import tempfile
+    from pathlib import Path
+    from generators import collect_files
+    from generators import base_generator
+    from engine.tasks import write_chunks
+    from engine.zipstream import compress_member, compress_members
+    
+    parsed = OpenAPIParser(spec).parse()
+    expected = JavaGenerator(parsed, "streamed").generate()
+    # Small chunks so each client file arrives in several pieces
+    chunk_chars = base_generator.STREAM_CHUNK_CHARS
+    base_generator.STREAM_CHUNK_CHARS = 256
+    try:
+        chunks = list(JavaGenerator(parsed, "streamed").stream())
+    finally:
+        base_generator.STREAM_CHUNK_CHARS = chunk_chars
+    paths = [path for path, _ in chunks]
+    assert len(chunks) > len(expected)
+    assert [path for i, path in enumerate(paths) if i == 0 or paths[i - 1] != path] == list(expected)
+    assert collect_files(chunks) == expected
+    
+    members = list(compress_members(chunks))
+    assert members == [compress_member(path, content) for path, content in expected.items()]
+    with tempfile.TemporaryDirectory() as output_dir:
+        assert write_chunks(chunks, Path(output_dir)).files == len(expected)
+        assert all((Path(output_dir) / path).read_text() == content for path, content in expected.items())
+    print(f"✅ Streaming generation - {len(chunks)} chunks across {len(expected)} files")
+except Exception as e:
+    print(f"❌ Streaming generation error: {e}")
+    sys.exit(1)
+
+print("\n[17/29] Testing operation indexes...")
+try:
+    import pickle
+    from parsers import OpenAPIParser
+    
+    indexed_spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Indexed", "version": "1.0.0"},
+        "security": [{"apiKey": []}],
+        "paths": {
+            "/pets": {
+                "get": {"operationId": "listPets", "tags": ["pets"], "responses": {"200": {
+                    "description": "OK",
+                    "content": {"application/json": {"schema": {
+                        "type": "array", "items": {"$ref": "#/components/schemas/Pet"}}}}}}},
+                "post": {"operationId": "addPet", "tags": ["pets", "admin"],
+                         "security": [{"oauth": ["write"]}], "responses": {"201": {"description": "Created"}}}
+            },
+            "/health": {"get": {"security": [], "responses": {"200": {"description": "OK"}}}}
+        },
+        "components": {"schemas": {
+            "Pet": {"type": "object", "properties": {"owner": {"$ref": "#/components/schemas/Owner"}}},
+            "Owner": {"type": "object", "properties": {"pets": {"$ref": "#/components/schemas/Pet"}}},
+            "Unused": {"type": "string"}
+        }}
+    }
+    for compact in (False, True):
+        parsed = OpenAPIParser(indexed_spec).parse(compact=compact)
+        index = parsed["index"]
+        list_pets, add_pet, health = parsed["paths"]
+        assert index.by_operation_id["addPet"] is add_pet
+        assert index.by_path["/pets"]["GET"] is list_pets and set(index.by_path["/pets"]) == {"GET", "POST"}
+        assert index.by_tag["pets"] == (list_pets, add_pet) and index.by_tag["default"] == (health,)
+        # Pet is used directly, Owner through Pet (the two are mutually recursive)
+        assert set(index.by_schema) == {"Pet", "Owner"} and index.by_schema["Owner"] == (list_pets,)
+        assert index.by_security_scheme == {"apiKey": (list_pets,), "oauth": (add_pet,)}
+        try:
+            index.by_tag["pets"] = ()
+            raise AssertionError("index is mutable")
+        except TypeError:
+            pass
+        thawed = pickle.loads(pickle.dumps(parsed))
+        assert thawed["index"].by_operation_id["addPet"] is thawed["paths"][1]
+    assert PythonGenerator(parsed, "indexed").group_paths_by_tag()["admin"] == [add_pet]
+    print(f"✅ Operation indexes - {len(index.by_tag)} tags, {len(index.by_schema)} schemas, "
+          f"{len(index.by_security_scheme)} security schemes")
+except Exception as e:
+    print(f"❌ Operation indexes error: {e}")
+    sys.exit(1)
+
+print("\n[18/29] Testing naming service...")
+try:
+    from generators import naming
+    
+    assert naming.identifier("snake", "getHTTPResponse-v2") == "get_http_response_v2"
+    assert naming.identifier("camel", "list_user_pets") == "listUserPets"
+    assert naming.identifier("pascal", "2fa-code") == "FaCode"
+    naming.clear_caches()
+    for _ in range(3):
+        naming.identifier("camel", "X-Request-Id")
+    assert naming.identifier.cache_info().hits == 2
+    
+    # Reserved words and names the operation templates bind are escaped per language
+    assert PythonGenerator(parsed_data, "names").identifier("class", "snake") == "class_"
+    assert GoGenerator(parsed_data, "names").identifier("url", "camel") == "url_"
+    assert JavaGenerator(parsed_data, "names").identifier("class", "pascal") == "Class"
+    assert PHPGenerator(parsed_data, "names").identifier("class", "camel") == "class"
+    print("✅ Naming service - conversions memoized, reserved words escaped")
+except Exception as e:
+    print(f"❌ Naming service error: {e}")
+    sys.exit(1)
+
+print("\n[19/29] Testing type resolution...")
+try:
+    from generators.types import TypeResolver
+    
+    pet = {"type": "object", "required": ["id"], "properties": {
+        "id": {"type": "integer", "format": "int64"},
+        "seen": {"type": "string", "format": "date-time", "nullable": True},
+    }}
+    pet["properties"]["parent"] = pet
+    pet["properties"]["tags"] = {"type": "array", "items": {"type": "string"}}
+    pet["properties"]["either"] = {"oneOf": [{"type": "string"}, {"type": "integer"}, {"type": "null"}]}
+    components = {"schemas": {"Pet": pet}}
+    python = TypeResolver("python", components)
+    assert python.resolve(pet["properties"]["id"]) == "int"
+    assert python.resolve(pet["properties"]["seen"]) == "Optional[datetime]"
+    assert python.resolve(pet["properties"]["seen"], models=False) == "str"
+    assert python.resolve(pet["properties"]["tags"]) == "List[str]"
+    assert python.resolve(pet["properties"]["either"]) == "Optional[Union[str, int]]"
+    assert python.resolve(pet) == "Pet" and python.resolve(pet, models=False) == "Dict[str, Any]"
+    go = TypeResolver("go", components)
+    assert go.resolve(pet["properties"]["parent"]) == "*Pet"
+    assert go.optional("[]string") == "[]string" and go.optional("int64") == "*int64"
+    assert TypeResolver("rust", components).resolve(pet) == "Box<Pet>"
+    assert TypeResolver("java", components).resolve(pet["properties"]["id"]) == "Long"
+    
+    # Language-neutral refs are shared by every language
+    tags = python.schema_types.ref(pet["properties"]["tags"])
+    assert tags is python.schema_types.ref({"type": "array", "items": {"type": "string"}})
+    assert TypeResolver("go").spell(tags) == "[]string"
+    
+    # Recursion is found per strongly connected component: a cycle through a
+    # oneOf counts, a model that only points into a cycle does not
+    from generators.types import SchemaTypes
+    a, b, c, leaf = ({"type": "object", "properties": {}} for _ in range(4))
+    a["properties"]["b"] = b
+    b["properties"]["a"] = {"oneOf": [a, {"type": "null"}]}
+    c["properties"]["a"] = a
+    c["properties"]["leaves"] = {"type": "array", "items": leaf}
+    leaf["properties"]["c"] = {"type": "array", "items": c}
+    schema_types = SchemaTypes({"schemas": {"A": a, "B": b, "C": c, "Leaf": leaf}})
+    assert schema_types.recursive == {id(a), id(b)}
+    print("✅ Type resolution - formats, arrays, refs, nullable and unions resolved per language")
+except Exception as e:
+    print(f"❌ Type resolution error: {e}")
+    sys.exit(1)
+
+print("\n[20/29] Testing shared client model...")
+try:
+    from generators import ClientModel, with_client_model
+    
+    shared = with_client_model(parsed_data)
+    model = shared["client_model"]
+    assert isinstance(model, ClientModel) and with_client_model(shared) is shared
+    assert len(model.operations) == len(parsed_data["paths"])
+    assert "client_model" not in parsed_data
+    
+    # Emitting from the shared model gives the same client as analyzing per generator
+    for generator_class in (PythonGenerator, GoGenerator, JavaGenerator):
+        assert generator_class(shared, "shared").generate() == generator_class(parsed_data, "shared").generate()
+
+    # Rendered operations and models are reused by the next run, as in watch mode
+    for generator_class in (PythonGenerator, JavaGenerator):
+        first = generator_class(shared, "shared", fragments={})
+        files = first.generate()
+        assert len(first.fragments) == len(model.operations) + len(model.models)
+        assert generator_class(shared, "shared", fragments=first.fragments).generate() == files
+        # A reused fragment is not rendered again
+        reused = dict(first.fragments)
+        reused[next(iter(reused))] = "REUSED FRAGMENT"
+        assert any("REUSED FRAGMENT" in content
+                   for content in generator_class(shared, "shared", fragments=reused).generate().values())
+
+    # The model survives the trip to a batch worker
+    import pickle
+    assert pickle.loads(pickle.dumps(model)) == model
+    # A graph too deep to pickle goes as the decoded spec, which the worker parses again
+    from engine.tasks import freeze_parsed, parse_spec, thaw_parsed
+    deep_parsed = with_client_model(parse_spec(deep_spec))
+    thawed = thaw_parsed(freeze_parsed(deep_parsed, deep_spec))
+    assert PythonGenerator(thawed, "deep").generate() == PythonGenerator(deep_parsed, "deep").generate()
+    print(f"✅ Shared client model - {len(model.operations)} operations, {len(model.models)} models analyzed once, fragments reused")
+except Exception as e:
+    print(f"❌ Shared client model error: {e}")
+    sys.exit(1)
+
+print("\n[21/29] Testing incremental output writer...")
+try:
+    import tempfile
+    from pathlib import Path
+    from engine.output import MANIFEST_NAME, OutputWriter
+    
+    with tempfile.TemporaryDirectory() as output_dir:
+        root = Path(output_dir)
+        files = JavaGenerator(parsed_data, "written").generate()
+        report = OutputWriter(root).write(files.items())
+        assert len(report.added) == len(files) and (root / MANIFEST_NAME).is_file()
+        
+        # An unchanged run touches nothing, the manifest included
+        mtimes = {path: path.stat().st_mtime_ns for path in root.rglob("*")}
+        report = OutputWriter(root).write(files.items())
+        assert report.counts() == {"added": 0, "changed": 0, "removed": 0, "unchanged": len(files)}
+        assert {path: path.stat().st_mtime_ns for path in root.rglob("*")} == mtimes
+        
+        # Changed files are replaced, files no longer generated are removed
+        (root / "user_notes.txt").write_text("kept")
+        first, removed = list(files)[:2]
+        changed = {path: content + "// edit" if path == first else content
+                   for path, content in files.items() if path != removed}
+        report = OutputWriter(root).write(changed.items())
+        assert report.changed == [first] and report.removed == [removed]
+        assert not (root / removed).exists() and (root / "user_notes.txt").exists()
+        assert not list(root.rglob("*.tmp"))
+
+    # Watch mode's ZIP output is rewritten only when a file changed
+    import zipfile
+    cli_root = Path(__file__).resolve().parent.parent
+    if str(cli_root) not in sys.path:
+        sys.path.insert(0, str(cli_root))
+    from apigen_cli.incremental import ArchiveWriter, IncrementalBuild
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        archive_path = Path(output_dir) / "client.zip"
+        result = IncrementalBuild("examples/petstore.yaml", "java", str(archive_path), archive=True).run()
+        with zipfile.ZipFile(archive_path) as archive:
+            assert sorted(archive.namelist()) == sorted(result.written) and not result.errors
+
+        writer = ArchiveWriter(Path(output_dir) / "written.zip")
+        writer.write(files.items())
+        mtime = writer.path.stat().st_mtime_ns
+        report = writer.write(files.items())
+        assert not report.written and report.unchanged == len(files)
+        assert writer.path.stat().st_mtime_ns == mtime
+        report = writer.write(changed.items())
+        assert report.changed == [first] and report.removed == [removed]
+        with zipfile.ZipFile(writer.path) as archive:
+            assert archive.read(first).decode("utf-8") == changed[first]
+    print(f"✅ Incremental output writer - {len(files)} files, unchanged runs touch nothing")
+except Exception as e:
+    print(f"❌ Incremental output writer error: {e}")
+    sys.exit(1)
+
+print("\n[22/29] Testing threaded output writer...")
+try:
+    import tempfile
+    from pathlib import Path
+    from engine.output import OutputWriter
+    
+    files = JavaGenerator(parsed_data, "threaded").generate()
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as threaded_dir:
+        OutputWriter(serial_dir).write(files.items())
+        report = OutputWriter(threaded_dir).write(files.items(), workers=4)
+        assert sorted(report.added) == sorted(files)
+        for path, content in files.items():
+            assert (Path(threaded_dir) / path).read_bytes() == (Path(serial_dir) / path).read_bytes()
+        
+        # Unchanged files never reach the pool
+        report = OutputWriter(threaded_dir).write(files.items(), workers=4)
+        assert not report.written and report.unchanged == len(files)
+        assert report.throughput(0.5)["files_per_second"] == len(files) * 2
+    print(f"✅ Threaded output writer - {len(files)} files identical to serial writes")
+except Exception as e:
+    print(f"❌ Threaded output writer error: {e}")
+    sys.exit(1)
+
+print("\n[23/29] Testing generation job progress...")
+try:
+    import tempfile
+    import zipfile
+    from pathlib import Path
+    from engine import jobs
+    from engine.tasks import JOB_PHASES, archive_job
+    
+    from benchmarks.synthetic import make_spec
+    spec_bytes = json.dumps(make_spec(operations=200)).encode("utf-8")
+    with tempfile.TemporaryDirectory() as store_dir:
+        artifact = Path(store_dir) / "job.zip"
+        updates = list(archive_job(spec_bytes, "spec.json", "java", "jobs", False, True, str(artifact)))
+        assert [update["phase"] for update in updates][:4] == ["parse", "parse", "resolve", "render"]
+        assert updates[1]["spec_hash"] and updates[-1]["percent"] == 100
+        percents = [update["percent"] for update in updates]
+        assert percents == sorted(percents)
+        assert any(JOB_PHASES["render"] < percent < JOB_PHASES["archive"] for percent in percents)
+        with zipfile.ZipFile(artifact) as archive:
+            assert archive.testzip() is None and updates[-1]["bytes"] == artifact.stat().st_size
+        
+        # Jobs interrupted by a restart are reported failed, finished ones kept
+        job = jobs.Job("a" * 32, {"language": "go", "package_name": "jobs"})
+        job.update(status=jobs.RUNNING, phase="render", percent=40)
+        (Path(store_dir) / f"{job.id}.json").write_text(json.dumps({**job.to_dict(), "options": job.options}))
+        queue = jobs.JobQueue(engine=type("Engine", (), {"capacity": 4})(), store_dir=store_dir)
+        restored = queue.get(job.id)
+        assert restored.status == jobs.FAILED and restored.percent == 40 and queue.active == 0
+        
+        # Jobs of a live process sharing the store are left running, and readable
+        other = jobs.Job("b" * 32, {"language": "go", "package_name": "jobs"})
+        other.update(status=jobs.RUNNING, phase="render", percent=60)
+        (Path(store_dir) / f"{other.id}.json").write_text(
+            json.dumps({**other.to_dict(), "options": other.options, "owner": queue.owner})
+        )
+        shared = jobs.JobQueue(engine=type("Engine", (), {"capacity": 4})(), store_dir=store_dir)
+        assert other.id not in shared._jobs
+        assert shared.get(other.id).status == jobs.RUNNING and shared.get(other.id).percent == 60
+        assert shared.get("../" + "c" * 29) is None
+
+        # Jobs served from the result cache are reported done like generated ones
+        import asyncio
+        from engine.cache import ResultCache, content_digest, spec_digest
+
+        class DecodingEngine:
+            capacity = 4
+
+            async def track(self, fn, *args, on_progress):
+                on_progress({"phase": "parse", "percent": 5, "spec_hash": spec_digest(json.loads(args[0]))})
+                raise AssertionError("the job went on past a cache hit")
+
+        done = []
+        cache = ResultCache(max_bytes=0, disk_dir=str(Path(store_dir) / "cache"), fingerprint="test")
+        options = {"language": "go", "package_name": "jobs", "include_tests": False, "include_docs": True}
+        cache.store(content_digest(spec_bytes), spec_digest(json.loads(spec_bytes)), b"zip", **options)
+        cached_queue = jobs.JobQueue(engine=DecodingEngine(), result_cache=cache,
+                                     on_done=lambda job, result: done.append(result))
+
+        async def submit_cached():
+            repeat = cached_queue.submit(spec_bytes, "spec.json", **options)
+            reformatted = cached_queue.submit(spec_bytes + b"\n", "spec.json", **options)
+            await asyncio.gather(*cached_queue._tasks.values())
+            for job in (repeat, reformatted):
+                assert job.status == jobs.DONE and cached_queue.artifact(job).read_bytes() == b"zip"
+            await cached_queue.shutdown()
+
+        asyncio.run(submit_cached())
+        assert [result["cached"] for result in done] == [True, True]
+    
+    # A worker whose stream is never read gives up instead of blocking forever
+    import queue as queue_module
+    import threading
+    from engine.executor import _put
+    full = queue_module.Queue(1)
+    full.put(("data", b""))
+    assert not _put(full, threading.Event(), ("data", b""), timeout=0.6)
+
+    # Streams failing or cancelled before they start give back their slot
+    import asyncio
+    import time
+    from engine.executor import GenerationEngine
+
+    def broken_manager():
+        time.sleep(0.2)
+        raise OSError("manager failed to start")
+
+    async def abandon_streams(engine):
+        for _ in range(3):
+            try:
+                await engine.stream(archive_job)
+            except OSError:
+                pass
+            try:
+                await asyncio.wait_for(engine.stream(archive_job), timeout=0.05)
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.sleep(0.5)
+        return engine._get_slots().locked()
+
+    engine = GenerationEngine(max_workers=1, queue_depth=0)
+    engine._get_manager = broken_manager
+    assert not asyncio.run(abandon_streams(engine)) and engine.pending == 0
+    print(f"✅ Generation job progress - {len(updates)} updates, restart recovery")
+except Exception as e:
+    print(f"❌ Generation job progress error: {e}")
+    sys.exit(1)
+
+print("\n[24/29] Testing request metrics...")
+try:
+    from engine.metrics import MetricsRegistry, spec_size_label
+    from engine.tasks import stream_archive
+    
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_phase_seconds", "Test phases", ("phase", "language"))
+    counter = registry.counter("test_requests_total", "Test requests", ("status",))
+    registry.gauge("test_queue_depth", "Test queue", lambda: 3)
+    histogram.observe(0.01, "parse", "go")
+    histogram.observe(100.0, "parse", "go")
+    counter.inc("200")
+    text = registry.render()
+    assert 'test_phase_seconds_bucket{phase="parse",language="go",le="0.01"} 1' in text
+    assert 'test_phase_seconds_bucket{phase="parse",language="go",le="+Inf"} 2' in text
+    assert 'test_phase_seconds_count{phase="parse",language="go"} 2' in text
+    assert 'test_requests_total{status="200"} 1' in text and "test_queue_depth 3" in text
+    assert spec_size_label(10) == "lt_100k" and spec_size_label(50 * 1024 * 1024) == "ge_10m"
+    
+    # Streamed archives report the time of each phase after the last chunk
+    items = list(stream_archive(json.dumps(spec).encode("utf-8"), "spec.json", "go", "metrics"))
+    timings = items[-1]["timings"]
+    assert set(timings) == {"decode_seconds", "validate_seconds", "parse_seconds", "generate_seconds", "zip_seconds"}
+    assert all(seconds >= 0 for seconds in timings.values())
+    print(f"✅ Request metrics - Prometheus text format, {len(timings)} worker phases timed")
+except Exception as e:
+    print(f"❌ Request metrics error: {e}")
+    sys.exit(1)
+
+print("\n[25/29] Testing synthetic benchmark specs...")
+try:
+    from benchmarks.synthetic import make_spec
+    
+    plain = make_spec(operations=20, schemas=5)
+    assert plain == make_spec(operations=20, schemas=5)
+    assert "details" not in plain["components"]["schemas"]["Model0"]["properties"]
+    
+    # Depth and references change the schemas only, never the operations
+    rich = make_spec(operations=20, schemas=5, depth=3, ref_density=1.0)
+    assert rich["paths"] == plain["paths"]
+    model = rich["components"]["schemas"]["Model1"]["properties"]
+    assert model["details"]["properties"]["child"]["properties"]["child"]["type"] == "object"
+    assert model["related"]["items"]["$ref"].startswith("#/components/schemas/Model")
+    
+    parsed = OpenAPIParser(rich).parse()
+    assert len(parsed["paths"]) == 20 and len(parsed["components"]["schemas"]) == 5
+    print(f"✅ Synthetic specs - deterministic, {len(parsed['paths'])} operations with nested and referenced schemas")
+except Exception as e:
+    print(f"❌ Synthetic spec error: {e}")
+    sys.exit(1)
+
+print("\n[26/29] Testing generation profiler...")
+try:
+    import io
+    import time
+    import zipfile
+    from engine.profiling import StackSampler
+    from engine.tasks import PROFILE_DIR, profile_archive
+    
+    result = profile_archive(json.dumps(spec).encode("utf-8"), "spec.json", "python", "profiled", interval=0.0005)
+    names = zipfile.ZipFile(io.BytesIO(result["archive"])).namelist()
+    assert f"{PROFILE_DIR}/summary.json" in names and f"{PROFILE_DIR}/stacks.folded" in names
+    assert any(name.endswith("client.py") for name in names)
+    phases = [phase["phase"] for phase in result["summary"]["phases"]]
+    assert phases == ["decode", "validate", "parse", "resolve", "generate", "zip"]
+    
+    # Collapsed stacks: "phase;outer;...;inner count", phases as the root frames
+    for line in result["stacks"].splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack.split(";")[0] in {"start", "decode", "parse", "resolve", "generate"}
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in result["stacks"].splitlines()) == result["summary"]["samples"]
+    
+    def spin(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+    
+    with StackSampler(0.001) as sampler:
+        sampler.phase = "spin"
+        spin(0.1)
+    assert sampler.samples > 0 and all(stack[0] == "spin" and len(stack) > 1 for stack in sampler.stacks)
+    assert sampler.functions()[0][0].startswith("spin (")
+    print(f"✅ Profiler - {sampler.samples} samples in 0.1s, profile summary and stacks in the archive")
+except Exception as e:
+    print(f"❌ Profiler error: {e}")
+    sys.exit(1)
+
+print("\n[27/29] Testing CLI startup budget...")
+try:
+    import compileall
+    import subprocess
+    
+    # Milliseconds of imports `apigen languages` may spend after interpreter startup
+    STARTUP_BUDGET_MS = 100
+    HEAVY_MODULES = {"rich", "requests", "urllib3", "yaml", "watchdog", "jinja2", "parsers", "generators"}
+    
+    root = Path(__file__).resolve().parent.parent
+    # Measured as installed: from bytecode, not recompiling the sources
+    compileall.compile_dir(str(root / "apigen_cli"), quiet=1)
+    
+    def command_imports(*argv):
+        """Modules a CLI command imports and their top-level cumulative microseconds"""
+        code = f"import sys; sys.argv = ['apigen', *{list(argv)!r}]; from apigen_cli.cli import main; main()"
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=root, capture_output=True, text=True, check=True
+        )
+        lines = [line for line in result.stderr.splitlines() if line.startswith("import time:")][1:]
+        # Interpreter startup ends with site; everything after it is the command's
+        last_site = max(i for i, line in enumerate(lines) if line.split("|")[2] == " site")
+        modules = set()
+        top_level = 0
+        for line in lines[last_site + 1:]:
+            _, cumulative, name = line.split("|")
+            modules.add(name.strip().split(".")[0])
+            if not name.startswith("  "):
+                top_level += int(cumulative)
+        return modules, top_level
+    
+    startup_ms = {}
+    for argv in (["languages"], ["--help"]):
+        # Best of three runs, so a busy machine does not fail the budget
+        runs = [command_imports(*argv) for _ in range(3)]
+        modules = runs[0][0]
+        startup_ms[argv[0]] = min(micros for _, micros in runs) / 1000
+        assert not modules & HEAVY_MODULES, f"apigen {argv[0]} imports {sorted(modules & HEAVY_MODULES)}"
+        assert startup_ms[argv[0]] < STARTUP_BUDGET_MS, f"apigen {argv[0]} imports take {startup_ms[argv[0]]:.1f} ms"
+    print(f"✅ CLI startup - apigen languages imports in {startup_ms['languages']:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+except Exception as e:
+    print(f"❌ CLI startup error: {e}")
+    sys.exit(1)
+
+print("\n[28/29] Testing CLI daemon...")
+try:
+    import tempfile
+    import threading
+    import zipfile
+    
+    root = Path(__file__).resolve().parent.parent
+    if str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+    from apigen_cli import daemon
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        socket_file = Path(work_dir) / "daemon.sock"
+        server = daemon.DaemonServer(socket_file, idle_timeout=30, warm=False)
+        serving = threading.Thread(target=server.serve, daemon=True)
+        serving.start()
+        
+        spec_file = str(Path("examples/petstore.yaml").resolve())
+        result = daemon.connect(socket_file).request("validate", spec_file=spec_file)
+        assert result["valid"] and result["endpoints_count"] > 0
+        output = str(Path(work_dir) / "client.zip")
+        result = daemon.connect(socket_file).request(
+            "generate", spec_file=spec_file, output=output, language="go", package_name="petstore"
+        )
+        with zipfile.ZipFile(output) as archive:
+            assert len(archive.namelist()) == result["files"] > 0
+
+        # A generation that fails midway leaves the previous archive, and no partial one
+        from apigen_cli.cli import write_zip
+
+        def failing_pieces():
+            yield "README.md", "partial"
+            raise RuntimeError("render failed")
+
+        previous = Path(output).read_bytes()
+        try:
+            write_zip(failing_pieces(), output)
+            raise AssertionError("a failed generation was written")
+        except RuntimeError as e:
+            assert str(e) == "render failed"
+        assert Path(output).read_bytes() == previous
+        assert sorted(path.name for path in Path(work_dir).iterdir()) == ["client.zip", "daemon.sock"]
+        try:
+            daemon.connect(socket_file).request("validate", spec_file=str(Path(work_dir) / "missing.yaml"))
+            raise AssertionError("a missing spec was validated")
+        except daemon.DaemonError as e:
+            assert "File not found" in str(e)
+        status = daemon.connect(socket_file).request("status")
+        assert status["requests"] == 4 and status["specs"] == 1
+        assert socket_file.stat().st_mode & 0o777 == 0o600
+        
+        # A socket directory others can enter is refused
+        shared_dir = Path(work_dir) / "shared"
+        shared_dir.mkdir(mode=0o755)
+        shared_dir.chmod(0o755)
+        try:
+            daemon.ensure_private(shared_dir)
+            raise AssertionError("a shared socket directory was accepted")
+        except daemon.DaemonError:
+            pass
+        shared_dir.chmod(0o700)
+        daemon.ensure_private(shared_dir)
+        
+        # A second daemon on the socket is refused
+        try:
+            daemon.DaemonServer(socket_file, warm=False)
+            raise AssertionError("two daemons bound one socket")
+        except daemon.DaemonError:
+            pass
+        
+        # An invocation running other code stops the daemon instead of using it
+        import socket
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_file))
+            stream = sock.makefile("rwb")
+            daemon._send(stream, {**daemon.hello(), "version": "0.0.0"})
+            assert not daemon._receive(stream)["ok"]
+        serving.join(10)
+        assert not serving.is_alive() and not socket_file.exists()
+        assert daemon.connect(socket_file) is None
+        
+        # Idle daemons exit by themselves
+        server = daemon.DaemonServer(socket_file, idle_timeout=0.2, warm=False)
+        serving = threading.Thread(target=server.serve, daemon=True)
+        serving.start()
+        serving.join(10)
+        assert not serving.is_alive() and not socket_file.exists()
+    print(f"✅ CLI daemon - generated {result['files']} files warm, stale and idle daemons stop")
+except Exception as e:
+    print(f"❌ CLI daemon error: {e}")
+    sys.exit(1)
+
+print("\n[29/29] Testing compressed uploads...")
+try:
+    import gzip
+    import io
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+    from engine.compression import DecompressionMiddleware
+    from apigen_cli.transport import gzip_chunks, multipart_chunks
+    
+    async def echo_upload(request):
+        form = await request.form()
+        return JSONResponse({"language": form["language"], "spec": (await form["file"].read()).decode("utf-8")})
+    
+    app = Starlette(routes=[Route("/upload", echo_upload, methods=["POST"])])
+    app.add_middleware(DecompressionMiddleware, max_bytes=1024 * 1024)
+    client = TestClient(app)
+    
+    # The CLI's streamed multipart body, gzipped, arrives as a regular form
+    spec_text = Path("examples/petstore.yaml").read_text(encoding="utf-8")
+    chunks = multipart_chunks(io.BytesIO(spec_text.encode("utf-8")), "petstore.yaml", {"language": "go"}, "b0undary")
+    body = b"".join(gzip_chunks(chunks))
+    headers = {"Content-Type": "multipart/form-data; boundary=b0undary", "Content-Encoding": "gzip"}
+    response = client.post("/upload", content=body, headers=headers)
+    assert response.json() == {"language": "go", "spec": spec_text}, response.text
+    assert len(body) < len(spec_text.encode("utf-8"))
+    
+    assert client.post("/upload", content=body[:-16], headers=headers).status_code == 400
+    assert client.post("/upload", content=body, headers={**headers, "Content-Encoding": "br"}).status_code == 415
+    # Bodies inflating past the cap are refused, however small compressed
+    bomb = gzip.compress(b"\0" * (8 * 1024 * 1024))
+    assert client.post("/upload", content=bomb, headers=headers).status_code == 413
+    print(f"✅ Compressed uploads - {len(spec_text.encode('utf-8'))} byte spec sent as {len(body)} bytes")
+except Exception as e:
+    print(f"❌ Compressed uploads error: {e}")
+    sys.exit(1)
+
 print()
 print("=" * 70)
 print("🎉 ALL TESTS PASSED!")
@@ -107,6 +107,7 @@ export default function GeneratorPage() {
   const [includeTests, setIncludeTests] = useState(false);
   const [includeDocs, setIncludeDocs] = useState(true);
   const [isGenerating, setIsGenerating] = useState(false);
+  const [progress, setProgress] = useState<string | null>(null);
   const [isPreviewing, setIsPreviewing] = useState(false);
   type ValidationInfo = {
     title?: string;
@@ -217,6 +218,8 @@ export default function GeneratorPage() {
         formData.append('file', file);
         formData.append('languages', selectedLanguages.join(','));
         formData.append('package_name', packageName);
+        formData.append('include_tests', includeTests.toString());
+        formData.append('include_docs', includeDocs.toString());
 
         const response = await fetch('http://localhost:8000/api/batch-generate', {
           method: 'POST',
@@ -224,11 +227,19 @@ export default function GeneratorPage() {
         });
 
         if (!response.ok) {
-          throw new Error('Failed to queue batch generation');
+          const errorText = await response.text();
+          throw new Error(errorText || 'Failed to run batch generation');
         }
 
-        await response.json();
-        alert(`Batch generation queued for: ${selectedLanguages.join(', ')}`);
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `${packageName}_batch.zip`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
       } else {
         // Single generation
         const formData = new FormData();
@@ -238,14 +249,37 @@ export default function GeneratorPage() {
         formData.append('include_tests', includeTests.toString());
         formData.append('include_docs', includeDocs.toString());
 
-        const response = await fetch('http://localhost:8000/api/generate', {
+        // Submit a job and poll it, so large specs do not hold the request open
+        const submitted = await fetch('http://localhost:8000/api/jobs', {
           method: 'POST',
           body: formData,
         });
 
+        if (!submitted.ok) {
+          const errorText = await submitted.text();
+          throw new Error(errorText || 'Failed to generate client');
+        }
+
+        let job = await submitted.json();
+        while (job.status !== 'done' && job.status !== 'failed') {
+          await new Promise((resolve) => setTimeout(resolve, 500));
+          const status = await fetch(`http://localhost:8000${job.status_url}`);
+          if (!status.ok) {
+            throw new Error(await status.text());
+          }
+          job = await status.json();
+          if (job.phase) {
+            setProgress(`${job.phase} ${job.percent}%`);
+          }
+        }
+        if (job.status === 'failed') {
+          throw new Error(job.error || 'Failed to generate client');
+        }
+
+        const response = await fetch(`http://localhost:8000${job.download_url}`);
         if (!response.ok) {
           const errorText = await response.text();
-          throw new Error(errorText || 'Failed to generate client');
+          throw new Error(errorText || 'Failed to download client');
         }
 
         const blob = await response.blob();
@@ -263,6 +297,7 @@ export default function GeneratorPage() {
       setError('Failed to generate API client. Please try again.');
     } finally {
       setIsGenerating(false);
+      setProgress(null);
     }
   };
 
@@ -540,7 +575,7 @@ export default function GeneratorPage() {
                 {isGenerating ? (
                   <>
                     <div className="w-5 h-5 border-2 border-white/20 border-t-white rounded-full animate-spin" />
-                    Generating...
+                    Generating{progress ? ` (${progress})` : '...'}
                   </>
                 ) : (
                   <>